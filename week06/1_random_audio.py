@@ -1,15 +1,23 @@
+import time
 import pyaudio
-import numpy as np
+from audio_io import GeneratorOutput
+from sources import NoiseSource
 
 p = pyaudio.PyAudio()
-stream = p.open(format=pyaudio.paFloat32, channels=1, rate=44100, output=True, output_device_index=10)
 
-# generate random audio 
-while True:
-    audio = np.random.rand(44100) * 0.1
-    stream.write(audio.astype(np.float32))
-    print("Playing 1 second of audio")
-
-    
-    
+# generate random audio: the callback fills a preallocated float32 buffer in place
+noise = NoiseSource(amplitude=0.1)
+output = GeneratorOutput(p, noise, rate=44100, chunk=1024, device=10)
+output.start()
 
+try:
+    while True:
+        time.sleep(1)
+        stats = output.stats()
+        print(f"Playing random audio | callback {stats['callback_ms_mean']:.3f} ms avg, "
+              f"CPU load {stats['cpu_load']:.2%}, underflows {stats['underflows']}")
+except KeyboardInterrupt:
+    pass
+finally:
+    output.close()
+    p.terminate()
@@ -1,26 +1,107 @@
-
-import torch
+import queue
+import sys
+import threading
+import time
 import numpy as np
-from diffusers import AudioLDM2Pipeline, DPMSolverMultistepScheduler
 import pyaudio
+from clip_player import ClipPlayer
+
+# Modes:
+#   python 2_gen_audio.py          AudioLDM2 on the GPU (CPU if no GPU is found)
+#   python 2_gen_audio.py --cpu    force the CPU settings below (small AudioLDM model)
+#   python 2_gen_audio.py --dummy  no model: synthesized clips, to test playback
+DUMMY = "--dummy" in sys.argv
+RATE = 16000
+
+# The CPU runs the small AudioLDM checkpoint (185M-parameter UNet against
+# AudioLDM2's 350M, same 16 kHz output) with few steps and short clips
+GPU_SETTINGS = dict(pipeline="AudioLDM2Pipeline", model="cvssp/audioldm2-music",
+                    num_inference_steps=200, audio_length_in_s=60)
+CPU_SETTINGS = dict(pipeline="AudioLDMPipeline", model="cvssp/audioldm-s-full-v2",
+                    num_inference_steps=20, audio_length_in_s=5)
+
+
+def load_pipeline(cpu):
+    import torch
+    import diffusers
+    from diffusers import DPMSolverMultistepScheduler
+
+    settings = CPU_SETTINGS if cpu else GPU_SETTINGS
+    pipeline = getattr(diffusers, settings["pipeline"]).from_pretrained(
+        settings["model"], torch_dtype=torch.float32 if cpu else torch.float16
+    )
+    pipeline.scheduler = DPMSolverMultistepScheduler.from_config(
+        pipeline.scheduler.config
+    )
+    if not cpu:
+        pipeline.to("cuda")
+        pipeline.enable_model_cpu_offload()
+
+    def generate(prompt):
+        return pipeline(prompt,
+                num_inference_steps=settings["num_inference_steps"],
+                audio_length_in_s=settings["audio_length_in_s"]
+            ).audios[0]
+    return generate
 
-pipeline = AudioLDM2Pipeline.from_pretrained(
-    "cvssp/audioldm2-music", torch_dtype=torch.float16
-)
-pipeline.to("cuda")
-pipeline.scheduler = DPMSolverMultistepScheduler.from_config(
-    pipeline.scheduler.config
-)
-pipeline.enable_model_cpu_offload()
+
+def dummy_generate(prompt, seconds=4):
+    """A short chord picked from the prompt, taking a moment like a real model"""
+    time.sleep(1.0)
+    rng = np.random.default_rng(abs(hash(prompt)) % 2**32)
+    t = np.arange(int(seconds * RATE)) / RATE
+    root = 110 * 2 ** (rng.integers(0, 12) / 12)
+    chord = sum(np.sin(2 * np.pi * root * ratio * t) for ratio in (1, 1.25, 1.5, 2))
+    return (0.1 * chord * np.exp(-(t % 1) * 2)).astype(np.float32)
+
+
+if DUMMY:
+    generate = dummy_generate
+else:
+    import torch
+    cpu = "--cpu" in sys.argv or not torch.cuda.is_available()
+    print(f"Loading {(CPU_SETTINGS if cpu else GPU_SETTINGS)['model']} ({'CPU' if cpu else 'GPU'} settings)...")
+    generate = load_pipeline(cpu)
 
 p = pyaudio.PyAudio()
-stream = p.open(format=pyaudio.paFloat32, channels=1, rate=16000, output=True)
-
-while True:
-    prompt = input("Give me a song description: ")
-    audios = pipeline(prompt, 
-            num_inference_steps=200,
-            audio_length_in_s=60
-        ).audios
-    for audio in audios:
-        stream.write(audio.astype(np.float32))
+player = ClipPlayer(p, rate=RATE, chunk=1024, crossfade=0.5)
+player.start()
+
+# Prompts are generated one after another on a worker thread, while the
+# previous result keeps looping
+prompts = queue.Queue()
+
+def generation_worker():
+    while True:
+        prompt = prompts.get()
+        if prompt is None:
+            break
+        start = time.time()
+        try:
+            audio = generate(prompt)
+        except Exception as e:
+            # Keep the worker (and the current loop) alive for the next prompt
+            print(f"\n❌ Generating '{prompt}' failed: {e}")
+            continue
+        if len(audio) == 0:
+            print(f"\n⚠️  '{prompt}' produced no audio, keeping the current loop")
+            continue
+        print(f"\n🎶 '{prompt}' ready after {time.time() - start:.1f}s, crossfading in")
+        player.play(audio)
+
+worker = threading.Thread(target=generation_worker, daemon=True)
+worker.start()
+
+try:
+    while True:
+        prompt = input("Give me a song description: ")
+        if prompt.strip():
+            prompts.put(prompt)
+            print(f"⏳ Queued ({prompts.qsize()} waiting), the current loop keeps playing")
+except (KeyboardInterrupt, EOFError):
+    pass
+finally:
+    prompts.put(None)
+    player.close()
+    print(f"Playback: {player.stats()}")
+    p.terminate()
@@ -1,5 +1,6 @@
 import asyncio
 import pyaudio
+from audio_io import AudioInput, AudioOutput
 
 # Parameters
 CHUNK = 1024
@@ -10,57 +11,21 @@ RATE = 44100
 # Initialize PyAudio
 p = pyaudio.PyAudio()
 
-# Create asyncio queues
-global input_queue, output_queue
-output_queue = asyncio.Queue()
-input_queue = asyncio.Queue()
-
-# Callback function for input stream
-def input_callback(in_data, frame_count, time_info, status):
-    input_queue.put_nowait(in_data)
-    return (None, pyaudio.paContinue)
-
-# Callback function for output stream
-def output_callback(in_data, frame_count, time_info, status):
-    try:
-        data = output_queue.get_nowait()
-    except asyncio.QueueEmpty:
-        data = b'\x00' * CHUNK * 2  # Silence if no data available
-    return (data, pyaudio.paContinue)
-
-# Open input stream
-input_stream = p.open(format=FORMAT,
-                      channels=CHANNELS,
-                      rate=RATE,
-                      input=True,
-                      input_device_index=1,
-                      frames_per_buffer=CHUNK,
-                      stream_callback=input_callback)
-
-# Open output stream
-output_stream = p.open(format=FORMAT,
-                       channels=CHANNELS,
-                       rate=RATE,
-                       output=True,
-                       frames_per_buffer=CHUNK,
-                       stream_callback=output_callback)
+# Input and output streams: the PortAudio callbacks only copy into ring buffers
+mic = AudioInput(p, rate=RATE, channels=CHANNELS, chunk=CHUNK, format=FORMAT, device=1)
+speaker = AudioOutput(p, rate=RATE, channels=CHANNELS, chunk=CHUNK, format=FORMAT)
 
 async def process_audio():
     print("Loopback started. Press Ctrl+C to stop.")
+    mic.start()
+    speaker.start()
     try:
-        while True:
-            if input_queue.empty():
-                await asyncio.sleep(0.1)
-                continue
-            data = await input_queue.get()
-            await output_queue.put(data)
+        # Woken by the input callback as soon as a chunk arrives (no polling)
+        async for data in mic.chunks():
+            speaker.write(data)
     except asyncio.CancelledError:
         print("Loopback stopped.")
 
-# Start streams
-input_stream.start_stream()
-output_stream.start_stream()
-
 # Run the event loop
 try:
     asyncio.run(process_audio())
@@ -68,10 +33,10 @@ except KeyboardInterrupt:
     pass
 finally:
     # Stop and close streams
-    input_stream.stop_stream()
-    input_stream.close()
-    output_stream.stop_stream()
-    output_stream.close()
+    mic.close()
+    speaker.close()
+    print(f"Input: {mic.stats()}")
+    print(f"Output: {speaker.stats()}")
 
     # Terminate PyAudio
     p.terminate()
@@ -1,43 +1,60 @@
+import time
 import pyaudio
+from audio_io import DuplexLoopback
+from effects import EffectChain, Biquad, Compressor, Delay
 
 # Parameters
-CHUNK = 256
+CHUNK = 256  # try 64 or 128 for lower latency, 512+ if you hear dropouts
 FORMAT = pyaudio.paInt16
 CHANNELS = 1
 RATE = 44100
+MEASURE_LATENCY = True  # click test: put the mic near the speaker (or use a cable)
+USE_EFFECTS = True
 
 # Initialize PyAudio
 p = pyaudio.PyAudio()
 
-# Open input stream
-input_stream = p.open(format=FORMAT,
-                      channels=CHANNELS,
-                      rate=RATE,
-                      input=True,
-                      input_device_index=1,
-                      frames_per_buffer=CHUNK)
-
-# Open output stream
-output_stream = p.open(format=FORMAT,
-                       channels=CHANNELS,
-                       rate=RATE,
-                       output=True,
-                       frames_per_buffer=CHUNK)
+# Effect chain run inside the callback (can be changed while audio is running)
+chain = EffectChain()
+
+# One full-duplex stream: input is copied to output inside the callback
+loopback = DuplexLoopback(p, rate=RATE, channels=CHANNELS, chunk=CHUNK, format=FORMAT,
+                          input_device=1, dsp=chain)
+loopback.start()
 
 print("Loopback started. Press Ctrl+C to stop.")
 
+if MEASURE_LATENCY:
+    time.sleep(0.5)  # let the stream settle
+    latency = loopback.measure_latency()
+    if latency is None:
+        print("Round-trip latency: no click heard (check volume / mic placement)")
+    else:
+        print(f"Round-trip latency: {latency * 1000:.1f} ms ({CHUNK} frame buffers)")
+
+if USE_EFFECTS:
+    # Added after the latency test so the click goes through untouched
+    chain.set_effects([
+        Biquad.highpass(80, RATE),
+        Compressor(RATE, threshold_db=-24, ratio=3, makeup_db=6),
+        Delay(0.3, RATE, feedback=0.3, mix=0.3),
+    ])
+
 try:
     while True:
-        data = input_stream.read(CHUNK)
-        output_stream.write(data)
+        time.sleep(1)
+        stats = loopback.stats()
+        print(f"Callback {stats['callback_ms_mean']:.3f} ms avg / {stats['callback_ms_max']:.3f} ms max "
+              f"(budget {stats['budget_ms']:.1f} ms) | "
+              f"underflows {stats['output_underflow']} | overflows {stats['input_overflow']}")
+        for name, mean_us, worst_us in chain.report():
+            print(f"  {name:20s} {mean_us:6.1f} µs avg / {worst_us:6.1f} µs max")
 except KeyboardInterrupt:
     print("Loopback stopped.")
 
-# Close streams
-input_stream.stop_stream()
-input_stream.close()
-output_stream.stop_stream()
-output_stream.close()
+# Close stream
+loopback.close()
+print(loopback.stats())
 
 # Terminate PyAudio
-p.terminate()
\ No newline at end of file
+p.terminate()
@@ -1,9 +1,10 @@
 import asyncio
 import pyaudio
-import time
 import numpy as np
 import matplotlib.pyplot as plt
 import matplotlib.animation as animation
+from ring_buffer import AudioRingBuffer
+from waveform_envelope import WaveformEnvelope
 
 # Parameters
 FORMAT = pyaudio.paInt16
@@ -11,16 +12,16 @@ CHANNELS = 1
 RATE = 44100
 CHUNK = 128
 ROLLING_WINDOW = 4 * RATE  # 10 seconds rolling window
+COLUMNS = 1000  # envelope columns drawn across the plot
 
 # Initialize PyAudio
 p = pyaudio.PyAudio()
-audio_queue = asyncio.Queue()
-global buffer
-buffer = np.zeros(ROLLING_WINDOW, dtype=np.int16)
+ring = AudioRingBuffer(ROLLING_WINDOW, dtype=np.int16)
+envelope = WaveformEnvelope(COLUMNS, ROLLING_WINDOW // COLUMNS)
 
-# Callback function for input stream
+# Callback function for input stream: copy the chunk into the ring buffer
 def input_callback(in_data, frame_count, time_info, status):
-    audio_queue.put_nowait(in_data)
+    ring.write(np.frombuffer(in_data, dtype=np.int16))
     return (None, pyaudio.paContinue)
 
 # Open stream
@@ -32,44 +33,33 @@ stream = p.open(format=FORMAT,
                 input_device_index=1,
                 stream_callback=input_callback)
 
-# Async function to process audio data
-def process_audio():
-    global buffer
-    print("Loopback started. Press Ctrl+C to stop.")
-    while True:
-        if audio_queue.empty():
-            time.sleep(0.01)
-            continue
-        else:
-            data = audio_queue.get_nowait()
-            waveform = np.frombuffer(data, dtype=np.int16)
-            buffer = np.roll(buffer, -len(waveform))
-            buffer[-len(waveform):] = waveform
-        
-  
-
-
 def update_plot():
     fig, ax = plt.subplots()
-    x = np.arange(0, ROLLING_WINDOW)
-    line, = ax.plot(x, np.zeros(ROLLING_WINDOW))
+    # Min/max envelope as one line zig-zagging between each column's min and max
+    x = np.repeat(np.arange(COLUMNS) * envelope.samples_per_pixel / RATE, 2)
+    y = np.zeros(2 * COLUMNS)
+    line, = ax.plot(x, y, linewidth=0.8)
+    rms_line, = ax.plot(x[::2], np.zeros(COLUMNS), color='orange')
+    ax.set_xlabel('Time (s)')
     ax.set_ylabel('Amplitude')
     ax.set_ylim(-2**12, 2**12)
 
     def update_frame(frame):
-        global buffer
-        new_data = np.frombuffer(buffer, dtype=np.int16)
-        line.set_ydata(new_data)
-        return line,
+        # Only the samples written since the last frame are summarised
+        envelope.update(ring)
+        envelope.ordered(envelope.mins, y[0::2])
+        envelope.ordered(envelope.maxs, y[1::2])
+        line.set_ydata(y)
+        rms_line.set_ydata(envelope.ordered(envelope.rms))
+        return line, rms_line
 
-    anim = animation.FuncAnimation(fig, update_frame, blit=False, interval=50)
+    anim = animation.FuncAnimation(fig, update_frame, blit=True, interval=50, cache_frame_data=False)
     plt.show()
 
 
 # Run the event loop
 async def main():
-    # run process audio in separate thread
-    asyncio.get_running_loop().run_in_executor(None, process_audio)
+    print("Waveform started. Press Ctrl+C to stop.")
     update_plot()
 
 try:
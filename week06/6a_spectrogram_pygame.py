@@ -2,23 +2,27 @@ import pygame
 import pyaudio
 import numpy as np
 import colorsys
-from scipy import signal
 import threading
-import queue
 import time
+import sys
+from audio_file import AudioFileSource, FilePlayer
+from ring_buffer import AudioRingBuffer
+from stft_engine import IncrementalSTFT, RunningRange
+from waveform_envelope import WaveformEnvelope
 
 class PygameSpectrogram:
-    def __init__(self, width=1200, height=800):
+    def __init__(self, width=1200, height=800, audio_file=None):
         # Display settings
         self.width = width
         self.height = height
         self.spec_height = height // 2
         self.wave_height = height // 4
         
-        # Audio settings
+        # Audio settings (a WAV/FLAC file can replace the microphone)
+        self.source = AudioFileSource(audio_file) if audio_file else None
         self.FORMAT = pyaudio.paFloat32
         self.CHANNELS = 1
-        self.RATE = 44100
+        self.RATE = self.source.rate if self.source else 44100
         self.CHUNK = 1024
         self.ROLLING_WINDOW = 4 * self.RATE  # 4 seconds
         
@@ -26,8 +30,9 @@ class PygameSpectrogram:
         self.NFFT = 1024
         self.noverlap = 512
         self.freq_bins = self.NFFT // 2 + 1
-        self.max_freq_display = 8000  # Show up to 8kHz
-        self.freq_bin_display = int((self.max_freq_display / (self.RATE / 2)) * self.freq_bins)
+        self.max_freq_display = min(8000, self.RATE / 2)  # Show up to 8kHz (or Nyquist for low-rate files)
+        self.freq_bin_display = min(self.freq_bins,
+                                    int((self.max_freq_display / (self.RATE / 2)) * self.freq_bins))
         
         # Initialize pygame
         pygame.init()
@@ -41,12 +46,31 @@ class PygameSpectrogram:
         self.GREEN = (0, 255, 0)
         self.BLUE = (0, 100, 255)
         self.RED = (255, 100, 100)
+        self.SPEC_BACKGROUND = (20, 20, 20)
         
         # Data buffers
-        self.audio_buffer = np.zeros(self.ROLLING_WINDOW, dtype=np.float32)
+        self.audio_ring = AudioRingBuffer(self.ROLLING_WINDOW)
+        self.audio_buffer = self.audio_ring.latest(1000)
+        self.envelope = WaveformEnvelope(self.width, self.ROLLING_WINDOW // self.width)
+        # Scrolling history: circular columns, next_column is the slot written next (the oldest)
         self.spectrogram_history = np.zeros((self.freq_bin_display, self.width))
-        self.spectrogram_smoothed = np.zeros((self.freq_bin_display, self.width))
-        self.audio_queue = queue.Queue()
+        self.column_max = np.zeros(self.width)
+        self.next_column = 0
+        # Temporal smoothing state: the last smoothed column
+        self.spectrum_smoothed = np.zeros(self.freq_bin_display)
+        
+        # Incremental STFT over the ring buffer (replaces scipy.signal.spectrogram per frame)
+        self.stft = IncrementalSTFT(nfft=self.NFFT, hop=self.NFFT - self.noverlap, rate=self.RATE)
+        self.db_range = RunningRange()
+        
+        # Rendering buffers: 256-entry colormap and one surface column per history column
+        self.colormap = self.build_colormap()
+        self.lut_scratch = np.zeros(self.freq_bin_display)
+        self.lut_index = np.zeros(self.freq_bin_display, dtype=np.uint8)
+        self.spec_surface = pygame.Surface((self.width, self.freq_bin_display))
+        self.spec_surface.fill(self.SPEC_BACKGROUND)
+        self.spec_scaled = pygame.Surface((self.width, self.spec_height))
+        self.spec_draw_ms = 0.0
         
         # Smoothing parameters
         self.temporal_smoothing = 0.7  # How much to blend with previous frame (0-1)
@@ -63,6 +87,17 @@ class PygameSpectrogram:
         """Initialize PyAudio stream"""
         self.p = pyaudio.PyAudio()
         
+        if self.source is not None:
+            # Play the file and feed the same ring buffer the microphone would
+            try:
+                self.stream = FilePlayer(self.source, self.audio_ring, chunk=self.CHUNK, p=self.p)
+            except Exception as e:
+                print(f"No audio output ({e}), showing the file silently")
+                self.stream = FilePlayer(self.source, self.audio_ring, chunk=self.CHUNK)
+            self.stream.start_stream()
+            print(f"Playing file: {self.source.path} ({self.source.duration:.1f} s)")
+            return
+        
         # Try to find a working input device
         input_device = None
         for i in range(self.p.get_device_count()):
@@ -100,46 +135,23 @@ class PygameSpectrogram:
         # Convert audio data to numpy array
         audio_data = np.frombuffer(in_data, dtype=np.float32)
         
-        # Add to queue for main thread processing
-        try:
-            self.audio_queue.put(audio_data, block=False)
-        except queue.Full:
-            pass  # Drop data if queue is full
+        # Write straight into the ring buffer (only copies the new chunk)
+        self.audio_ring.write(audio_data)
         
         return (None, pyaudio.paContinue)
     
     def update_audio_data(self):
-        """Process audio data from queue"""
-        # Process all available audio data
-        while not self.audio_queue.empty():
-            try:
-                new_data = self.audio_queue.get_nowait()
-                # Roll buffer and add new data
-                self.audio_buffer = np.roll(self.audio_buffer, -len(new_data))
-                self.audio_buffer[-len(new_data):] = new_data
-            except queue.Empty:
-                break
+        """Get the most recent samples (for the level meter) from the ring buffer"""
+        self.audio_buffer = self.audio_ring.latest(1000)
+        self.envelope.update(self.audio_ring)
     
     def compute_spectrogram(self):
-        """Compute spectrogram from current audio buffer"""
-        if len(self.audio_buffer) < self.NFFT:
-            return
-        
-        # Compute spectrogram using scipy
+        """Transform only the audio that arrived since the last frame"""
         try:
-            # Use only the most recent portion of the buffer for better real-time response
-            recent_buffer = self.audio_buffer[-self.RATE:]  # Last 1 second
-            
-            if len(recent_buffer) < self.NFFT:
-                recent_buffer = self.audio_buffer
-            
-            frequencies, times, Sxx = signal.spectrogram(
-                recent_buffer,
-                fs=self.RATE,
-                nperseg=self.NFFT,
-                noverlap=self.noverlap,
-                window='hann'
-            )
+            # Incremental STFT: reads the new hops from the ring buffer
+            Sxx = self.stft.process(self.audio_ring)
+            if Sxx.shape[1] == 0:
+                return
             
             # Debug: Check if we're getting data
             max_power = np.max(Sxx)
@@ -149,14 +161,13 @@ class PygameSpectrogram:
                 self.debug_counter = 0
             
             if self.debug_counter % 30 == 0:  # Print every second at 30fps
-                print(f"Spectrogram max power: {max_power:.2e}, Shape: {Sxx.shape}")
+                print(f"Spectrogram max power: {max_power:.2e}, New columns: {Sxx.shape[1]}")
             
             # Convert to dB scale with better handling
-            Sxx_db = 10 * np.log10(Sxx + 1e-12)  # Smaller epsilon for better sensitivity
+            Sxx_db = 10 * np.log10(Sxx[:self.freq_bin_display] + 1e-12)  # Smaller epsilon for better sensitivity
             
-            # Adaptive normalization based on current data
-            current_min = np.percentile(Sxx_db, 10)  # 10th percentile
-            current_max = np.percentile(Sxx_db, 95)  # 95th percentile
+            # Adaptive normalization: running 10th/95th percentiles of the new columns
+            current_min, current_max = self.db_range.update(Sxx_db)
             
             # Use adaptive range with fallback
             min_db = max(current_min, -80)  # Don't go below -80dB
@@ -173,29 +184,36 @@ class PygameSpectrogram:
             gamma = 0.5
             Sxx_normalized = np.power(Sxx_normalized, gamma)
             
-            # Update spectrogram history (scroll left, add new column)
-            if times.shape[0] > 0:
-                # Take the latest time slice, or average if multiple
-                if Sxx_normalized.shape[1] > 1:
-                    latest_spectrum = np.mean(Sxx_normalized[:self.freq_bin_display, -3:], axis=1)
-                else:
-                    latest_spectrum = Sxx_normalized[:self.freq_bin_display, -1]
-                
-                # Scroll history left and add new column
-                self.spectrogram_history = np.roll(self.spectrogram_history, -1, axis=1)
-                self.spectrogram_history[:, -1] = latest_spectrum
-                
-                # Apply temporal smoothing to reduce flickering
-                self.spectrogram_smoothed = (
-                    self.temporal_smoothing * self.spectrogram_smoothed + 
-                    (1 - self.temporal_smoothing) * self.spectrogram_history
-                )
+            # Average the new time slices into one display column
+            latest_spectrum = np.mean(Sxx_normalized[:, -3:], axis=1)
+            
+            # Apply temporal smoothing to the incoming column only
+            self.spectrum_smoothed *= self.temporal_smoothing
+            self.spectrum_smoothed += (1 - self.temporal_smoothing) * latest_spectrum
+            
+            self.add_column(self.spectrum_smoothed)
                 
         except Exception as e:
             print(f"Error computing spectrogram: {e}")
             import traceback
             traceback.print_exc()
     
+    def add_column(self, column):
+        """Write one column into the circular history and its surface pixels"""
+        x = self.next_column
+        self.spectrogram_history[:, x] = column
+        self.column_max[x] = column.max()
+        
+        # Colormap LUT lookup, flipped so low frequencies are at the bottom
+        np.multiply(column[::-1], 255, out=self.lut_scratch)
+        np.rint(self.lut_scratch, out=self.lut_scratch)
+        self.lut_index[:] = self.lut_scratch
+        pixels = pygame.surfarray.pixels3d(self.spec_surface)
+        pixels[x] = self.colormap[self.lut_index]
+        del pixels  # unlock the surface before it is blitted
+        
+        self.next_column = (x + 1) % self.width
+    
     def value_to_color(self, value):
         """Convert normalized value (0-1) to color with smooth transitions"""
         # Apply slight compression to reduce extreme values
@@ -239,15 +257,23 @@ class PygameSpectrogram:
         
         return (max(0, min(255, r)), max(0, min(255, g)), max(0, min(255, b)))
     
+    def build_colormap(self):
+        """Precompute value_to_color for 256 levels (index = round(value * 255))"""
+        colormap = np.array([self.value_to_color(i / 255) for i in range(256)], dtype=np.uint8)
+        
+        # Values at or below 0.1 were never drawn, so they show the background
+        colormap[:int(0.1 * 255) + 1] = self.SPEC_BACKGROUND
+        return colormap
+    
     def draw_spectrogram(self):
         """Draw the spectrogram"""
         spec_rect = pygame.Rect(0, 0, self.width, self.spec_height)
         
         # Clear spectrogram area with dark background
-        pygame.draw.rect(self.screen, (20, 20, 20), spec_rect)
+        pygame.draw.rect(self.screen, self.SPEC_BACKGROUND, spec_rect)
         
         # Check if we have any data
-        max_value = np.max(self.spectrogram_smoothed)
+        max_value = np.max(self.column_max)
         if max_value < 1e-6:
             # Draw "no signal" message
             no_signal_text = self.font.render("No audio signal detected - make some noise!", True, (100, 100, 100))
@@ -255,25 +281,14 @@ class PygameSpectrogram:
             self.screen.blit(no_signal_text, text_rect)
             return
         
-        # Draw spectrogram pixels with improved scaling
-        pixel_size = max(1, min(2, self.width // 600))  # Smaller pixels for smoother look
-        
-        for x in range(0, self.width, pixel_size):
-            for y in range(0, min(self.freq_bin_display, self.spec_height), pixel_size):
-                if x < self.spectrogram_smoothed.shape[1] and y < self.spectrogram_smoothed.shape[0]:
-                    value = self.spectrogram_smoothed[y, x]
-                    
-                    # Skip very low values for performance
-                    if value > 0.1:
-                        color = self.value_to_color(value)
-                        
-                        # Calculate position (flip Y axis)
-                        draw_y = self.spec_height - (y * self.spec_height // self.freq_bin_display) - pixel_size
-                        draw_y = max(0, min(self.spec_height - pixel_size, draw_y))
-                        
-                        # Draw pixel
-                        pixel_rect = pygame.Rect(x, draw_y, pixel_size, pixel_size)
-                        pygame.draw.rect(self.screen, color, pixel_rect)
+        # Columns are already colored; scale the image to the spectrogram area
+        pygame.transform.scale(self.spec_surface, spec_rect.size, self.spec_scaled)
+        
+        # Wrap-aware blit: oldest columns (from next_column on) go on the left
+        split = self.next_column
+        self.screen.blit(self.spec_scaled, (0, 0), pygame.Rect(split, 0, self.width - split, self.spec_height))
+        if split:
+            self.screen.blit(self.spec_scaled, (self.width - split, 0), pygame.Rect(0, 0, split, self.spec_height))
         
         # Draw frequency labels
         label_y_positions = [0.1, 0.3, 0.5, 0.7, 0.9]
@@ -296,29 +311,14 @@ class PygameSpectrogram:
         # Clear waveform area
         pygame.draw.rect(self.screen, self.BLACK, wave_rect)
         
-        # Draw waveform
-        if len(self.audio_buffer) > 1:
-            # Downsample for display
-            samples_per_pixel = len(self.audio_buffer) // self.width
-            if samples_per_pixel > 0:
-                points = []
-                for x in range(self.width):
-                    start_idx = x * samples_per_pixel
-                    end_idx = min(start_idx + samples_per_pixel, len(self.audio_buffer))
-                    
-                    if end_idx > start_idx:
-                        # Use RMS for each pixel to show energy
-                        segment = self.audio_buffer[start_idx:end_idx]
-                        rms = np.sqrt(np.mean(segment**2))
-                        
-                        # Scale to waveform area
-                        y = wave_y_start + self.wave_height // 2 - int(rms * self.wave_height * 10)
-                        y = max(wave_y_start, min(wave_y_start + self.wave_height, y))
-                        points.append((x, y))
-                
-                # Draw waveform line
-                if len(points) > 1:
-                    pygame.draw.lines(self.screen, self.GREEN, False, points, 1)
+        # Draw the RMS envelope (one point per pixel column, updated incrementally)
+        points = self.envelope.rms_points(
+            center_y=wave_y_start + self.wave_height // 2,
+            scale=self.wave_height * 10,
+            top=wave_y_start,
+            bottom=wave_y_start + self.wave_height
+        )
+        pygame.draw.lines(self.screen, self.GREEN, False, points, 1)
         
         # Draw center line
         center_y = wave_y_start + self.wave_height // 2
@@ -342,13 +342,14 @@ class PygameSpectrogram:
         
         # Calculate audio level
         audio_level = np.sqrt(np.mean(self.audio_buffer[-1000:]**2))  # RMS of recent samples
-        spec_max = np.max(self.spectrogram_smoothed)
+        spec_max = np.max(self.column_max)
         
         info_lines = [
             f"Audio Status: {status_text}",
             f"Sample Rate: {self.RATE} Hz",
             f"Audio Level: {audio_level:.4f}",
             f"Spec Max: {spec_max:.4f}",
+            f"Spectrogram draw: {self.spec_draw_ms:.1f} ms",
             f"Smoothing: {self.temporal_smoothing:.2f}",
             f"Frequency Range: 0 - {self.max_freq_display/1000:.1f} kHz",
             "Controls: ↑/↓ adjust smoothing, R reset, ESC quit"
@@ -400,7 +401,9 @@ class PygameSpectrogram:
             self.screen.fill(self.BLACK)
             
             # Draw components
+            draw_start = time.perf_counter()
             self.draw_spectrogram()
+            self.spec_draw_ms = (time.perf_counter() - draw_start) * 1000
             self.draw_waveform()
             self.draw_info()
             
@@ -426,7 +429,7 @@ class PygameSpectrogram:
 
 if __name__ == "__main__":
     try:
-        app = PygameSpectrogram()
+        app = PygameSpectrogram(audio_file=sys.argv[1] if len(sys.argv) > 1 else None)
         app.run()
     except KeyboardInterrupt:
         print("Interrupted by user")
@@ -4,6 +4,10 @@ import matplotlib.pyplot as plt
 import matplotlib.animation as animation
 import sys
 import warnings
+from audio_file import AudioFileSource, FilePlayer
+from ring_buffer import AudioRingBuffer
+from stft_engine import IncrementalSTFT
+from waveform_envelope import WaveformEnvelope
 
 # Suppress matplotlib warnings
 warnings.filterwarnings('ignore')
@@ -14,6 +18,17 @@ CHANNELS = 1
 RATE = 44100
 CHUNK = 1024
 ROLLING_WINDOW = 2 * RATE  # 2 seconds
+NFFT = 512
+HOP = 256
+MAX_FREQ = 4000  # Show up to 4kHz
+COLUMNS = 1000  # waveform envelope columns
+FPS = 30
+AUDIO_FILE = sys.argv[1] if len(sys.argv) > 1 else None  # WAV/FLAC to play instead of the mic
+
+if AUDIO_FILE:
+    source = AudioFileSource(AUDIO_FILE)
+    RATE = source.rate
+    ROLLING_WINDOW = 2 * RATE
 
 def find_input_device():
     """Find a working input device"""
@@ -41,130 +56,156 @@ def find_input_device():
         sys.exit(1)
 
 # Initialize
-p, input_device_index = find_input_device()
-buffer = np.zeros(ROLLING_WINDOW, dtype=np.float32)
+ring = AudioRingBuffer(ROLLING_WINDOW)
+envelope = WaveformEnvelope(COLUMNS, ROLLING_WINDOW // COLUMNS)
+stft = IncrementalSTFT(nfft=NFFT, hop=HOP, rate=RATE)
+
+# Spectrogram image: frequency rows up to MAX_FREQ (or Nyquist), one column per hop.
+# The columns are circular: next_column is the slot written next (the oldest)
+freq_rows = min(int(np.searchsorted(stft.frequencies, MAX_FREQ)) + 1, len(stft.frequencies))
+spec_columns = ROLLING_WINDOW // HOP
+spec_db = np.full((freq_rows, spec_columns), -140.0, dtype=np.float32)
+next_column = 0
+column_seconds = ROLLING_WINDOW / RATE / spec_columns
+
+def audio_callback(in_data, frame_count, time_info, status):
+    """Runs on the PortAudio thread: only copy the chunk into the ring buffer"""
+    ring.write(np.frombuffer(in_data, dtype=np.float32))
+    return (None, pyaudio.paContinue)
 
 # Open stream
-try:
-    stream = p.open(format=INPUTFORMAT,
-                    channels=CHANNELS,
-                    rate=RATE,
-                    input=True,
-                    frames_per_buffer=CHUNK,
-                    input_device_index=input_device_index)
-    print("Audio stream opened successfully")
-except Exception as e:
-    print(f"Error: {e}")
-    p.terminate()
-    sys.exit(1)
+if AUDIO_FILE:
+    # Play the file through the speakers and feed the same ring buffer
+    p = pyaudio.PyAudio()
+    try:
+        stream = FilePlayer(source, ring, chunk=CHUNK, p=p)
+    except Exception as e:
+        print(f"No audio output ({e}), showing the file silently")
+        stream = FilePlayer(source, ring, chunk=CHUNK)
+    print(f"Playing file: {AUDIO_FILE} ({source.duration:.1f} s)")
+else:
+    p, input_device_index = find_input_device()
+    try:
+        stream = p.open(format=INPUTFORMAT,
+                        channels=CHANNELS,
+                        rate=RATE,
+                        input=True,
+                        frames_per_buffer=CHUNK,
+                        input_device_index=input_device_index,
+                        stream_callback=audio_callback)
+        print("Audio stream opened successfully")
+    except Exception as e:
+        print(f"Error: {e}")
+        p.terminate()
+        sys.exit(1)
 
 # Create figure
 fig, (ax1, ax2) = plt.subplots(2, 1, figsize=(12, 8))
 
-# Waveform plot
-line, = ax1.plot(np.arange(ROLLING_WINDOW), buffer, 'b-', linewidth=0.5)
-ax1.set_ylabel('Amplitude')
+# Waveform plot: min/max envelope, scaled to its own peak
+wave_x = np.repeat(np.arange(COLUMNS) * envelope.samples_per_pixel / RATE, 2)
+wave_y = np.zeros(2 * COLUMNS)
+line, = ax1.plot(wave_x, wave_y, 'b-', linewidth=0.5)
+ax1.set_xlim(0, ROLLING_WINDOW / RATE)
+ax1.set_ylim(-1.2, 1.2)
+ax1.set_ylabel('Amplitude (peak = 1)')
 ax1.set_title('Audio Waveform')
 ax1.grid(True, alpha=0.3)
 
-# Spectrogram setup
+# Live status inside the axes: blitting only redraws the axes area, not the titles
+status_box = dict(facecolor='white', alpha=0.7, edgecolor='none')
+wave_status = ax1.text(0.01, 0.95, '', transform=ax1.transAxes, va='top', fontsize=9, bbox=status_box)
+
+# Spectrogram: two AxesImages over views of the circular buffer, the older
+# half (from next_column on) on the left and the newer half on the right
+image_style = dict(
+    origin='lower',
+    aspect='auto',
+    cmap='hot',
+    vmin=-140,  # Very low minimum to show everything
+    vmax=-40,
+    interpolation='nearest'
+)
+image = ax2.imshow(spec_db, extent=(0, ROLLING_WINDOW / RATE, 0, stft.frequencies[freq_rows - 1]),
+                   **image_style)
+image_wrapped = ax2.imshow(spec_db[:, :1], **image_style)
+image_wrapped.set_visible(False)
+ax2.set_xlim(0, ROLLING_WINDOW / RATE)
 ax2.set_ylabel('Frequency (Hz)')
 ax2.set_xlabel('Time (s)')
-ax2.set_title('Spectrogram - ALWAYS VISIBLE')
+ax2.set_title('Spectrogram')
+spec_status = ax2.text(0.01, 0.95, '', transform=ax2.transAxes, va='top', fontsize=9, bbox=status_box)
+plt.colorbar(image, ax=ax2, label='Power (dB)')
+
+def write_columns(new_db):
+    """Write new columns at next_column, wrapping around the end"""
+    global next_column
+    new_db = new_db[:, -spec_columns:]
+    first = min(new_db.shape[1], spec_columns - next_column)
+    spec_db[:, next_column:next_column + first] = new_db[:, :first]
+    spec_db[:, :new_db.shape[1] - first] = new_db[:, first:]
+    next_column = (next_column + new_db.shape[1]) % spec_columns
+
+def show_columns():
+    """Point the two images at the wrapped halves of the buffer (no copy)"""
+    split_time = (spec_columns - next_column) * column_seconds
+    top = stft.frequencies[freq_rows - 1]
+    image.set_data(spec_db[:, next_column:])
+    image.set_extent((0, split_time, 0, top))
+    if next_column:
+        image_wrapped.set_data(spec_db[:, :next_column])
+        image_wrapped.set_extent((split_time, ROLLING_WINDOW / RATE, 0, top))
+    image_wrapped.set_visible(next_column > 0)
 
 def update_plot(frame):
-    global buffer
-    
     try:
-        # Read audio
-        chunk = stream.read(CHUNK, exception_on_overflow=False)
-        new_data = np.frombuffer(chunk, dtype=np.float32)
-        
-        if len(new_data) == 0:
-            return line,
-        
-        # Update buffer
-        buffer = np.roll(buffer, -len(new_data))
-        buffer[-len(new_data):] = new_data
-        
-        # Update waveform
-        line.set_ydata(buffer)
-        
-        # Calculate signal stats
-        rms = np.sqrt(np.mean(buffer**2))
-        max_amp = np.max(np.abs(buffer))
+        # The callback already wrote the audio; summarise only the new part
+        envelope.update(ring)
+        columns = stft.process(ring)
         
-        # Dynamic y-axis for waveform
-        if max_amp > 1e-6:
-            ax1.set_ylim(-max_amp*1.2, max_amp*1.2)
-        else:
-            ax1.set_ylim(-0.001, 0.001)  # Very small range for quiet signals
-        
-        ax1.set_title(f'Audio Waveform (RMS: {rms:.2e}, Max: {max_amp:.2e})')
-        
-        # FORCE SPECTROGRAM DISPLAY
-        ax2.clear()
-        ax2.set_ylabel('Frequency (Hz)')
-        ax2.set_xlabel('Time (s)')
+        # Calculate signal stats from the envelope columns
+        rms = np.sqrt(np.mean(envelope.rms ** 2))
+        max_amp = max(np.max(envelope.maxs), -np.min(envelope.mins))
         
-        # Prepare signal for spectrogram
-        display_signal = buffer.copy()
+        # Update waveform (scaled instead of changing the y-axis, which blitting can't redraw)
+        scale = 1 / max_amp if max_amp > 1e-6 else 1000.0
+        wave_y[0::2] = envelope.ordered(envelope.mins)
+        wave_y[1::2] = envelope.ordered(envelope.maxs)
+        np.multiply(wave_y, scale, out=wave_y)
+        line.set_ydata(wave_y)
+        wave_status.set_text(f'RMS: {rms:.2e}, Max: {max_amp:.2e}')
         
-        # If signal is too quiet, amplify it dramatically
+        # If signal is too quiet, amplify it dramatically (in dB: power gain)
         if rms < 1e-4:
-            display_signal = display_signal * 10000  # Multiply by 10,000
-            amplification_text = " (Amplified x10,000)"
+            gain_db = 80  # Multiply by 10,000
+            amplification_text = "Amplified x10,000, "
         elif rms < 1e-3:
-            display_signal = display_signal * 1000   # Multiply by 1,000
-            amplification_text = " (Amplified x1,000)"
+            gain_db = 60  # Multiply by 1,000
+            amplification_text = "Amplified x1,000, "
         else:
+            gain_db = 0
             amplification_text = ""
         
-        # Add small noise to prevent log(0) errors
-        display_signal = display_signal + np.random.normal(0, 1e-10, len(display_signal))
-        
-        try:
-            # ALWAYS compute spectrogram
-            Pxx, freqs, bins, im = ax2.specgram(
-                display_signal,
-                NFFT=512,
-                Fs=RATE,
-                noverlap=256,
-                cmap='hot',
-                vmin=-140,  # Very low minimum to show everything
-                vmax=-40
-            )
-            
-            ax2.set_ylim(0, 4000)  # Show up to 4kHz
-            ax2.set_title(f'Spectrogram{amplification_text} (RMS: {rms:.2e})')
-            
-            # Add colorbar once
-            if not hasattr(update_plot, 'colorbar_added'):
-                try:
-                    plt.colorbar(im, ax=ax2, label='Power (dB)')
-                    update_plot.colorbar_added = True
-                except:
-                    pass
-                    
-        except Exception as e:
-            ax2.text(0.5, 0.5, f'Spectrogram Error: {str(e)[:50]}', 
-                   transform=ax2.transAxes, ha='center', va='center',
-                   fontsize=10, color='red')
-        
-        return line,
+        # Write only the new columns; the images just move their split point
+        if columns.shape[1]:
+            write_columns(10 * np.log10(columns[:freq_rows] + 1e-20) + gain_db)
+            show_columns()
+        spec_status.set_text(f'{amplification_text}RMS: {rms:.2e}')
     
     except Exception as e:
         print(f"Update error: {e}")
-        return line,
+    
+    return line, image, image_wrapped, wave_status, spec_status
 
-print("Starting FORCED spectrogram display...")
+print("Starting live spectrogram display...")
 print("This version will show spectrogram even for very quiet signals!")
 print("Make some noise to see better results!")
 
 plt.tight_layout()
 
 try:
-    ani = animation.FuncAnimation(fig, update_plot, interval=100, blit=False, cache_frame_data=False)
+    stream.start_stream()
+    ani = animation.FuncAnimation(fig, update_plot, interval=1000 // FPS, blit=True, cache_frame_data=False)
     plt.show()
 except KeyboardInterrupt:
     print("Stopped by user")
@@ -176,4 +217,4 @@ finally:
         p.terminate()
     except:
         pass
-    print("Done!")
\ No newline at end of file
+    print("Done!")
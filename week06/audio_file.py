@@ -0,0 +1,300 @@
+#!/usr/bin/env python3
+"""
+Audio file input for the spectrogram tools.
+
+WAV files are memory-mapped; FLAC (and anything else libsndfile reads) is
+streamed in blocks with soundfile when it is installed. analyze_file splits
+a recording into chunks and computes the spectrogram, RMS and peak frequency
+of every STFT frame in parallel processes, caching the result as .npz next
+to the recording. FilePlayer feeds a file into an AudioRingBuffer at real
+time speed, so the live visualizers can show a recording instead of the
+microphone.
+
+Usage:
+    python audio_file.py recording.wav              # analyze and cache
+    python audio_file.py recording.flac --workers 8
+"""
+
+import argparse
+import hashlib
+import os
+import threading
+import time
+from multiprocessing import Pool
+from pathlib import Path
+import numpy as np
+from scipy.io import wavfile
+from stft_engine import IncrementalSTFT
+
+try:
+    import soundfile
+except ImportError:
+    soundfile = None
+
+CACHE_VERSION = 1
+
+
+class AudioFileSource:
+    """Random-access mono float32 reader for an audio file"""
+
+    def __init__(self, path):
+        self.path = str(path)
+        self.sound = None
+        if self.path.lower().endswith('.wav'):
+            try:
+                self.rate, data = wavfile.read(self.path, mmap=True)
+            except ValueError:
+                # e.g. 24-bit PCM, which can't be memory-mapped
+                self.rate, data = wavfile.read(self.path)
+            self.data = data if data.ndim == 2 else data[:, None]
+            self.frames = len(self.data)
+            if np.issubdtype(self.data.dtype, np.integer):
+                info = np.iinfo(self.data.dtype)
+                self.offset = (info.max + 1 + info.min) / 2  # 128 for unsigned 8-bit, else 0
+                self.scale = 1.0 / (info.max - self.offset + 1)
+            else:
+                self.offset, self.scale = 0.0, 1.0
+        else:
+            if soundfile is None:
+                raise RuntimeError("soundfile not installed. Install with: pip install soundfile")
+            self.sound = soundfile.SoundFile(self.path)
+            self.rate = self.sound.samplerate
+            self.frames = self.sound.frames
+
+    @property
+    def duration(self):
+        return self.frames / self.rate
+
+    def read(self, start, count, out=None):
+        """Frames [start, start + count) mixed to mono float32 (short at the end of the file)"""
+        count = max(min(count, self.frames - start), 0)
+        if out is None:
+            out = np.zeros(count, dtype=np.float32)
+        out = out[:count]
+        if self.sound is not None:
+            self.sound.seek(start)
+            block = self.sound.read(count, dtype='float32', always_2d=True)
+            np.mean(block, axis=1, out=out)
+        else:
+            block = self.data[start:start + count]
+            if block.shape[1] == 1:
+                out[:] = block[:, 0]
+            else:
+                np.mean(block, axis=1, out=out)
+            if self.offset:
+                out -= self.offset
+            out *= self.scale
+        return out
+
+    def close(self):
+        if self.sound is not None:
+            self.sound.close()
+        self.data = None
+
+
+def _analyze_chunk(args):
+    """Worker: STFT features for frames [first, last) of the file"""
+    path, first, last, nfft, hop, max_bin = args
+    source = AudioFileSource(path)
+    stft = IncrementalSTFT(nfft=nfft, hop=hop, rate=source.rate)
+    samples = source.read(first * hop, (last - first - 1) * hop + nfft)
+    source.close()
+
+    power = stft.batch(samples)[:max_bin]
+    frames = np.lib.stride_tricks.sliding_window_view(samples, nfft)[::hop]
+    rms = np.sqrt(np.einsum('ij,ij->i', frames, frames) / nfft)
+    peak = stft.frequencies[np.argmax(power, axis=0)]
+    spectrogram_db = (10 * np.log10(power + 1e-12)).astype(np.float16)
+    return first, spectrogram_db, rms.astype(np.float32), peak.astype(np.float32)
+
+
+def cache_path(path, nfft, hop, max_freq):
+    """Cache file next to the recording, keyed by its size/mtime and the analysis settings"""
+    path = Path(path)
+    stat = path.stat()
+    key = f"{CACHE_VERSION}:{path.resolve()}:{stat.st_size}:{stat.st_mtime_ns}:{nfft}:{hop}:{max_freq}"
+    digest = hashlib.sha1(key.encode()).hexdigest()[:12]
+    return path.with_name(f"{path.stem}.analysis-{digest}.npz")
+
+
+def analyze_file(path, nfft=1024, hop=512, max_freq=None, workers=None,
+                 chunk_seconds=30, use_cache=True):
+    """
+    Spectrogram, RMS and peak frequency for every STFT frame of a file
+
+    Args:
+        path: WAV (memory-mapped) or any soundfile-readable file
+        nfft, hop: STFT frame size and hop in samples
+        max_freq: Keep only bins up to this frequency (None = all)
+        workers: Processes to use (None = all CPUs)
+        chunk_seconds: Audio per work item
+        use_cache: Load/save results from an .npz next to the file
+
+    Returns:
+        dict: 'spectrogram_db' (bins, frames) float16, 'rms' and 'peak_freq'
+        (frames,), 'times' (frames,), 'frequencies' (bins,), 'rate'
+    """
+    cache = cache_path(path, nfft, hop, max_freq)
+    if use_cache and cache.exists():
+        with np.load(cache) as cached:
+            return {name: cached[name] for name in cached.files}
+
+    source = AudioFileSource(path)
+    rate, total = source.rate, source.frames
+    source.close()
+
+    frequencies = np.fft.rfftfreq(nfft, 1 / rate)
+    max_bin = len(frequencies)
+    if max_freq is not None:
+        max_bin = min(int(np.searchsorted(frequencies, max_freq)) + 1, max_bin)
+    n_frames = max((total - nfft) // hop + 1, 0)
+
+    spectrogram_db = np.zeros((max_bin, n_frames), dtype=np.float16)
+    rms = np.zeros(n_frames, dtype=np.float32)
+    peak_freq = np.zeros(n_frames, dtype=np.float32)
+
+    frames_per_chunk = max(int(chunk_seconds * rate) // hop, 1)
+    jobs = [
+        (str(path), first, min(first + frames_per_chunk, n_frames), nfft, hop, max_bin)
+        for first in range(0, n_frames, frames_per_chunk)
+    ]
+    with Pool(workers) as pool:
+        for first, chunk_db, chunk_rms, chunk_peak in pool.imap_unordered(_analyze_chunk, jobs):
+            last = first + len(chunk_rms)
+            spectrogram_db[:, first:last] = chunk_db
+            rms[first:last] = chunk_rms
+            peak_freq[first:last] = chunk_peak
+
+    result = {
+        'spectrogram_db': spectrogram_db,
+        'rms': rms,
+        'peak_freq': peak_freq,
+        'times': (np.arange(n_frames) * hop + nfft / 2) / rate,
+        'frequencies': frequencies[:max_bin],
+        'rate': np.array(rate),
+    }
+    if use_cache:
+        np.savez(cache, **result)
+    return result
+
+
+class FilePlayer:
+    """
+    Feed an audio file into an AudioRingBuffer in real time
+
+    With a PyAudio instance the file is also played through the speakers and
+    the output callback sets the pace; without one a thread keeps time with
+    the clock. It has the same start/stop/is_active methods as a PyAudio
+    stream, so the visualizers can treat it as their input stream.
+    """
+
+    def __init__(self, source, ring, chunk=1024, p=None, loop=False):
+        self.source = source
+        self.ring = ring
+        self.chunk = chunk
+        self.loop = loop
+        self.position = 0
+        self.block = np.zeros(chunk, dtype=np.float32)
+        self.running = False
+        self.stream = None
+        self.thread = None
+        if p is not None:
+            import pyaudio
+            self._continue, self._complete = pyaudio.paContinue, pyaudio.paComplete
+            self.stream = p.open(format=pyaudio.paFloat32,
+                                 channels=1,
+                                 rate=source.rate,
+                                 output=True,
+                                 frames_per_buffer=chunk,
+                                 stream_callback=self._callback,
+                                 start=False)
+
+    def _next_block(self, count):
+        n = len(self.source.read(self.position, count, out=self.block))
+        self.position += n
+        if n < count and self.loop:
+            # Wrap around to the start of the file
+            rest = len(self.source.read(0, count - n, out=self.block[n:]))
+            self.position = rest
+            n += rest
+        return self.block[:n]
+
+    def _callback(self, in_data, frame_count, time_info, status):
+        block = self._next_block(frame_count)
+        self.ring.write(block)
+        out = self.block[:frame_count]
+        out[len(block):] = 0
+        done = len(block) < frame_count
+        if done:
+            self.running = False
+        return (out.tobytes(), self._complete if done else self._continue)
+
+    def _run(self):
+        start = time.perf_counter()
+        played = 0
+        while self.running:
+            block = self._next_block(self.chunk)
+            if len(block) == 0:
+                break
+            self.ring.write(block)
+            played += len(block)
+            delay = start + played / self.source.rate - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+        self.running = False
+
+    def start_stream(self):
+        self.running = True
+        if self.stream is not None:
+            self.stream.start_stream()
+        else:
+            self.thread = threading.Thread(target=self._run, daemon=True)
+            self.thread.start()
+
+    def is_active(self):
+        return self.running
+
+    def stop_stream(self):
+        self.running = False
+        if self.stream is not None:
+            self.stream.stop_stream()
+        elif self.thread is not None:
+            self.thread.join()
+
+    def close(self):
+        if self.stream is not None:
+            self.stream.close()
+        self.source.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Analyze an audio file offline")
+    parser.add_argument("path", help="WAV or FLAC file")
+    parser.add_argument("--nfft", type=int, default=1024)
+    parser.add_argument("--hop", type=int, default=512)
+    parser.add_argument("--max-freq", type=float, default=None, help="Highest frequency to keep (Hz)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="Worker processes")
+    parser.add_argument("--no-cache", action="store_true", help="Always recompute")
+    args = parser.parse_args()
+
+    source = AudioFileSource(args.path)
+    duration = source.duration
+    source.close()
+    print(f"🎵 {args.path}: {duration:.1f} s")
+
+    start = time.perf_counter()
+    result = analyze_file(args.path, nfft=args.nfft, hop=args.hop, max_freq=args.max_freq,
+                          workers=args.workers, use_cache=not args.no_cache)
+    elapsed = time.perf_counter() - start
+
+    loud = result['rms'] > 0.01
+    print(f"✅ {len(result['rms'])} frames in {elapsed:.2f} s ({duration / elapsed:.0f}x real time)")
+    print(f"📊 RMS mean {result['rms'].mean():.4f}, max {result['rms'].max():.4f}")
+    if loud.any():
+        print(f"📊 Median peak frequency (RMS > 0.01): {np.median(result['peak_freq'][loud]):.0f} Hz")
+    if not args.no_cache:
+        print(f"💾 Cached: {cache_path(args.path, args.nfft, args.hop, args.max_freq)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,404 @@
+"""
+Callback-driven audio I/O for the week06 examples.
+
+PortAudio calls stream callbacks on its own thread. The callbacks here only
+copy the chunk into a preallocated AudioRingBuffer (one producer, one
+consumer) and, for asyncio consumers, schedule a single wake-up on the event
+loop with loop.call_soon_threadsafe. Nothing in a callback blocks, allocates
+a queue item or touches an asyncio object directly.
+"""
+
+import asyncio
+import threading
+import time
+import numpy as np
+import pyaudio
+from ring_buffer import AudioRingBuffer
+
+NUMPY_FORMATS = {
+    pyaudio.paInt16: np.int16,
+    pyaudio.paInt32: np.int32,
+    pyaudio.paFloat32: np.float32,
+}
+
+
+class LoopWaker:
+    """Wake an asyncio consumer from another thread, at most once per wait"""
+
+    def __init__(self):
+        self.loop = None
+        self.event = None
+        self.scheduled = False
+
+    def bind(self, loop=None):
+        """Attach to the running event loop (call from the consumer)"""
+        self.loop = loop or asyncio.get_running_loop()
+        self.event = asyncio.Event()
+
+    def wake(self):
+        """Called from the audio thread"""
+        if self.loop is None or self.scheduled:
+            return
+        self.scheduled = True
+        try:
+            self.loop.call_soon_threadsafe(self._set)
+        except RuntimeError:
+            pass  # event loop already closed
+
+    def _set(self):
+        self.scheduled = False
+        self.event.set()
+
+    async def wait(self):
+        await self.event.wait()
+        self.event.clear()
+
+
+class AudioInput:
+    """
+    Input stream whose callback writes into a ring buffer
+
+    Usage:
+        mic = AudioInput(p, chunk=256)
+        mic.start()
+        async for block in mic.chunks():
+            ...
+    """
+
+    def __init__(self, p, rate=44100, channels=1, chunk=1024, format=pyaudio.paInt16,
+                 device=None, buffer_chunks=32):
+        """
+        Args:
+            p: pyaudio.PyAudio instance
+            rate: Sample rate in Hz
+            channels: Interleaved channels per frame
+            chunk: Frames per callback (and per block from chunks())
+            format: pyaudio sample format (paInt16, paInt32 or paFloat32)
+            device: Input device index (None = default)
+            buffer_chunks: Ring buffer size in chunks before old audio is overwritten
+        """
+        self.chunk = chunk
+        self.channels = channels
+        self.dtype = NUMPY_FORMATS[format]
+        self.ring = AudioRingBuffer(chunk * channels * buffer_chunks, dtype=self.dtype)
+        self.waker = LoopWaker()
+        self.status_flags = 0  # callbacks where PortAudio reported an overflow
+        self.stream = p.open(format=format,
+                             channels=channels,
+                             rate=rate,
+                             input=True,
+                             input_device_index=device,
+                             frames_per_buffer=chunk,
+                             stream_callback=self._callback,
+                             start=False)
+
+    def _callback(self, in_data, frame_count, time_info, status):
+        if status:
+            self.status_flags += 1
+        self.ring.write(np.frombuffer(in_data, dtype=self.dtype))
+        self.waker.wake()
+        return (None, pyaudio.paContinue)
+
+    def start(self):
+        self.stream.start_stream()
+
+    async def chunks(self):
+        """
+        Yield blocks of `chunk` frames as soon as the callback delivers them
+
+        A block may be a view into the ring buffer: use or copy it before the
+        next iteration.
+        """
+        self.waker.bind()
+        size = self.chunk * self.channels
+        while True:
+            while self.ring.available() >= size:
+                yield self.ring.read(size)
+            await self.waker.wait()
+
+    def stats(self):
+        return {
+            'overruns': self.ring.overruns,
+            'underruns': self.ring.underruns,
+            'status_flags': self.status_flags,
+        }
+
+    def close(self):
+        self.stream.stop_stream()
+        self.stream.close()
+
+
+class AudioOutput:
+    """Output stream whose callback plays whatever has been written to its ring buffer"""
+
+    def __init__(self, p, rate=44100, channels=1, chunk=1024, format=pyaudio.paInt16,
+                 device=None, buffer_chunks=8):
+        self.rate = rate
+        self.chunk = chunk
+        self.channels = channels
+        self.dtype = NUMPY_FORMATS[format]
+        self.ring = AudioRingBuffer(chunk * channels * buffer_chunks, dtype=self.dtype)
+        self.out = np.zeros(chunk * channels, dtype=self.dtype)
+        self.status_flags = 0  # callbacks where PortAudio reported an underflow
+        self.stream = p.open(format=format,
+                             channels=channels,
+                             rate=rate,
+                             output=True,
+                             output_device_index=device,
+                             frames_per_buffer=chunk,
+                             stream_callback=self._callback,
+                             start=False)
+
+    def _callback(self, in_data, frame_count, time_info, status):
+        if status:
+            self.status_flags += 1
+        out = self.out[:frame_count * self.channels]
+        self.ring.readinto(out)  # silence (and an underrun) if we ran dry
+        return (out.tobytes(), pyaudio.paContinue)
+
+    def write(self, samples):
+        """Queue samples for playback (from one producer thread or task)"""
+        self.ring.write(samples)
+
+    def write_all(self, samples, lead_chunks=4):
+        """
+        Queue samples of any length, one chunk at a time
+
+        Blocks while more than `lead_chunks` chunks are waiting, so long clips
+        never overrun the ring buffer.
+        """
+        size = self.chunk * self.channels
+        lead = size * lead_chunks
+        ring = self.ring
+        for start in range(0, len(samples), size):
+            while ring.write_count - ring.read_count >= lead:
+                time.sleep(self.chunk / self.rate / 2)
+            ring.write(samples[start:start + size])
+
+    def start(self):
+        self.stream.start_stream()
+
+    def stats(self):
+        return {
+            'overruns': self.ring.overruns,
+            'underruns': self.ring.underruns,
+            'status_flags': self.status_flags,
+        }
+
+    def close(self):
+        self.stream.stop_stream()
+        self.stream.close()
+
+
+# PortAudio callback status flags
+STATUS_FLAGS = {
+    'input_underflow': pyaudio.paInputUnderflow,
+    'input_overflow': pyaudio.paInputOverflow,
+    'output_underflow': pyaudio.paOutputUnderflow,
+    'output_overflow': pyaudio.paOutputOverflow,
+}
+
+
+class DuplexLoopback:
+    """
+    One full-duplex stream that copies input to output inside the callback
+
+    The block passes through an optional DSP callable as float32 in [-1, 1]:
+    dsp(block) processes it in place. `dsp` can be replaced from another
+    thread at any time.
+
+    Usage:
+        loopback = DuplexLoopback(p, chunk=128)
+        loopback.start()
+        print(loopback.measure_latency())
+    """
+
+    def __init__(self, p, rate=44100, channels=1, chunk=256, format=pyaudio.paInt16,
+                 input_device=None, output_device=None, dsp=None):
+        """
+        Args:
+            p: pyaudio.PyAudio instance
+            rate: Sample rate in Hz
+            channels: Channels for both input and output
+            chunk: Frames per callback; the loopback delay is a small multiple of this
+            format: pyaudio sample format (paInt16, paInt32 or paFloat32)
+            input_device, output_device: Device indices (None = default)
+            dsp: Optional callable processing a float32 block in place
+        """
+        self.rate = rate
+        self.channels = channels
+        self.chunk = chunk
+        self.dtype = NUMPY_FORMATS[format]
+        self.dsp = dsp
+
+        # int formats are scaled to float32 [-1, 1] for the DSP and back
+        if np.issubdtype(self.dtype, np.integer):
+            self.in_scale = 1.0 / (np.iinfo(self.dtype).max + 1)
+            self.out_scale = float(np.iinfo(self.dtype).max)
+        else:
+            self.in_scale = self.out_scale = 1.0
+        self.block = np.zeros(chunk * channels, dtype=np.float32)
+        self.out = np.zeros(chunk * channels, dtype=self.dtype)
+
+        self.frames = 0
+        self.callbacks = 0
+        self.flag_counts = {name: 0 for name in STATUS_FLAGS}
+        self.callback_time = [0.0, 0.0]  # total, max seconds spent in the callback
+
+        # Click-injection latency test state
+        self.click_frame = None
+        self.click_threshold = 0.1
+        self.latency_frames = None
+        self.latency_done = threading.Event()
+
+        self.stream = p.open(format=format,
+                             channels=channels,
+                             rate=rate,
+                             input=True,
+                             output=True,
+                             input_device_index=input_device,
+                             output_device_index=output_device,
+                             frames_per_buffer=chunk,
+                             stream_callback=self._callback,
+                             start=False)
+
+    def _callback(self, in_data, frame_count, time_info, status):
+        start = time.perf_counter()
+        if status:
+            for name, flag in STATUS_FLAGS.items():
+                if status & flag:
+                    self.flag_counts[name] += 1
+
+        samples = np.frombuffer(in_data, dtype=self.dtype)
+        block = self.block[:len(samples)]
+        np.multiply(samples, self.in_scale, out=block)
+
+        if self.click_frame is not None:
+            self._listen_for_click(block)
+
+        dsp = self.dsp
+        if dsp is not None:
+            dsp(block)
+
+        if self.click_frame == -1:
+            # Inject the click at the start of this output block
+            block[:self.channels] = 1.0
+            self.click_frame = self.frames
+
+        out = self.out[:len(samples)]
+        np.clip(block, -1.0, 1.0, out=block)
+        block *= self.out_scale
+        out[:] = block
+
+        self.frames += frame_count
+        self.callbacks += 1
+        elapsed = time.perf_counter() - start
+        self.callback_time[0] += elapsed
+        self.callback_time[1] = max(self.callback_time[1], elapsed)
+        return (out.tobytes(), pyaudio.paContinue)
+
+    def _listen_for_click(self, block):
+        if self.click_frame < 0:
+            return
+        loud = np.flatnonzero(np.abs(block) > self.click_threshold)
+        if len(loud):
+            self.latency_frames = self.frames + loud[0] // self.channels - self.click_frame
+            self.click_frame = None
+            self.latency_done.set()
+
+    def start(self):
+        self.stream.start_stream()
+
+    def measure_latency(self, threshold=0.1, timeout=1.0):
+        """
+        Round-trip latency from output to input, in seconds
+
+        Plays one click and times how long it takes to come back in. Needs a
+        physical loopback (cable, or speaker near the microphone) and a quiet
+        room; returns None if no click is heard within `timeout`.
+        """
+        self.click_threshold = threshold
+        self.latency_frames = None
+        self.latency_done.clear()
+        self.click_frame = -1  # picked up by the next callback
+        if not self.latency_done.wait(timeout):
+            self.click_frame = None
+            return None
+        return self.latency_frames / self.rate
+
+    def stats(self):
+        total, worst = self.callback_time
+        return {
+            'callbacks': self.callbacks,
+            **self.flag_counts,
+            'callback_ms_mean': total / max(self.callbacks, 1) * 1000,
+            'callback_ms_max': worst * 1000,
+            'budget_ms': self.chunk / self.rate * 1000,
+        }
+
+    def close(self):
+        self.stream.stop_stream()
+        self.stream.close()
+
+
+class GeneratorOutput:
+    """
+    Output stream that asks a generator for every block
+
+    The callback hands a slice of one preallocated float32 buffer to
+    `generator(out)`, which must fill it in place. Any object with that
+    signature works: the sources in sources.py, ClipLooper.fill, ...
+    """
+
+    def __init__(self, p, generator, rate=44100, channels=1, chunk=1024, device=None):
+        self.generator = generator  # can be swapped while running
+        self.rate = rate
+        self.channels = channels
+        self.chunk = chunk
+        self.out = np.zeros(chunk * channels, dtype=np.float32)
+
+        self.frames = 0
+        self.callbacks = 0
+        self.underflows = 0
+        self.callback_time = [0.0, 0.0]  # total, max seconds spent generating
+
+        self.stream = p.open(format=pyaudio.paFloat32,
+                             channels=channels,
+                             rate=rate,
+                             output=True,
+                             output_device_index=device,
+                             frames_per_buffer=chunk,
+                             stream_callback=self._callback,
+                             start=False)
+
+    def _callback(self, in_data, frame_count, time_info, status):
+        start = time.perf_counter()
+        if status & pyaudio.paOutputUnderflow:
+            self.underflows += 1
+        out = self.out[:frame_count * self.channels]
+        self.generator(out)
+
+        self.frames += frame_count
+        self.callbacks += 1
+        elapsed = time.perf_counter() - start
+        self.callback_time[0] += elapsed
+        self.callback_time[1] = max(self.callback_time[1], elapsed)
+        return (out.tobytes(), pyaudio.paContinue)
+
+    def start(self):
+        self.stream.start_stream()
+
+    def stats(self):
+        total, worst = self.callback_time
+        audio_seconds = self.frames / self.rate
+        return {
+            'callbacks': self.callbacks,
+            'underflows': self.underflows,
+            'callback_ms_mean': total / max(self.callbacks, 1) * 1000,
+            'callback_ms_max': worst * 1000,
+            'cpu_load': total / audio_seconds if audio_seconds else 0.0,
+        }
+
+    def close(self):
+        self.stream.stop_stream()
+        self.stream.close()
@@ -0,0 +1,157 @@
+"""
+Looping clip playback for generated audio.
+
+ClipLooper turns a finished clip into a seamless loop (its tail crossfaded
+into its head) and crossfades into the next clip as soon as one is handed
+over. ClipPlayer runs a feeder thread that keeps an AudioOutput ring buffer
+a few chunks ahead of the sound card, writing one bounded chunk at a time,
+so new clips can arrive from a generation thread while audio keeps playing.
+"""
+
+import threading
+import time
+import numpy as np
+import pyaudio
+from audio_io import AudioOutput
+
+
+def make_loop(clip, crossfade):
+    """
+    A loop of `clip` whose end flows back into its start
+
+    The first `crossfade` samples are the clip head faded in over the clip
+    tail, so playing the result repeatedly has no click at the seam.
+    An empty clip raises ValueError (there is nothing to loop).
+    """
+    clip = np.asarray(clip, dtype=np.float32)
+    if len(clip) == 0:
+        raise ValueError("Cannot loop an empty clip")
+    crossfade = min(crossfade, len(clip) // 2)
+    if crossfade == 0:
+        return clip.copy()
+    loop = clip[:len(clip) - crossfade].copy()
+    fade_in = np.linspace(0, 1, crossfade, dtype=np.float32)
+    loop[:crossfade] = clip[:crossfade] * fade_in + clip[len(clip) - crossfade:] * (1 - fade_in)
+    return loop
+
+
+class ClipLooper:
+    """Fill blocks from the current loop, crossfading to the next clip"""
+
+    def __init__(self, rate, crossfade=0.5, chunk=1024):
+        self.crossfade = int(crossfade * rate)
+        self.loop = None
+        self.position = 0
+        self.pending = None   # set from the generation thread
+        self.incoming = None  # (loop, position) being faded in
+        self.fade_done = 0
+        self.fade = np.linspace(0, 1, max(self.crossfade, 1), dtype=np.float32)
+        self.other = np.zeros(chunk, dtype=np.float32)
+        self.gain = np.zeros(chunk, dtype=np.float32)
+
+    def set_clip(self, clip):
+        """Hand over a new clip (safe to call from another thread); empty clips raise ValueError"""
+        self.pending = make_loop(clip, self.crossfade)
+
+    @staticmethod
+    def _read(loop, position, out):
+        """Copy from a loop into out, wrapping around; returns the new position"""
+        filled = 0
+        while filled < len(out):
+            n = min(len(out) - filled, len(loop) - position)
+            out[filled:filled + n] = loop[position:position + n]
+            filled += n
+            position = (position + n) % len(loop)
+        return position
+
+    def fill(self, out):
+        pending = self.pending
+        if pending is not None and self.incoming is None:
+            self.pending = None
+            if self.loop is None:
+                self.loop, self.position = pending, 0
+            else:
+                self.incoming = [pending, 0]
+                self.fade_done = 0
+
+        if self.loop is None:
+            out[:] = 0
+            return
+
+        self.position = self._read(self.loop, self.position, out)
+        if self.incoming is None:
+            return
+
+        # Crossfade from the current loop into the new one
+        n = len(out)
+        other = self.other[:n]
+        self.incoming[1] = self._read(self.incoming[0], self.incoming[1], other)
+        gain = self.gain[:n]
+        ramp = self.fade[self.fade_done:self.fade_done + n]
+        gain[:len(ramp)] = ramp
+        gain[len(ramp):] = 1
+        other -= out
+        other *= gain
+        out += other  # out * (1 - gain) + other * gain
+        self.fade_done += n
+        if self.fade_done >= self.crossfade:
+            self.loop, self.position = self.incoming
+            self.incoming = None
+
+
+class ClipPlayer:
+    """
+    Play generated clips without waiting for them
+
+    Usage:
+        player = ClipPlayer(p, rate=16000)
+        player.start()
+        player.play(audio)   # from any thread; loops until the next clip
+    """
+
+    def __init__(self, p, rate=16000, chunk=1024, crossfade=0.5, lead_chunks=4):
+        """
+        Args:
+            p: pyaudio.PyAudio instance
+            rate: Sample rate of the clips
+            chunk: Frames per write and per output callback
+            crossfade: Seconds of crossfade at the loop seam and between clips
+            lead_chunks: How far ahead of playback the feeder keeps the ring buffer
+        """
+        self.rate = rate
+        self.chunk = chunk
+        self.lead = chunk * lead_chunks
+        self.looper = ClipLooper(rate, crossfade, chunk)
+        self.output = AudioOutput(p, rate=rate, chunk=chunk, format=pyaudio.paFloat32,
+                                  buffer_chunks=lead_chunks * 2)
+        self.block = np.zeros(chunk, dtype=np.float32)
+        self.running = False
+        self.thread = None
+
+    def play(self, clip):
+        self.looper.set_clip(clip)
+
+    def _feed(self):
+        ring = self.output.ring
+        period = self.chunk / self.rate
+        while self.running:
+            if ring.write_count - ring.read_count < self.lead:
+                self.looper.fill(self.block)
+                ring.write(self.block)
+            else:
+                time.sleep(period / 2)
+
+    def start(self):
+        self.running = True
+        self.thread = threading.Thread(target=self._feed, daemon=True)
+        self.thread.start()
+        self.output.start()
+
+    def stats(self):
+        return self.output.stats()
+
+    def close(self):
+        self.running = False
+        if self.thread is not None:
+            self.thread.join()
+        self.output.close()
@@ -0,0 +1,269 @@
+#!/usr/bin/env python3
+"""
+Real-time effect chain for the loopback scripts.
+
+Effects work in place on mono float32 blocks and keep their state between
+blocks (filter state, delay line, compressor envelope), so they can run
+inside an audio callback. EffectChain is the `dsp` callable for
+DuplexLoopback: it times every effect per block, and its effect list can be
+replaced from another thread while audio is running.
+
+Run this file directly to see how many of each effect fit inside the
+callback deadline at 64, 128 and 256 sample buffers.
+"""
+
+import time
+from abc import ABC, abstractmethod
+import numpy as np
+from scipy import signal
+
+
+class Effect(ABC):
+    """Base class: process(block) modifies a float32 block in place"""
+
+    def __init__(self):
+        self.timing = [0.0, 0, 0.0]  # total seconds, blocks, worst seconds
+
+    @abstractmethod
+    def process(self, block):
+        """Modify one float32 block in place (runs in the audio callback)"""
+
+    def reset(self):
+        pass
+
+    @property
+    def name(self):
+        return type(self).__name__
+
+
+class Gain(Effect):
+    def __init__(self, db=0.0):
+        super().__init__()
+        self.set_db(db)
+
+    def set_db(self, db):
+        self.gain = np.float32(10 ** (db / 20))
+
+    def process(self, block):
+        block *= self.gain
+
+
+class Biquad(Effect):
+    """
+    Cascaded biquad (second-order sections) filter
+
+    Uses scipy.signal.sosfilt with the filter state carried from block to
+    block. sosfilt returns new arrays, so this is the one effect that
+    allocates (two small arrays per block).
+    """
+
+    def __init__(self, sos, label='Biquad'):
+        super().__init__()
+        self.sos = np.asarray(sos, dtype=np.float64)
+        self.zi = np.zeros((len(self.sos), 2))
+        self.label = label
+
+    @classmethod
+    def lowpass(cls, cutoff, rate, order=2):
+        return cls(signal.butter(order, cutoff, 'lowpass', fs=rate, output='sos'), f'Lowpass {cutoff:g} Hz')
+
+    @classmethod
+    def highpass(cls, cutoff, rate, order=2):
+        return cls(signal.butter(order, cutoff, 'highpass', fs=rate, output='sos'), f'Highpass {cutoff:g} Hz')
+
+    @classmethod
+    def bandpass(cls, low, high, rate, order=2):
+        return cls(signal.butter(order, (low, high), 'bandpass', fs=rate, output='sos'),
+                   f'Bandpass {low:g}-{high:g} Hz')
+
+    def process(self, block):
+        filtered, self.zi = signal.sosfilt(self.sos, block, zi=self.zi)
+        block[:] = filtered
+
+    def reset(self):
+        self.zi[:] = 0
+
+    @property
+    def name(self):
+        return self.label
+
+
+class Delay(Effect):
+    """
+    Feedback delay line (echo)
+
+    The delay must be at least one block long, so every delayed sample of a
+    block is already in the line and the block is processed in one pass.
+    """
+
+    def __init__(self, seconds, rate, feedback=0.35, mix=0.4, max_seconds=2.0, max_block=4096):
+        super().__init__()
+        self.rate = rate
+        self.feedback = np.float32(feedback)
+        self.mix = np.float32(mix)
+        self.line = np.zeros(int(max_seconds * rate) + max_block, dtype=np.float32)
+        self.delayed = np.zeros(max_block, dtype=np.float32)
+        self.feed = np.zeros(max_block, dtype=np.float32)
+        self.write_pos = 0
+        self.set_time(seconds)
+
+    def set_time(self, seconds):
+        self.delay_samples = min(max(int(seconds * self.rate), 1), len(self.line) - len(self.delayed))
+
+    def _copy_from_line(self, start, out):
+        size = len(self.line)
+        start %= size
+        first = min(len(out), size - start)
+        out[:first] = self.line[start:start + first]
+        out[first:] = self.line[:len(out) - first]
+
+    def _copy_to_line(self, start, values):
+        size = len(self.line)
+        first = min(len(values), size - start)
+        self.line[start:start + first] = values[:first]
+        self.line[:len(values) - first] = values[first:]
+
+    def process(self, block):
+        n = len(block)
+        delay = max(self.delay_samples, n)
+        delayed = self.delayed[:n]
+        self._copy_from_line(self.write_pos - delay, delayed)
+
+        # Feed the line with input + feedback, then mix the echo into the output
+        feed = self.feed[:n]
+        np.multiply(delayed, self.feedback, out=feed)
+        feed += block
+        self._copy_to_line(self.write_pos, feed)
+        delayed *= self.mix
+        block += delayed
+        self.write_pos = (self.write_pos + n) % len(self.line)
+
+    def reset(self):
+        self.line[:] = 0
+
+
+class Compressor(Effect):
+    """
+    Simple feed-forward compressor with a block-rate envelope
+
+    The level is the RMS of each block; the gain follows it with separate
+    attack and release times and is ramped across the block to avoid
+    zipper noise.
+    """
+
+    def __init__(self, rate, threshold_db=-20.0, ratio=4.0, attack=0.005, release=0.1,
+                 makeup_db=0.0, max_block=4096):
+        super().__init__()
+        self.rate = rate
+        self.threshold_db = threshold_db
+        self.ratio = ratio
+        self.attack = attack
+        self.release = release
+        self.makeup = 10 ** (makeup_db / 20)
+        self.gain = 1.0
+        self.ramps = {}  # block size -> ramp from 1/n to 1, built on first use
+        self.envelope = np.zeros(max_block, dtype=np.float32)
+        self.reduction_db = 0.0
+
+    def process(self, block):
+        n = len(block)
+        level = float(np.sqrt(np.dot(block, block) / n))
+        level_db = 20 * np.log10(level + 1e-9)
+
+        over = level_db - self.threshold_db
+        target_db = -over * (1 - 1 / self.ratio) if over > 0 else 0.0
+
+        # One-pole smoothing at block rate: attack when reducing more, else release
+        tau = self.attack if target_db < self.reduction_db else self.release
+        coeff = np.exp(-n / (tau * self.rate))
+        self.reduction_db = coeff * self.reduction_db + (1 - coeff) * target_db
+        gain = 10 ** (self.reduction_db / 20) * self.makeup
+
+        # Linear ramp from the previous gain to the new one across the block
+        envelope = self.envelope[:n]
+        ramp = self.ramps.get(n)
+        if ramp is None:
+            ramp = self.ramps[n] = np.arange(1, n + 1, dtype=np.float32) / n
+        np.multiply(ramp, gain - self.gain, out=envelope)
+        envelope += self.gain
+        block *= envelope
+        self.gain = gain
+
+    def reset(self):
+        self.gain = 1.0
+        self.reduction_db = 0.0
+
+
+class EffectChain:
+    """
+    Ordered effects applied in place, usable as DuplexLoopback(dsp=...)
+
+    The chain is held as a tuple and replaced in one assignment, so effects
+    can be added, removed or swapped from another thread while the callback
+    is running.
+    """
+
+    def __init__(self, effects=()):
+        self.effects = tuple(effects)
+        self.bypass = False
+
+    def __call__(self, block):
+        if self.bypass:
+            return
+        for effect in self.effects:
+            start = time.perf_counter()
+            effect.process(block)
+            elapsed = time.perf_counter() - start
+            timing = effect.timing
+            timing[0] += elapsed
+            timing[1] += 1
+            if elapsed > timing[2]:
+                timing[2] = elapsed
+
+    def set_effects(self, effects):
+        self.effects = tuple(effects)
+
+    def add(self, effect):
+        self.effects = self.effects + (effect,)
+
+    def remove(self, effect):
+        self.effects = tuple(e for e in self.effects if e is not effect)
+
+    def replace(self, old, new):
+        self.effects = tuple(new if e is old else e for e in self.effects)
+
+    def report(self):
+        """(name, mean µs per block, worst µs per block) for each effect"""
+        return [
+            (effect.name, total / blocks * 1e6 if blocks else 0.0, worst * 1e6)
+            for effect in self.effects
+            for total, blocks, worst in [effect.timing]
+        ]
+
+
+def benchmark(rate=44100, blocks=2000):
+    """Mean time per block for each effect, and how many fit in the callback deadline"""
+    rng = np.random.default_rng(0)
+    for block_size in (64, 128, 256):
+        budget_us = block_size / rate * 1e6
+        print(f"\n📦 {block_size} samples per block (deadline {budget_us:.0f} µs)")
+        effects = [
+            Gain(-6),
+            Biquad.highpass(80, rate),
+            Biquad.lowpass(5000, rate, order=4),
+            Delay(0.25, rate),
+            Compressor(rate),
+        ]
+        chain = EffectChain(effects)
+        audio = (rng.standard_normal(block_size * blocks) * 0.1).astype(np.float32)
+        for i in range(blocks):
+            chain(audio[i * block_size:(i + 1) * block_size])
+        for name, mean_us, worst_us in chain.report():
+            print(f"⏱️  {name:22s} {mean_us:7.1f} µs avg {worst_us:8.1f} µs max | "
+                  f"~{int(budget_us // mean_us):5d} per callback")
+
+
+if __name__ == "__main__":
+    print("🎛️  Effect Chain Benchmark")
+    print("=" * 40)
+    benchmark()
@@ -0,0 +1,143 @@
+"""
+Audio ring buffer shared by the week06 visualizers and analyzers.
+
+Replaces the `np.roll(buffer, -len(new_data))` pattern: a write only copies
+the new chunk, and the rolling window is read back as a NumPy view (no copy)
+whenever it does not wrap around the end of the storage.
+
+It is safe for one producer thread (e.g. a PyAudio callback) and one consumer
+thread: the producer publishes samples by advancing `write_count` only after
+the data has been copied in.
+"""
+
+import numpy as np
+
+
+class AudioRingBuffer:
+    def __init__(self, capacity, dtype=np.float32):
+        self.capacity = capacity
+        self.data = np.zeros(capacity, dtype=dtype)
+        self.scratch = np.zeros(capacity, dtype=dtype)  # used when a read wraps
+
+        self.write_count = 0  # total samples ever written (producer only)
+        self.read_count = 0   # total samples consumed with read() (consumer only)
+
+        self.overruns = 0     # samples lost because the consumer fell behind
+        self.underruns = 0    # reads that asked for more than was available
+
+    # -- producer ---------------------------------------------------------
+
+    def write(self, samples):
+        """Append samples, overwriting the oldest ones. O(len(samples))."""
+        samples = np.asarray(samples)
+        n = len(samples)
+        if n == 0:
+            return
+        if n > self.capacity:
+            samples = samples[-self.capacity:]
+            skipped = n - self.capacity
+            n = self.capacity
+        else:
+            skipped = 0
+
+        start = (self.write_count + skipped) % self.capacity
+        first = min(n, self.capacity - start)
+        self.data[start:start + first] = samples[:first]
+        if first < n:
+            self.data[:n - first] = samples[first:]
+
+        # Publish only after the samples are in place
+        self.write_count += n + skipped
+
+    # -- consumer ---------------------------------------------------------
+
+    def _window(self, end_count, n, out=None):
+        """Samples [end_count - n, end_count) as a view, or copied if they wrap."""
+        end = end_count % self.capacity
+        start = end - n
+        if start >= 0 and end > 0 or n == 0:
+            return self.data[start:end]
+        if end == 0:
+            return self.data[self.capacity - n:]
+        if out is None:
+            out = self.scratch
+        head = -start
+        out[:head] = self.data[start:]
+        out[head:n] = self.data[:end]
+        return out[:n]
+
+    def latest(self, n=None, out=None):
+        """
+        The most recent n samples (default: the whole buffer), oldest first.
+
+        Returns a view into the buffer when the window is contiguous, so the
+        caller must not keep it across writes. Before n samples have been
+        written, the start of the window is zeros, like a fresh np.zeros buffer.
+        """
+        n = self.capacity if n is None else min(n, self.capacity)
+        return self._window(self.write_count, n, out)
+
+    def since(self, count, out=None):
+        """
+        Samples written after the producer's total reached `count`.
+
+        For extra consumers that track their own position instead of using
+        read(). At most `capacity` samples are returned.
+
+        Returns:
+            tuple: (samples, new count to pass next time)
+        """
+        write_count = self.write_count
+        n = min(write_count - count, self.capacity)
+        return self._window(write_count, n, out), write_count
+
+    def available(self):
+        """Samples written but not yet consumed by read()."""
+        return min(self.write_count - self.read_count, self.capacity)
+
+    def _skip_overrun(self, write_count):
+        behind = write_count - self.read_count
+        if behind > self.capacity:
+            self.overruns += behind - self.capacity
+            self.read_count = write_count - self.capacity
+
+    def read(self, n=None, out=None):
+        """
+        Consume the next n unread samples (default: everything unread).
+
+        Returns None (and counts an underrun) if fewer than n are available.
+        """
+        write_count = self.write_count
+        self._skip_overrun(write_count)
+        available = write_count - self.read_count
+        if n is None:
+            n = available
+        elif available < n:
+            self.underruns += 1
+            return None
+        block = self._window(self.read_count + n, n, out)
+        self.read_count += n
+        return block
+
+    def readinto(self, out):
+        """
+        Copy up to len(out) unread samples into out, zero-filling the rest.
+
+        Returns the number of samples copied. Never allocates, so it can be
+        called from an output callback.
+        """
+        write_count = self.write_count
+        self._skip_overrun(write_count)
+        n = min(len(out), write_count - self.read_count)
+        if n < len(out):
+            self.underruns += 1
+            out[n:] = 0
+        if n:
+            out[:n] = self._window(self.read_count + n, n, out[:n])
+        self.read_count += n
+        return n
+
+    def reset(self):
+        self.data[:] = 0
+        self.write_count = 0
+        self.read_count = 0
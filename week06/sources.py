@@ -0,0 +1,72 @@
+"""
+Procedural audio sources for GeneratorOutput.
+
+A source is called with a float32 block and fills it in place, keeping any
+state (random generator, oscillator phase) between calls. Nothing here
+allocates per block, so sources are safe to run inside the audio callback.
+"""
+
+import numpy as np
+
+
+class AudioSource:
+    """Base class: source(out) fills `out` in place"""
+
+    def __call__(self, out):
+        self.fill(out)
+
+    def fill(self, out):
+        raise NotImplementedError
+
+
+class NoiseSource(AudioSource):
+    """Uniform white noise in [offset, offset + amplitude)"""
+
+    def __init__(self, amplitude=0.1, offset=0.0, seed=None):
+        self.rng = np.random.default_rng(seed)
+        self.amplitude = np.float32(amplitude)
+        self.offset = np.float32(offset)
+
+    def fill(self, out):
+        self.rng.random(out=out, dtype=np.float32)
+        out *= self.amplitude
+        if self.offset:
+            out += self.offset
+
+
+class SineSource(AudioSource):
+    """Sine oscillator with continuous phase across blocks"""
+
+    def __init__(self, frequency=440.0, amplitude=0.1, rate=44100, max_block=8192):
+        self.rate = rate
+        self.frequency = frequency
+        self.amplitude = np.float32(amplitude)
+        self.phase = 0.0
+        self.steps = np.arange(max_block, dtype=np.float64)
+        self.phases = np.zeros(max_block, dtype=np.float64)
+
+    def fill(self, out):
+        n = len(out)
+        increment = 2 * np.pi * self.frequency / self.rate
+        phases = self.phases[:n]
+        np.multiply(self.steps[:n], increment, out=phases)
+        phases += self.phase
+        np.sin(phases, out=phases)
+        out[:] = phases
+        out *= self.amplitude
+        self.phase = (self.phase + n * increment) % (2 * np.pi)
+
+
+class MixSource(AudioSource):
+    """Sum of several sources"""
+
+    def __init__(self, sources, max_block=8192):
+        self.sources = tuple(sources)
+        self.scratch = np.zeros(max_block, dtype=np.float32)
+
+    def fill(self, out):
+        out[:] = 0
+        scratch = self.scratch[:len(out)]
+        for source in self.sources:
+            source(scratch)
+            out += scratch
@@ -0,0 +1,136 @@
+"""
+Incremental STFT for the live spectrogram tools.
+
+Instead of re-running scipy.signal.spectrogram over the last second of audio
+on every display frame, IncrementalSTFT only transforms the hops that have
+arrived since the previous call. It reads new samples from an
+AudioRingBuffer, keeps the last NFFT samples in a frame buffer, and reuses a
+cached window and preallocated FFT output. The result matches
+scipy.signal.spectrogram (constant detrend, one-sided power spectral density).
+
+RunningRange keeps running 10th/95th percentile estimates of the dB values for
+normalisation, updated from the new columns only.
+"""
+
+import numpy as np
+from scipy import signal
+
+# np.fft.rfft gained an `out` argument in NumPy 2.0
+_RFFT_HAS_OUT = np.lib.NumpyVersion(np.__version__) >= '2.0.0'
+
+
+class IncrementalSTFT:
+    def __init__(self, nfft=1024, hop=512, rate=44100, window='hann', max_columns=64):
+        self.nfft = nfft
+        self.hop = hop
+        self.rate = rate
+        self.freq_bins = nfft // 2 + 1
+        self.frequencies = np.fft.rfftfreq(nfft, 1 / rate)
+
+        # Cached window and PSD scaling (same as scipy.signal.spectrogram)
+        self.window = signal.get_window(window, nfft).astype(np.float32)
+        self.scale = np.zeros(self.freq_bins, dtype=np.float32)
+        self.scale[:] = 1.0 / (rate * np.sum(self.window ** 2))
+        self.scale[1:-1 if nfft % 2 == 0 else None] *= 2  # one-sided
+
+        # Preallocated work buffers
+        self.frame = np.zeros(nfft, dtype=np.float32)
+        self.windowed = np.zeros(nfft, dtype=np.float32)
+        self.spectrum = np.zeros(self.freq_bins, dtype=np.complex64)
+        self.columns = np.zeros((self.freq_bins, max_columns), dtype=np.float32)
+        self.max_columns = max_columns
+        self.hop_block = np.zeros(hop, dtype=np.float32)
+
+        self.total_hops = 0
+        self.skipped_hops = 0
+
+    def _transform(self, out):
+        # Remove the frame mean like scipy's default detrend='constant'
+        np.subtract(self.frame, self.frame.mean(), out=self.windowed)
+        self.windowed *= self.window
+        if _RFFT_HAS_OUT:
+            np.fft.rfft(self.windowed, out=self.spectrum)
+        else:
+            self.spectrum[:] = np.fft.rfft(self.windowed)
+        np.multiply(self.spectrum.real, self.spectrum.real, out=out)
+        out += self.spectrum.imag * self.spectrum.imag
+        out *= self.scale
+
+    def push(self, hop_samples, out):
+        """Shift one hop of samples into the frame and write its power column to out."""
+        self.frame[:-self.hop] = self.frame[self.hop:]
+        self.frame[-self.hop:] = hop_samples
+        self._transform(out)
+        self.total_hops += 1
+
+    def process(self, ring):
+        """
+        Transform every complete hop waiting in `ring`.
+
+        Returns:
+            np.ndarray: (freq_bins, new_hops) power columns, oldest first. This
+            is a view into a reused buffer, valid until the next call.
+        """
+        hops = ring.available() // self.hop
+        if hops > self.max_columns:
+            # Fell far behind (e.g. window was dragged): skip the oldest audio
+            excess = hops - self.max_columns
+            ring.read(excess * self.hop)
+            self.skipped_hops += excess
+            hops = self.max_columns
+
+        for i in range(hops):
+            block = ring.read(self.hop, out=self.hop_block)
+            self.push(block, self.columns[:, i])
+        return self.columns[:, :hops]
+
+    def batch(self, samples):
+        """
+        Power columns for every full frame of a contiguous signal at once.
+
+        Frame k covers samples [k * hop, k * hop + nfft), like
+        scipy.signal.spectrogram. Used for offline analysis; does not touch
+        the streaming state.
+
+        Returns:
+            np.ndarray: (freq_bins, frames) float32 power
+        """
+        samples = np.asarray(samples, dtype=np.float32)
+        if len(samples) < self.nfft:
+            return np.zeros((self.freq_bins, 0), dtype=np.float32)
+        frames = np.lib.stride_tricks.sliding_window_view(samples, self.nfft)[::self.hop]
+        windowed = frames - frames.mean(axis=1, keepdims=True)
+        windowed *= self.window
+        spectrum = np.fft.rfft(windowed, axis=1)
+        power = (spectrum.real ** 2 + spectrum.imag ** 2).astype(np.float32)
+        power *= self.scale
+        return power.T
+
+
+class RunningRange:
+    """Exponentially smoothed low/high percentiles of incoming values."""
+
+    def __init__(self, low=10, high=95, smoothing=0.9, initial=(-80.0, 20.0)):
+        self.low_q = low
+        self.high_q = high
+        self.smoothing = smoothing
+        self.low, self.high = initial
+        self.started = False
+
+    def update(self, values):
+        values = values.ravel()
+        if values.size == 0:
+            return self.low, self.high
+        # np.partition is O(n), cheaper than a full sort for two percentiles
+        k_low = int(self.low_q / 100 * (values.size - 1))
+        k_high = int(self.high_q / 100 * (values.size - 1))
+        part = np.partition(values, (k_low, k_high))
+        low, high = float(part[k_low]), float(part[k_high])
+        if not self.started:
+            self.low, self.high = low, high
+            self.started = True
+        else:
+            a = self.smoothing
+            self.low = a * self.low + (1 - a) * low
+            self.high = a * self.high + (1 - a) * high
+        return self.low, self.high
@@ -3,31 +3,60 @@ from random import random
 
 
 class Synth:
-    def __init__(self, transpo=1, mul=1):
+    def __init__(self, transpo=1, mul=1, poly=10, topology="full", lfo=None):
+        """
+        Args:
+            transpo: Transposition factor
+            mul: Output gain
+            poly: Voices of polyphony
+            topology: "full" for two detuned oscillators per voice, "light" for
+                one oscillator per voice with the detuning done once, after the
+                voices are mixed down (see synth_benchmark.py for the costs)
+            lfo: Notch modulator shared between instances (see notch_lfo())
+        """
         # Transposition factor.
         self.transpo = Sig(transpo)
-        # Receive midi notes, convert pitch to Hz and manage 10 voices of polyphony.
-        self.note = Notein(poly=10, scale=1, first=0, last=127)
+        # Receive midi notes, convert pitch to Hz and manage `poly` voices of polyphony.
+        self.note = Notein(poly=poly, scale=1, first=0, last=127)
 
         # Handle pitch and velocity (Notein outputs normalized amplitude (0 -> 1)).
         self.pit = self.note["pitch"] * self.transpo
         self.amp = MidiAdsr(self.note["velocity"], attack=0.001, decay=0.1, sustain=0.7, release=1, mul=0.1,)
 
-        # Anti-aliased stereo square waves, mixed from 10 streams to 1 stream
-        # to avoid channel alternation on new notes.
-        self.osc1 = LFO(self.pit, sharp=0.5, type=2, mul=self.amp).mix(1)
-        self.osc2 = LFO(self.pit * 0.997, sharp=0.5, type=2, mul=self.amp).mix(1)
+        if topology == "full":
+            # Anti-aliased stereo square waves, mixed from `poly` streams to 1 stream
+            # to avoid channel alternation on new notes.
+            self.osc1 = LFO(self.pit, sharp=0.5, type=2, mul=self.amp).mix(1)
+            self.osc2 = LFO(self.pit * 0.997, sharp=0.5, type=2, mul=self.amp).mix(1)
 
-        # Stereo mix.
-        self.mix = Mix([self.osc1, self.osc2], voices=2)
+            # Stereo mix.
+            self.mix = Mix([self.osc1, self.osc2], voices=2)
+        elif topology == "light":
+            # One square wave per voice, pre-mixed to 1 stream. The detuned
+            # copy comes from a single vibrating delay line on the mix
+            # (Doppler shift of about 0.3%), so its cost no longer grows with
+            # the polyphony.
+            self.osc1 = LFO(self.pit, sharp=0.5, type=2, mul=self.amp).mix(1)
+            self.wobble = Sine(0.5).range(0.005, 0.0065)
+            self.osc2 = Delay(self.osc1, delay=self.wobble, maxdelay=0.01)
+
+            # Stereo mix.
+            self.mix = Mix([self.osc1, self.osc2], voices=2)
+        else:
+            raise ValueError(f"Unknown topology: {topology!r}")
 
         # High frequencies damping.
         self.damp = ButLP(self.mix, freq=5000)
 
         # Moving notches, using two out-of-phase sine wave oscillators.
-        self.lfo = Sine(0.2, phase=[random(), random()]).range(250, 4000)
+        self.lfo = lfo if lfo is not None else self.notch_lfo()
         self.notch = ButBR(self.damp, self.lfo, mul=mul)
 
+    @staticmethod
+    def notch_lfo():
+        "Returns a notch modulator that several synths can share."
+        return Sine(0.2, phase=[random(), random()]).range(250, 4000)
+
     def out(self):
         "Sends the synth's signal to the audio output and return the object itself."
         self.notch.out()
@@ -38,18 +67,22 @@ class Synth:
         return self.notch
 
 
-s = Server()
-s.setMidiInputDevice(99)  # Open all input devices.
-s.boot()
+if __name__ == "__main__":
+    s = Server()
+    s.setMidiInputDevice(99)  # Open all input devices.
+    s.boot()
 
-# Create the midi synth.
-a1 = Synth()
+    # Create the midi synth. The light topology measured about half the CPU per
+    # voice of the full one (python synth_benchmark.py), and both synths share
+    # one notch modulator.
+    lfo = Synth.notch_lfo()
+    a1 = Synth(topology="light", lfo=lfo)
 
-# Send the synth's signal into a reverb processor.
-rev = STRev(a1.sig(), inpos=[0.1, 0.9], revtime=2, cutoff=4000, bal=0.15).out()
+    # Send the synth's signal into a reverb processor.
+    rev = STRev(a1.sig(), inpos=[0.1, 0.9], revtime=2, cutoff=4000, bal=0.15).out()
 
-# It's very easy to double the synth sound!
-# One octave lower and directly sent to the audio output.
-a2 = Synth(transpo=0.5, mul=0.7).out()
+    # It's very easy to double the synth sound!
+    # One octave lower and directly sent to the audio output.
+    a2 = Synth(transpo=0.5, mul=0.7, topology="light", lfo=lfo).out()
 
-s.gui(locals())
\ No newline at end of file
+    s.gui(locals())
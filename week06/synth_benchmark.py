@@ -0,0 +1,109 @@
+"""
+Offline CPU benchmark for the pyo Synth.
+
+Every configuration is rendered by an offline Server (audio="offline",
+recording to a WAV file) as fast as the CPU allows, with every voice held
+down by injected MIDI notes. The CPU time spent rendering, divided by the
+rendered duration, is the fraction of one core the graph would need in real
+time: above 1.0 a live Server drops out.
+
+Usage:
+    python synth_benchmark.py                   # full sweep
+    python synth_benchmark.py --seconds 5 --poly 10 20 --instances 1 2
+"""
+
+import argparse
+import itertools
+import os
+import tempfile
+import time
+import numpy as np
+from pyo import Server, STRev, CallAfter
+from synth import Synth
+
+EFFECTS = ("none", "reverb")
+TOPOLOGIES = ("full", "light")
+BUDGET = 0.5  # share of one core left for the synth; the rest is for everything else
+
+
+def render(poly, instances, effect, topology, seconds=10, filename=None):
+    """
+    Render one configuration offline
+
+    Args:
+        poly: Voices per Synth, all held for the whole render
+        instances: Number of Synth objects (each an octave below the previous)
+        effect: "none", or "reverb" for an STRev on the summed synths
+        topology: Synth topology, "full" or "light"
+        seconds: Rendered duration
+        filename: Output WAV (default: a temporary file, deleted afterwards)
+
+    Returns:
+        float: CPU seconds per rendered second
+    """
+    keep = filename is not None
+    if not keep:
+        fd, filename = tempfile.mkstemp(suffix=".wav")
+        os.close(fd)
+
+    s = Server(audio="offline", nchnls=2, duplex=0)
+    s.boot()
+    s.recordOptions(dur=seconds, filename=filename, fileformat=0, sampletype=0)
+
+    lfo = Synth.notch_lfo() if topology == "light" else None
+    synths = [Synth(transpo=0.5 ** i, mul=0.7, poly=poly, topology=topology, lfo=lfo)
+              for i in range(instances)]
+    if effect == "reverb":
+        mix = sum(synth.sig() for synth in synths)
+        out = STRev(mix, inpos=[0.1, 0.9], revtime=2, cutoff=4000, bal=0.15).out()
+    else:
+        out = [synth.out() for synth in synths]
+
+    def hold_notes():
+        for pitch in range(48, 48 + poly):
+            s.addMidiEvent(0x90, pitch, 100)
+    press = CallAfter(hold_notes, 0.01)
+
+    start = time.process_time()
+    s.start()  # returns once the whole file is rendered
+    cpu = time.process_time() - start
+
+    s.shutdown()
+    if not keep:
+        os.remove(filename)
+    return cpu / seconds
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--poly", type=int, nargs="+", default=[4, 10, 20, 32])
+    parser.add_argument("--instances", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--effects", nargs="+", choices=EFFECTS, default=list(EFFECTS))
+    parser.add_argument("--topologies", nargs="+", choices=TOPOLOGIES, default=list(TOPOLOGIES))
+    args = parser.parse_args()
+
+    print(f"{'topology':>8} {'poly':>5} {'synths':>6} {'effect':>7} {'cpu/s':>8} {'per voice':>10}")
+    results = {}
+    for topology, instances, effect, poly in itertools.product(
+            args.topologies, args.instances, args.effects, args.poly):
+        load = render(poly, instances, effect, topology, args.seconds)
+        results[topology, instances, effect, poly] = load
+        print(f"{topology:>8} {poly:>5} {instances:>6} {effect:>7} {load:>8.4f} "
+              f"{load / (poly * instances) * 1000:>8.3f} ms")
+
+    # Straight-line fit of load against the total number of voices: the
+    # slope is the cost of one voice, the intercept the fixed cost of the
+    # filters and effects
+    print(f"\n📊 Fitted cost (voice budget within {BUDGET:.0%} of one core):")
+    for topology, effect in itertools.product(args.topologies, args.effects):
+        keys = [key for key in results if key[0] == topology and key[2] == effect]
+        voices = np.array([instances * poly for _, instances, _, poly in keys])
+        loads = np.array([results[key] for key in keys])
+        per_voice, fixed = np.polyfit(voices, loads, 1)
+        print(f"   {topology:>5}, {effect:>6}: {per_voice * 1000:.3f} ms/s per voice, "
+              f"{fixed * 1000:.2f} ms/s fixed -> about {int((BUDGET - fixed) / per_voice)} voices")
+
+
+if __name__ == "__main__":
+    main()
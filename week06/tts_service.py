@@ -0,0 +1,170 @@
+"""
+Cached, streaming text-to-speech with Chatterbox.
+
+TTSService splits text into sentences and synthesises them one at a time on
+a background worker, so playback can start after the first sentence. Every
+sentence is cached as a WAV file named by a hash of (text, voice file
+contents, language), so repeating a prompt plays straight from disk. The
+English and multilingual models are only loaded when first needed.
+
+Usage:
+    tts = TTSService()
+    for audio in tts.submit("Hello there. How are you?"):
+        ...  # float32 numpy array at tts.sr, one per sentence
+"""
+
+import hashlib
+import json
+import os
+import queue
+import re
+import threading
+from pathlib import Path
+import numpy as np
+
+CACHE_DIR = Path(__file__).parent / "tts_cache"
+
+# Sentence ends: Latin punctuation followed by whitespace, or CJK punctuation
+SENTENCE_END = re.compile(r'(?<=[.!?…])\s+|(?<=[。！？])')
+MIN_SENTENCE_CHARS = 12  # shorter pieces ("Dr.", "你好。") are joined to the next one
+
+
+def split_sentences(text):
+    """Split text into sentences, keeping the punctuation"""
+    sentences = []
+    piece = ''
+    for part in SENTENCE_END.split(text):
+        part = part.strip()
+        if not part:
+            continue
+        joiner = '' if not piece or re.match(r'[\u3000-\u9fff]', part) else ' '
+        piece = piece + joiner + part
+        if len(piece) >= MIN_SENTENCE_CHARS:
+            sentences.append(piece)
+            piece = ''
+    if piece:
+        sentences.append(piece)
+    return sentences
+
+
+def _file_digest(path):
+    if path is None:
+        return None
+    return hashlib.sha256(Path(path).read_bytes()).hexdigest()
+
+
+class SynthesisJob:
+    """Sentences of one submitted text, yielded as they are synthesised"""
+
+    def __init__(self, text, voice, language):
+        self.text = text
+        self.voice = voice
+        self.language = language
+        self.sentences = split_sentences(text)
+        self.chunks = queue.Queue()
+        self.cache_hits = 0
+
+    def __iter__(self):
+        while True:
+            item = self.chunks.get()
+            if item is None:
+                return
+            if isinstance(item, Exception):
+                raise item
+            yield item
+
+
+class TTSService:
+    def __init__(self, device=None, cache_dir=CACHE_DIR):
+        """
+        Args:
+            device: torch device (default: cuda if available)
+            cache_dir: Where sentence WAVs are cached
+        """
+        self.device = device
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.models = {}
+        self.voice_digests = {}
+        self.sr = 24000  # Chatterbox output rate; updated when a model loads
+
+        self.jobs = queue.Queue()
+        self.worker = threading.Thread(target=self._work, daemon=True)
+        self.worker.start()
+
+    def _model(self, language):
+        """English model for 'en', multilingual model otherwise, loaded on first use"""
+        kind = 'english' if language == 'en' else 'multilingual'
+        if kind not in self.models:
+            import torch
+            device = self.device or ("cuda" if torch.cuda.is_available() else "cpu")
+            if kind == 'english':
+                from chatterbox.tts import ChatterboxTTS
+                self.models[kind] = ChatterboxTTS.from_pretrained(device=device)
+            else:
+                from chatterbox.mtl_tts import ChatterboxMultilingualTTS
+                self.models[kind] = ChatterboxMultilingualTTS.from_pretrained(device=device)
+            self.sr = self.models[kind].sr
+        return self.models[kind]
+
+    def cache_path(self, sentence, voice, language):
+        """Content-addressed WAV path for one sentence"""
+        if voice not in self.voice_digests:
+            self.voice_digests[voice] = _file_digest(voice)
+        key = json.dumps([sentence, self.voice_digests[voice], language], ensure_ascii=False)
+        return self.cache_dir / f"{hashlib.sha256(key.encode()).hexdigest()[:32]}.wav"
+
+    def synthesize(self, sentence, voice=None, language='en'):
+        """
+        One sentence as a float32 array, from the cache when possible
+
+        Returns:
+            tuple: (audio, cache hit)
+        """
+        import torchaudio as ta
+
+        path = self.cache_path(sentence, voice, language)
+        if path.exists():
+            wav, self.sr = ta.load(str(path))
+            return wav[0].numpy(), True
+
+        model = self._model(language)
+        kwargs = {'audio_prompt_path': voice} if voice else {}
+        if language != 'en':
+            kwargs['language_id'] = language
+        wav = model.generate(sentence, **kwargs)
+        # Write next to the cache entry and rename, so a crash mid-write
+        # never leaves a truncated WAV that later runs would treat as a hit
+        tmp = path.with_suffix('.tmp')
+        ta.save(str(tmp), wav.cpu(), model.sr, format='wav')
+        os.replace(tmp, path)
+        return wav[0].cpu().numpy().astype(np.float32), False
+
+    def submit(self, text, voice=None, language='en'):
+        """
+        Queue a text for synthesis on the worker thread
+
+        Returns:
+            SynthesisJob: iterate it to get one audio array per sentence
+        """
+        job = SynthesisJob(text, voice, language)
+        self.jobs.put(job)
+        return job
+
+    def _work(self):
+        while True:
+            job = self.jobs.get()
+            if job is None:
+                return
+            try:
+                for sentence in job.sentences:
+                    audio, hit = self.synthesize(sentence, job.voice, job.language)
+                    job.cache_hits += hit
+                    job.chunks.put(audio)
+            except Exception as e:
+                job.chunks.put(e)
+            job.chunks.put(None)
+
+    def close(self):
+        self.jobs.put(None)
+        self.worker.join()
@@ -1,24 +1,53 @@
-import torchaudio as ta
-from chatterbox.tts import ChatterboxTTS
-from chatterbox.mtl_tts import ChatterboxMultilingualTTS
+import time
+import numpy as np
+import pyaudio
 import torch
+import torchaudio as ta
+from audio_io import AudioOutput
+from tts_service import TTSService
 
-# English example
-device = "cuda" if torch.cuda.is_available() else "cpu"
-model = ChatterboxTTS.from_pretrained(device=device)
+# Models load lazily on first use; sentences are cached in tts_cache/
+tts = TTSService()
+p = pyaudio.PyAudio()
+output = None
 
-text = "Ezreal and Jinx teamed up with Ahri, Yasuo, and Teemo to take down the enemy's Nexus in an epic late-game pentakill."
-wav = model.generate(text)
-ta.save("test-english.wav", wav, model.sr)
+def speak(text, language="en", save_as=None, voice=None):
+    """Play text sentence by sentence as it is synthesised, optionally saving the whole WAV"""
+    global output
+    start = time.time()
+    job = tts.submit(text, voice=voice, language=language)
+    parts = []
+    for audio in job:
+        if not parts:
+            print(f"▶️  First sentence ready after {time.time() - start:.2f}s")
+        if output is None:
+            output = AudioOutput(p, rate=tts.sr, chunk=1024, format=pyaudio.paFloat32)
+            output.start()
+        output.write_all(audio)
+        parts.append(audio)
+    print(f"✅ {len(job.sentences)} sentence(s), {job.cache_hits} from cache, {time.time() - start:.2f}s")
+    if save_as:
+        ta.save(save_as, torch.from_numpy(np.concatenate(parts))[None], tts.sr)
 
-# Multilingual examples
-multilingual_model = ChatterboxMultilingualTTS.from_pretrained(device=device)
+# English example
+text = "Ezreal and Jinx teamed up with Ahri, Yasuo, and Teemo to take down the enemy's Nexus in an epic late-game pentakill."
+speak(text, save_as="test-english.wav")
 
+# Multilingual example (the multilingual model only loads here)
 chinese_text = "你好，今天天气真不错，希望你有一个愉快的周末。"
-wav_chinese = multilingual_model.generate(chinese_text, language_id="zh")
-ta.save("test-chinese.wav", wav_chinese, model.sr)
+speak(chinese_text, language="zh", save_as="test-chinese.wav")
+
+# Repeating a prompt plays straight from the cache
+speak(text)
 
 # If you want to synthesize with a different voice, specify the audio prompt
 # AUDIO_PROMPT_PATH = "YOUR_FILE.wav"
-# wav = model.generate(text, audio_prompt_path=AUDIO_PROMPT_PATH)
-# ta.save("test-2.wav", wav, model.sr)
\ No newline at end of file
+# speak(text, voice=AUDIO_PROMPT_PATH, save_as="test-2.wav")
+
+# Let the last sentence finish playing
+while output.ring.available():
+    time.sleep(0.1)
+time.sleep(0.2)
+output.close()
+tts.close()
+p.terminate()
@@ -0,0 +1,99 @@
+"""
+Waveform envelope for the week06 waveform displays.
+
+Summarises audio into one min/max/RMS value per display column. Only the
+samples that arrived since the last update are processed: complete columns
+are reshaped to (columns, samples_per_pixel) and reduced in one vectorised
+call, and the results go into circular per-column arrays.
+"""
+
+import numpy as np
+
+
+class WaveformEnvelope:
+    def __init__(self, width, samples_per_pixel):
+        self.width = width
+        self.samples_per_pixel = samples_per_pixel
+
+        # Circular per-column statistics; next_column is the oldest column
+        self.mins = np.zeros(width, dtype=np.float32)
+        self.maxs = np.zeros(width, dtype=np.float32)
+        self.rms = np.zeros(width, dtype=np.float32)
+        self.next_column = 0
+
+        # Samples of the column still being filled
+        self.pending = np.zeros(samples_per_pixel, dtype=np.float32)
+        self.pending_count = 0
+
+        self.work = np.zeros(width * samples_per_pixel, dtype=np.float32)
+        self.ordered_out = np.zeros(width, dtype=np.float32)
+        self.x = np.arange(width)
+        self.points = np.zeros((width, 2), dtype=np.int32)
+        self.points[:, 0] = self.x
+        self.count = 0  # ring buffer position already processed
+
+    def update(self, ring):
+        """Process the samples written to an AudioRingBuffer since the last call"""
+        samples, self.count = ring.since(self.count)
+        self.extend(samples)
+
+    def extend(self, samples):
+        """Add new samples, completing as many columns as possible"""
+        spp = self.samples_per_pixel
+        n = len(samples)
+
+        # Finish the partial column first
+        if self.pending_count:
+            take = min(spp - self.pending_count, n)
+            self.pending[self.pending_count:self.pending_count + take] = samples[:take]
+            self.pending_count += take
+            samples = samples[take:]
+            if self.pending_count < spp:
+                return
+            self._add_columns(self.pending[None, :])
+            self.pending_count = 0
+
+        # Whole columns in one reshape; older ones would scroll straight off
+        columns = min(len(samples) // spp, self.width)
+        end = len(samples) - len(samples) % spp
+        if columns:
+            block = self.work[:columns * spp]
+            block[:] = samples[end - columns * spp:end]
+            self._add_columns(block.reshape(columns, spp))
+
+        rest = len(samples) - end
+        self.pending[:rest] = samples[end:]
+        self.pending_count = rest
+
+    def _add_columns(self, block):
+        slots = (self.next_column + np.arange(len(block))) % self.width
+        self.mins[slots] = block.min(axis=1)
+        self.maxs[slots] = block.max(axis=1)
+        self.rms[slots] = np.sqrt(np.einsum('ij,ij->i', block, block) / block.shape[1])
+        self.next_column = (self.next_column + len(block)) % self.width
+
+    def ordered(self, values, out=None):
+        """Copy one of mins/maxs/rms into out, oldest column first"""
+        if out is None:
+            out = self.ordered_out
+        split = self.next_column
+        out[:self.width - split] = values[split:]
+        out[self.width - split:] = values[:split]
+        return out
+
+    def rms_points(self, center_y, scale, top, bottom):
+        """
+        (width, 2) int32 points of the RMS envelope, for pygame.draw.lines
+
+        Args:
+            center_y: Screen y of zero amplitude
+            scale: Pixels per unit of RMS (drawn upwards)
+            top, bottom: Screen y limits to clip to
+        """
+        rms = self.ordered(self.rms)
+        y = self.points[:, 1]
+        np.multiply(rms, -scale, out=rms)
+        rms += center_y
+        np.clip(rms, top, bottom, out=rms)
+        y[:] = rms
+        return self.points
@@ -8,6 +8,7 @@ import cv2
 import mediapipe as mp
 import numpy as np
 from camera_utils import setup_camera
+from landmark_recording import RecordingToggle
 
 def main():
     print("🖐️ MediaPipe Hand Tracking")
@@ -28,7 +29,10 @@ def main():
         print("💡 Run 'python setup_camera.py' to configure your camera")
         return
     
-    print("🚀 Hand Tracking started. Press 'q' to quit.")
+    print("🚀 Hand Tracking started. Press 'r' to record landmarks, 'q' to quit.")
+    
+    # Press 'r' to start/stop recording landmarks
+    recording = RecordingToggle('hands')
     
     with mp_hands.Hands(
         model_complexity=0,
@@ -50,6 +54,7 @@ def main():
             
             # Process the frame
             results = hands.process(rgb_frame)
+            recording.write(results)
             
             # Draw hand landmarks
             if results.multi_hand_landmarks:
@@ -87,14 +92,22 @@ def main():
             cv2.putText(frame, "Press 'q' to quit", 
                        (10, frame.shape[0] - 20), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 2)
             
+            if recording.active:
+                cv2.putText(frame, "REC", (frame.shape[1] - 80, 30),
+                           cv2.FONT_HERSHEY_SIMPLEX, 0.8, (0, 0, 255), 2)
+            
             # Display frame
             cv2.imshow('MediaPipe Hand Tracking', frame)
             
-            # Check for quit
-            if cv2.waitKey(1) & 0xFF == ord('q'):
+            # Handle key presses
+            key = cv2.waitKey(1) & 0xFF
+            if key == ord('q'):
                 break
+            elif key == ord('r'):
+                recording.toggle()
     
     # Cleanup
+    recording.stop()
     cap.release()
     cv2.destroyAllWindows()
     print("👋 Hand tracking stopped")
@@ -6,22 +6,11 @@ Detects and tracks human pose landmarks in real-time
 
 import cv2
 import mediapipe as mp
-import numpy as np
 from camera_utils import setup_camera
+from landmark_recording import RecordingToggle
+from pose_features import PoseFeatures, RepCounter, pose_to_array, LANDMARK_INDEX
 
-def calculate_angle(a, b, c):
-    """Calculate angle between three points"""
-    a = np.array(a)  # First point
-    b = np.array(b)  # Mid point
-    c = np.array(c)  # End point
-    
-    radians = np.arctan2(c[1] - b[1], c[0] - b[0]) - np.arctan2(a[1] - b[1], a[0] - b[0])
-    angle = np.abs(radians * 180.0 / np.pi)
-    
-    if angle > 180.0:
-        angle = 360 - angle
-    
-    return angle
+SMOOTHING_FRAMES = 5  # frames of elbow angle averaged before counting reps
 
 def main():
     print("🧍 MediaPipe Pose Estimation")
@@ -42,7 +31,15 @@ def main():
         print("💡 Run 'python setup_camera.py' to configure your camera")
         return
     
-    print("🚀 Pose Estimation started. Press 'q' to quit.")
+    print("🚀 Pose Estimation started. Press 'r' to record landmarks, 'q' to quit.")
+    
+    # Press 'r' to start/stop recording landmarks
+    recording = RecordingToggle('pose')
+    
+    # All joint angles are computed in one vectorised call per frame; the
+    # short history smooths out landmark jitter for the rep counter
+    features = PoseFeatures(history=SMOOTHING_FRAMES)
+    curl_counter = RepCounter(flexed=50, extended=150)
     
     with mp_pose.Pose(
         min_detection_confidence=0.5,
@@ -63,6 +60,7 @@ def main():
             
             # Process the frame
             results = pose.process(rgb_frame)
+            recording.write(results)
             
             # Draw pose landmarks
             if results.pose_landmarks:
@@ -74,45 +72,34 @@ def main():
                     landmark_drawing_spec=mp_drawing_styles.get_default_pose_landmarks_style()
                 )
                 
-                # Extract landmarks
-                landmarks = results.pose_landmarks.landmark
+                # Compute all joint angles, segment lengths and velocities
+                points = pose_to_array(results.pose_landmarks)
+                pose_data = features.update(points)
                 
-                # Get coordinates for angle calculation
-                try:
-                    # Left arm angle (shoulder-elbow-wrist)
-                    shoulder = [landmarks[mp_pose.PoseLandmark.LEFT_SHOULDER.value].x,
-                               landmarks[mp_pose.PoseLandmark.LEFT_SHOULDER.value].y]
-                    elbow = [landmarks[mp_pose.PoseLandmark.LEFT_ELBOW.value].x,
-                            landmarks[mp_pose.PoseLandmark.LEFT_ELBOW.value].y]
-                    wrist = [landmarks[mp_pose.PoseLandmark.LEFT_WRIST.value].x,
-                            landmarks[mp_pose.PoseLandmark.LEFT_WRIST.value].y]
-                    
-                    # Calculate angle
-                    angle = calculate_angle(shoulder, elbow, wrist)
-                    
-                    # Convert to pixel coordinates for display
-                    h, w, _ = frame.shape
-                    elbow_pixel = (int(elbow[0] * w), int(elbow[1] * h))
-                    
-                    # Display angle
-                    cv2.putText(frame, f'Left Arm: {int(angle)}°', 
-                               (elbow_pixel[0] - 50, elbow_pixel[1] - 20),
-                               cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 0), 2)
-                    
-                except:
-                    pass
+                # Left arm angle (shoulder-elbow-wrist)
+                angle = features.angle(pose_data, 'left_elbow')
+                reps = curl_counter.update(features.smoothed_angle('left_elbow', SMOOTHING_FRAMES))
+                
+                # Convert to pixel coordinates for display
+                h, w, _ = frame.shape
+                elbow = points[LANDMARK_INDEX['LEFT_ELBOW']]
+                elbow_pixel = (int(elbow[0] * w), int(elbow[1] * h))
+                
+                # Display angle and curl count
+                cv2.putText(frame, f'Left Arm: {int(angle)}°', 
+                           (elbow_pixel[0] - 50, elbow_pixel[1] - 20),
+                           cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 0), 2)
+                cv2.putText(frame, f'Curls: {reps}', 
+                           (10, 90), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 255, 0), 2)
                 
                 # Detect if person is raising both hands
-                try:
-                    left_wrist_y = landmarks[mp_pose.PoseLandmark.LEFT_WRIST.value].y
-                    right_wrist_y = landmarks[mp_pose.PoseLandmark.RIGHT_WRIST.value].y
-                    nose_y = landmarks[mp_pose.PoseLandmark.NOSE.value].y
-                    
-                    if left_wrist_y < nose_y and right_wrist_y < nose_y:
-                        cv2.putText(frame, "HANDS UP!", (50, 100), 
-                                   cv2.FONT_HERSHEY_SIMPLEX, 2, (0, 255, 0), 3)
-                except:
-                    pass
+                left_wrist_y = points[LANDMARK_INDEX['LEFT_WRIST'], 1]
+                right_wrist_y = points[LANDMARK_INDEX['RIGHT_WRIST'], 1]
+                nose_y = points[LANDMARK_INDEX['NOSE'], 1]
+                
+                if left_wrist_y < nose_y and right_wrist_y < nose_y:
+                    cv2.putText(frame, "HANDS UP!", (50, 140), 
+                               cv2.FONT_HERSHEY_SIMPLEX, 2, (0, 255, 0), 3)
             
             # Add status overlay
             cv2.putText(frame, f'Camera {camera_id} | Pose Detection', 
@@ -122,14 +109,22 @@ def main():
             cv2.putText(frame, "Press 'q' to quit", 
                        (10, frame.shape[0] - 20), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 2)
             
+            if recording.active:
+                cv2.putText(frame, "REC", (frame.shape[1] - 80, 30),
+                           cv2.FONT_HERSHEY_SIMPLEX, 0.8, (0, 0, 255), 2)
+            
             # Display frame
             cv2.imshow('MediaPipe Pose Estimation', frame)
             
-            # Check for quit
-            if cv2.waitKey(1) & 0xFF == ord('q'):
+            # Handle key presses
+            key = cv2.waitKey(1) & 0xFF
+            if key == ord('q'):
                 break
+            elif key == ord('r'):
+                recording.toggle()
     
     # Cleanup
+    recording.stop()
     cap.release()
     cv2.destroyAllWindows()
     print("👋 Pose estimation stopped")
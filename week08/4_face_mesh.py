@@ -8,6 +8,13 @@ import cv2
 import mediapipe as mp
 import numpy as np
 from camera_utils import setup_camera
+from landmark_recording import RecordingToggle
+from face_subset import FaceSubset, OSCSubsetSender, SharedSubsetBuffer, region_indices
+
+# Landmarks extracted and sent out in subset mode
+SUBSET_REGIONS = ['lips', 'left_eye', 'right_eye', 'nose']
+OSC_IP = "127.0.0.1"
+OSC_PORT = 8000
 
 def main():
     print("🎭 MediaPipe Face Mesh Detection")
@@ -29,128 +36,176 @@ def main():
         return
     
     print("🚀 Face Mesh Detection started.")
-    print("Press 'c' to toggle contours only, 'f' for full mesh, 'i' for irises, 'q' to quit.")
+    print("Press 'c' to toggle contours only, 'f' for full mesh, 'i' for irises, 's' for subset,")
+    print("'p' to toggle preview, 'r' to record, 'q' to quit.")
     
     # Drawing modes
-    drawing_mode = 'contours'  # 'contours', 'full', 'irises'
+    drawing_mode = 'contours'  # 'contours', 'full', 'irises', 'subset'
+    preview = True  # Skip all mesh drawing when off
+    
+    # Subset mode: only the configured landmarks are extracted and published
+    face_subset = FaceSubset(region_indices(SUBSET_REGIONS))
+    shared_buffer = SharedSubsetBuffer(len(face_subset.indices))
+    outputs = [shared_buffer]
+    try:
+        outputs.append(OSCSubsetSender(OSC_IP, OSC_PORT))
+        print(f"📡 Subset mode sends {len(face_subset.indices)} points to OSC {OSC_IP}:{OSC_PORT}")
+    except RuntimeError as e:
+        print(f"⚠️  {e}")
+    
+    # Press 'r' to start/stop recording landmarks
+    recording = RecordingToggle('face_mesh')
     
-    with mp_face_mesh.FaceMesh(
-        max_num_faces=1,
-        refine_landmarks=True,  # Enables iris landmarks
-        min_detection_confidence=0.5,
-        min_tracking_confidence=0.5
-    ) as face_mesh:
+    try:
+        with mp_face_mesh.FaceMesh(
+            max_num_faces=1,
+            refine_landmarks=True,  # Enables iris landmarks
+            min_detection_confidence=0.5,
+            min_tracking_confidence=0.5
+        ) as face_mesh:
         
-        while True:
-            ret, frame = cap.read()
-            if not ret:
-                print("❌ Error: Could not read frame")
-                break
+            while True:
+                ret, frame = cap.read()
+                if not ret:
+                    print("❌ Error: Could not read frame")
+                    break
             
-            # Flip frame horizontally for selfie view
-            frame = cv2.flip(frame, 1)
+                # Flip frame horizontally for selfie view
+                frame = cv2.flip(frame, 1)
             
-            # Convert BGR to RGB
-            rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+                # Convert BGR to RGB
+                rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
             
-            # Process the frame
-            results = face_mesh.process(rgb_frame)
+                # Process the frame
+                results = face_mesh.process(rgb_frame)
+                recording.write(results)
             
-            # Draw face mesh
-            if results.multi_face_landmarks:
-                for face_landmarks in results.multi_face_landmarks:
-                    if drawing_mode == 'contours':
-                        # Draw face contours only
-                        mp_drawing.draw_landmarks(
-                            frame,
-                            face_landmarks,
-                            mp_face_mesh.FACEMESH_CONTOURS,
-                            landmark_drawing_spec=None,
-                            connection_drawing_spec=mp_drawing_styles.get_default_face_mesh_contours_style()
-                        )
-                    elif drawing_mode == 'full':
-                        # Draw full face mesh
-                        mp_drawing.draw_landmarks(
-                            frame,
-                            face_landmarks,
-                            mp_face_mesh.FACEMESH_TESSELATION,
-                            landmark_drawing_spec=None,
-                            connection_drawing_spec=mp_drawing_styles.get_default_face_mesh_tesselation_style()
-                        )
-                        # Also draw contours on top
-                        mp_drawing.draw_landmarks(
-                            frame,
-                            face_landmarks,
-                            mp_face_mesh.FACEMESH_CONTOURS,
-                            landmark_drawing_spec=None,
-                            connection_drawing_spec=mp_drawing_styles.get_default_face_mesh_contours_style()
-                        )
-                    elif drawing_mode == 'irises':
-                        # Draw irises
-                        mp_drawing.draw_landmarks(
-                            frame,
-                            face_landmarks,
-                            mp_face_mesh.FACEMESH_IRISES,
-                            landmark_drawing_spec=None,
-                            connection_drawing_spec=mp_drawing_styles.get_default_face_mesh_iris_connections_style()
-                        )
-                        # Also draw contours
-                        mp_drawing.draw_landmarks(
-                            frame,
-                            face_landmarks,
-                            mp_face_mesh.FACEMESH_CONTOURS,
-                            landmark_drawing_spec=None,
-                            connection_drawing_spec=mp_drawing_styles.get_default_face_mesh_contours_style()
-                        )
+                # Subset fast path: extract only the configured points, no mesh drawing
+                if drawing_mode == 'subset' and results.multi_face_landmarks:
+                    points = face_subset.extract(results.multi_face_landmarks[0])
+                    for output in outputs:
+                        output.send(points)
                 
-                # Count landmarks
-                landmark_count = len(results.multi_face_landmarks[0].landmark)
-                cv2.putText(frame, f"Landmarks: {landmark_count}", 
-                           (10, 90), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 255, 0), 2)
+                    if preview:
+                        h, w, _ = frame.shape
+                        for x, y, _ in points:
+                            cv2.circle(frame, (int(x * w), int(y * h)), 2, (0, 255, 0), -1)
+                
+                    cv2.putText(frame, f"Subset: {len(points)} landmarks", 
+                               (10, 90), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 255, 0), 2)
             
-            # Display status and controls
-            face_count = len(results.multi_face_landmarks) if results.multi_face_landmarks else 0
-            cv2.putText(frame, f"Camera {camera_id} | Face Mesh ({drawing_mode.title()})", 
-                       (10, 30), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 255, 255), 2)
-            cv2.putText(frame, f"Faces: {face_count}", 
-                       (10, 60), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 2)
+                # Draw face mesh
+                elif preview and results.multi_face_landmarks:
+                    for face_landmarks in results.multi_face_landmarks:
+                        if drawing_mode == 'contours':
+                            # Draw face contours only
+                            mp_drawing.draw_landmarks(
+                                frame,
+                                face_landmarks,
+                                mp_face_mesh.FACEMESH_CONTOURS,
+                                landmark_drawing_spec=None,
+                                connection_drawing_spec=mp_drawing_styles.get_default_face_mesh_contours_style()
+                            )
+                        elif drawing_mode == 'full':
+                            # Draw full face mesh
+                            mp_drawing.draw_landmarks(
+                                frame,
+                                face_landmarks,
+                                mp_face_mesh.FACEMESH_TESSELATION,
+                                landmark_drawing_spec=None,
+                                connection_drawing_spec=mp_drawing_styles.get_default_face_mesh_tesselation_style()
+                            )
+                            # Also draw contours on top
+                            mp_drawing.draw_landmarks(
+                                frame,
+                                face_landmarks,
+                                mp_face_mesh.FACEMESH_CONTOURS,
+                                landmark_drawing_spec=None,
+                                connection_drawing_spec=mp_drawing_styles.get_default_face_mesh_contours_style()
+                            )
+                        elif drawing_mode == 'irises':
+                            # Draw irises
+                            mp_drawing.draw_landmarks(
+                                frame,
+                                face_landmarks,
+                                mp_face_mesh.FACEMESH_IRISES,
+                                landmark_drawing_spec=None,
+                                connection_drawing_spec=mp_drawing_styles.get_default_face_mesh_iris_connections_style()
+                            )
+                            # Also draw contours
+                            mp_drawing.draw_landmarks(
+                                frame,
+                                face_landmarks,
+                                mp_face_mesh.FACEMESH_CONTOURS,
+                                landmark_drawing_spec=None,
+                                connection_drawing_spec=mp_drawing_styles.get_default_face_mesh_contours_style()
+                            )
+                
+                    # Count landmarks
+                    landmark_count = len(results.multi_face_landmarks[0].landmark)
+                    cv2.putText(frame, f"Landmarks: {landmark_count}", 
+                               (10, 90), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 255, 0), 2)
             
-            # Controls
-            controls = [
-                "Controls:",
-                "'c' - Contours only",
-                "'f' - Full mesh",
-                "'i' - Irises + contours",
-                "'q' - Quit"
-            ]
+                # Display status and controls
+                face_count = len(results.multi_face_landmarks) if results.multi_face_landmarks else 0
+                cv2.putText(frame, f"Camera {camera_id} | Face Mesh ({drawing_mode.title()})", 
+                           (10, 30), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 255, 255), 2)
+                cv2.putText(frame, f"Faces: {face_count}", 
+                           (10, 60), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 2)
             
-            for i, control in enumerate(controls):
-                y_pos = frame.shape[0] - 120 + i * 20
-                color = (255, 255, 255) if i == 0 else (200, 200, 200)
-                font_size = 0.6 if i == 0 else 0.5
-                cv2.putText(frame, control, 
-                           (10, y_pos), cv2.FONT_HERSHEY_SIMPLEX, font_size, color, 1)
+                # Controls
+                controls = [
+                    "Controls:",
+                    "'c' - Contours only",
+                    "'f' - Full mesh",
+                    "'i' - Irises + contours",
+                    "'s' - Subset only (fast path)",
+                    "'p' - Toggle preview",
+                    "'r' - Record landmarks",
+                    "'q' - Quit"
+                ]
             
-            # Display frame
-            cv2.imshow('MediaPipe Face Mesh Detection', frame)
+                for i, control in enumerate(controls):
+                    y_pos = frame.shape[0] - 180 + i * 20
+                    color = (255, 255, 255) if i == 0 else (200, 200, 200)
+                    font_size = 0.6 if i == 0 else 0.5
+                    cv2.putText(frame, control, 
+                               (10, y_pos), cv2.FONT_HERSHEY_SIMPLEX, font_size, color, 1)
             
-            # Handle key presses
-            key = cv2.waitKey(1) & 0xFF
-            if key == ord('q'):
-                break
-            elif key == ord('c'):
-                drawing_mode = 'contours'
-                print("Switched to contours mode")
-            elif key == ord('f'):
-                drawing_mode = 'full'
-                print("Switched to full mesh mode")
-            elif key == ord('i'):
-                drawing_mode = 'irises'
-                print("Switched to irises mode")
-    
-    # Cleanup
-    cap.release()
-    cv2.destroyAllWindows()
+                if recording.active:
+                    cv2.putText(frame, "REC", (frame.shape[1] - 80, 30),
+                               cv2.FONT_HERSHEY_SIMPLEX, 0.8, (0, 0, 255), 2)
+            
+                # Display frame
+                cv2.imshow('MediaPipe Face Mesh Detection', frame)
+            
+                # Handle key presses
+                key = cv2.waitKey(1) & 0xFF
+                if key == ord('q'):
+                    break
+                elif key == ord('c'):
+                    drawing_mode = 'contours'
+                    print("Switched to contours mode")
+                elif key == ord('f'):
+                    drawing_mode = 'full'
+                    print("Switched to full mesh mode")
+                elif key == ord('i'):
+                    drawing_mode = 'irises'
+                    print("Switched to irises mode")
+                elif key == ord('s'):
+                    drawing_mode = 'subset'
+                    print(f"Switched to subset mode ({len(face_subset.indices)} landmarks)")
+                elif key == ord('p'):
+                    preview = not preview
+                    print(f"Preview: {'ON' if preview else 'OFF'}")
+                elif key == ord('r'):
+                    recording.toggle()
+    finally:
+        # Cleanup (also frees the shared memory segment on errors)
+        recording.stop()
+        shared_buffer.close()
+        cap.release()
+        cv2.destroyAllWindows()
     print("👋 Face mesh detection stopped")
 
 if __name__ == "__main__":
@@ -8,6 +8,7 @@ import cv2
 import mediapipe as mp
 import numpy as np
 from camera_utils import setup_camera
+from gesture_engine import GestureEngine, hands_to_array, landmarks_to_array
 
 class GestureRecognizer:
     def __init__(self):
@@ -19,77 +20,20 @@ class GestureRecognizer:
             min_tracking_confidence=0.5
         )
         self.mp_drawing = mp.solutions.drawing_utils
+        self.engine = GestureEngine()
     
     def get_finger_states(self, landmarks):
         """Determine if fingers are up or down"""
-        finger_tips = [4, 8, 12, 16, 20]  # Thumb, Index, Middle, Ring, Pinky
-        finger_pips = [3, 6, 10, 14, 18]  # PIP joints
-        
-        fingers_up = []
-        
-        # Thumb (special case - check x coordinate)
-        if landmarks[finger_tips[0]].x > landmarks[finger_pips[0]].x:
-            fingers_up.append(1)
-        else:
-            fingers_up.append(0)
-        
-        # Other fingers (check y coordinate)
-        for i in range(1, 5):
-            if landmarks[finger_tips[i]].y < landmarks[finger_pips[i]].y:
-                fingers_up.append(1)
-            else:
-                fingers_up.append(0)
-        
-        return fingers_up
+        hands = landmarks_to_array(landmarks)[None]
+        return self.engine.finger_states(hands)[0].astype(int).tolist()
     
     def recognize_gesture(self, landmarks):
-        """Recognize gestures based on finger states"""
-        fingers_up = self.get_finger_states(landmarks)
-        total_fingers = sum(fingers_up)
-        
-        # Thumbs up
-        if fingers_up == [1, 0, 0, 0, 0]:
-            return "👍 Thumbs Up"
-        
-        # Thumbs down
-        elif fingers_up == [0, 0, 0, 0, 0] and landmarks[4].y > landmarks[3].y:
-            return "👎 Thumbs Down"
-        
-        # Peace sign
-        elif fingers_up == [0, 1, 1, 0, 0]:
-            return "✌️ Peace"
-        
-        # Rock and roll
-        elif fingers_up == [0, 1, 0, 0, 1]:
-            return "🤟 Rock On"
-        
-        # Open hand
-        elif total_fingers == 5:
-            return "🖐️ Open Hand"
-        
-        # Fist
-        elif total_fingers == 0:
-            return "✊ Fist"
-        
-        # Pointing
-        elif fingers_up == [0, 1, 0, 0, 0]:
-            return "👉 Pointing"
-        
-        # OK sign (approximate)
-        elif fingers_up == [1, 0, 1, 1, 1]:
-            return "👌 OK"
-        
-        # Number counting
-        elif total_fingers == 1:
-            return "1️⃣ One"
-        elif total_fingers == 2:
-            return "2️⃣ Two"
-        elif total_fingers == 3:
-            return "3️⃣ Three"
-        elif total_fingers == 4:
-            return "4️⃣ Four"
-        
-        return f"🤔 Unknown ({total_fingers} fingers)"
+        """Recognize the gesture of a single hand"""
+        return self.engine.classify(landmarks_to_array(landmarks)[None])[0]
+    
+    def recognize_gestures(self, multi_hand_landmarks):
+        """Recognize gestures for all detected hands in one vectorised call"""
+        return self.engine.classify(hands_to_array(multi_hand_landmarks))
 
 def main():
     print("👋 MediaPipe Gesture Recognition")
@@ -128,6 +72,9 @@ def main():
         
         # Process each detected hand
         if results.multi_hand_landmarks:
+            # Classify every hand at once
+            hand_gestures = recognizer.recognize_gestures(results.multi_hand_landmarks)
+            
             for i, (hand_landmarks, handedness) in enumerate(
                 zip(results.multi_hand_landmarks, results.multi_handedness)
             ):
@@ -136,8 +83,7 @@ def main():
                     frame, hand_landmarks, recognizer.mp_hands.HAND_CONNECTIONS
                 )
                 
-                # Recognize gesture
-                gesture = recognizer.recognize_gesture(hand_landmarks.landmark)
+                gesture = hand_gestures[i]
                 hand_type = handedness.classification[0].label
                 
                 gestures.append(f"{hand_type}: {gesture}")
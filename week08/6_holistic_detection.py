@@ -1,19 +1,26 @@
 #!/usr/bin/env python3
 """
-Holistic model using MediaPipe
-Combines face, hand, and pose detection in a single model
+Holistic detection using MediaPipe
+Combines face, hand, and pose detection; pose drives face and hand crops
+so each part can be switched off or run at a lower rate
 """
 
 import cv2
 import mediapipe as mp
 import numpy as np
+import time
 from camera_utils import setup_camera
+from landmark_recording import RecordingToggle
+from holistic_pipeline import HolisticPipeline, landmark_list
+
+# Run the face model every N frames; pose runs on every frame
+FACE_EVERY = 3
 
 def main():
     print("🎭 MediaPipe Holistic Detection")
     print("=" * 40)
     
-    # Initialize MediaPipe Holistic
+    # MediaPipe connections and drawing helpers
     mp_holistic = mp.solutions.holistic
     mp_drawing = mp.solutions.drawing_utils
     mp_drawing_styles = mp.solutions.drawing_styles
@@ -28,13 +35,16 @@ def main():
         print("💡 Run 'python setup_camera.py' to configure your camera")
         return
     
-    print("🚀 Holistic Detection started. Press 'q' to quit.")
+    print("🚀 Holistic Detection started. Press 'r' to record landmarks, 'q' to quit.")
+    print("Toggle parts: '1' - Face, '2' - Left hand, '3' - Right hand")
     
-    with mp_holistic.Holistic(
-        min_detection_confidence=0.5,
-        min_tracking_confidence=0.5
-    ) as holistic:
-        
+    # Press 'r' to start/stop recording landmarks
+    recording = RecordingToggle('holistic')
+    
+    pipeline = HolisticPipeline(face_every=FACE_EVERY)
+    prev_time = time.time()
+    
+    try:
         while True:
             ret, frame = cap.read()
             if not ret:
@@ -47,14 +57,20 @@ def main():
             # Convert BGR to RGB
             rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
             
-            # Process the frame
-            results = holistic.process(rgb_frame)
+            # Process the frame into one structured record
+            record = pipeline.process(rgb_frame)
+            recording.write_arrays(record)
+            
+            face_landmarks = landmark_list(record['face'])
+            pose_landmarks = landmark_list(record['pose'])
+            left_hand_landmarks = landmark_list(record['left_hand'])
+            right_hand_landmarks = landmark_list(record['right_hand'])
             
             # Draw face landmarks
-            if results.face_landmarks:
+            if face_landmarks:
                 mp_drawing.draw_landmarks(
                     frame,
-                    results.face_landmarks,
+                    face_landmarks,
                     mp_holistic.FACEMESH_CONTOURS,
                     landmark_drawing_spec=None,
                     connection_drawing_spec=mp_drawing_styles.get_default_face_mesh_contours_style()
@@ -65,10 +81,10 @@ def main():
                            cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 0), 2)
             
             # Draw pose landmarks
-            if results.pose_landmarks:
+            if pose_landmarks:
                 mp_drawing.draw_landmarks(
                     frame,
-                    results.pose_landmarks,
+                    pose_landmarks,
                     mp_holistic.POSE_CONNECTIONS,
                     landmark_drawing_spec=mp_drawing_styles.get_default_pose_landmarks_style()
                 )
@@ -78,10 +94,10 @@ def main():
                            cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 0), 2)
             
             # Draw left hand landmarks
-            if results.left_hand_landmarks:
+            if left_hand_landmarks:
                 mp_drawing.draw_landmarks(
                     frame,
-                    results.left_hand_landmarks,
+                    left_hand_landmarks,
                     mp_holistic.HAND_CONNECTIONS,
                     mp_drawing_styles.get_default_hand_landmarks_style(),
                     mp_drawing_styles.get_default_hand_connections_style()
@@ -92,10 +108,10 @@ def main():
                            cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 0, 0), 2)
             
             # Draw right hand landmarks
-            if results.right_hand_landmarks:
+            if right_hand_landmarks:
                 mp_drawing.draw_landmarks(
                     frame,
-                    results.right_hand_landmarks,
+                    right_hand_landmarks,
                     mp_holistic.HAND_CONNECTIONS,
                     mp_drawing_styles.get_default_hand_landmarks_style(),
                     mp_drawing_styles.get_default_hand_connections_style()
@@ -107,33 +123,49 @@ def main():
             
             # Count total landmarks detected
             total_landmarks = 0
-            if results.face_landmarks:
-                total_landmarks += len(results.face_landmarks.landmark)
-            if results.pose_landmarks:
-                total_landmarks += len(results.pose_landmarks.landmark)
-            if results.left_hand_landmarks:
-                total_landmarks += len(results.left_hand_landmarks.landmark)
-            if results.right_hand_landmarks:
-                total_landmarks += len(results.right_hand_landmarks.landmark)
+            for part in ('face', 'pose', 'left_hand', 'right_hand'):
+                if not np.isnan(record[part][0, 0]):
+                    total_landmarks += len(record[part])
             
             # Display landmark count
             cv2.putText(frame, f"Total Landmarks: {total_landmarks}", (10, 180), 
                        cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 255, 0), 2)
             
+            # Display FPS and active parts
+            curr_time = time.time()
+            fps = 1 / max(curr_time - prev_time, 1e-6)
+            prev_time = curr_time
+            active = [part for part, on in pipeline.enabled.items() if on]
+            cv2.putText(frame, f"FPS: {fps:.1f} | Pose + {', '.join(active) or 'nothing else'}", (10, 210), 
+                       cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 0), 2)
+            
             # Add status overlay
             cv2.putText(frame, f"Camera {camera_id} | Holistic Detection", 
                        (10, 30), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 255, 255), 2)
             cv2.putText(frame, "Press 'q' to quit", 
                        (10, frame.shape[0] - 20), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 2)
             
+            if recording.active:
+                cv2.putText(frame, "REC", (frame.shape[1] - 80, 30),
+                           cv2.FONT_HERSHEY_SIMPLEX, 0.8, (0, 0, 255), 2)
+            
             # Display frame
             cv2.imshow('MediaPipe Holistic Detection', frame)
             
-            # Check for quit
-            if cv2.waitKey(1) & 0xFF == ord('q'):
+            # Handle key presses
+            key = cv2.waitKey(1) & 0xFF
+            if key == ord('q'):
                 break
+            elif key == ord('r'):
+                recording.toggle()
+            elif key in (ord('1'), ord('2'), ord('3')):
+                part = {ord('1'): 'face', ord('2'): 'left_hand', ord('3'): 'right_hand'}[key]
+                print(f"{part}: {'ON' if pipeline.toggle(part) else 'OFF'}")
+    finally:
+        pipeline.close()
     
     # Cleanup
+    recording.stop()
     cap.release()
     cv2.destroyAllWindows()
     print("👋 Holistic detection stopped")
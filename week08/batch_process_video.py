@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+Offline batch processor for MediaPipe detectors
+Runs a detector over a video file with several worker processes and stores
+the landmarks as a recording (see landmark_recording.py)
+
+Usage:
+    python batch_process_video.py dance.mp4 --detector pose --workers 4
+"""
+
+import argparse
+import os
+import time
+from multiprocessing import Pool
+from pathlib import Path
+
+import cv2
+
+from landmark_recording import (
+    DETECTOR_STREAMS, RECORDINGS_DIR, allocate_recording,
+    create_detector, extract_landmarks, open_for_update, truncate_recording
+)
+
+
+def seek_frame(cap, index):
+    """
+    Position cap so the next read() returns frame `index`
+
+    CAP_PROP_POS_FRAMES seeks to a nearby keyframe on many compressed
+    streams, so read the position back and grab() forward to the frame
+    (from the start of the video if the seek overshot).
+
+    Returns:
+        int: The frame the next read() returns (less than index if the video ends first)
+    """
+    cap.set(cv2.CAP_PROP_POS_FRAMES, index)
+    position = int(cap.get(cv2.CAP_PROP_POS_FRAMES))
+    if position < 0 or position > index:
+        cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+        position = 0
+    while position < index and cap.grab():
+        position += 1
+    return position
+
+
+def process_chunk(task):
+    """
+    Worker: run the detector over frames [start, stop) and write them in place
+
+    Returns:
+        tuple: (start, frames decoded), fewer than requested if the video ends early
+    """
+    video_path, detector_name, recording_path, start, stop = task
+
+    cap = cv2.VideoCapture(str(video_path))
+    streams = open_for_update(recording_path)
+    detector = create_detector(detector_name)
+
+    processed = 0
+    if seek_frame(cap, start) < start:
+        stop = start  # the video ends before this chunk
+    for index in range(start, stop):
+        ret, frame = cap.read()
+        if not ret:
+            break
+        rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+        landmarks = extract_landmarks(detector_name, detector.process(rgb_frame))
+        for name, values in landmarks.items():
+            streams[name][index] = values
+        processed += 1
+
+    for stream in streams.values():
+        stream.flush()
+    detector.close()
+    cap.release()
+    return start, processed
+
+
+def split_frames(num_frames, workers, min_chunk=300):
+    """Split the frame range into contiguous chunks, a few per worker"""
+    num_chunks = max(1, min(workers * 4, num_frames // min_chunk))
+    bounds = [round(i * num_frames / num_chunks) for i in range(num_chunks + 1)]
+    return list(zip(bounds[:-1], bounds[1:]))
+
+
+def process_video(video_path, detector, output=None, workers=None):
+    """
+    Run a detector over a whole video file
+
+    Returns:
+        Path: Folder of the new recording
+    """
+    video_path = Path(video_path)
+    cap = cv2.VideoCapture(str(video_path))
+    if not cap.isOpened():
+        raise RuntimeError(f"Could not open video {video_path}")
+    num_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+    fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
+    cap.release()
+    if num_frames <= 0:
+        raise RuntimeError(f"Could not read the frame count of {video_path} "
+                           "(stream or container without one); re-encode it to a file first")
+
+    if output is None:
+        output = RECORDINGS_DIR / f"{video_path.stem}_{detector}"
+    workers = workers or os.cpu_count()
+
+    print(f"🎬 {video_path.name}: {num_frames} frames at {fps:.1f} fps")
+    recording_path = allocate_recording(output, detector, num_frames, fps, source=str(video_path))
+
+    chunks = split_frames(num_frames, workers)
+    tasks = [(video_path, detector, recording_path, start, stop) for start, stop in chunks]
+    print(f"⚙️  {len(chunks)} chunks on {workers} workers")
+
+    start_time = time.time()
+    processed = 0
+    decoded_end = 0
+    with Pool(workers) as pool:
+        for start, count in pool.imap_unordered(process_chunk, tasks):
+            processed += count
+            decoded_end = max(decoded_end, start + count)
+            print(f"  ✅ {processed}/{num_frames} frames", end='\r')
+    elapsed = time.time() - start_time
+
+    # The container's frame count is only an estimate: drop frames never decoded
+    if decoded_end < num_frames:
+        print(f"\n✂️  Video ended after {decoded_end} frames, truncating the recording")
+        truncate_recording(recording_path, decoded_end)
+
+    print(f"\n💾 Saved {processed} frames to {recording_path}")
+    print(f"⏱️  {elapsed:.1f}s ({processed / max(elapsed, 1e-6):.1f} fps, "
+          f"{processed / fps / max(elapsed, 1e-6):.1f}x real time)")
+    return recording_path
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a MediaPipe detector over a video file")
+    parser.add_argument('video', help="Input video file")
+    parser.add_argument('--detector', choices=sorted(DETECTOR_STREAMS), default='hands')
+    parser.add_argument('--workers', type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument('--output', default=None, help="Recording folder (default: recordings/<video>_<detector>)")
+    args = parser.parse_args()
+
+    print("🏭 MediaPipe Batch Processor")
+    print("=" * 40)
+    process_video(args.video, args.detector, args.output, args.workers)
+
+
+if __name__ == "__main__":
+    main()
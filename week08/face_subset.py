@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+"""
+Face mesh subset utilities
+Extracts only a configured set of face mesh landmarks (lips, eyes, nose...)
+into a NumPy array and publishes it over OSC or a shared memory buffer
+
+Run this file directly to benchmark the full-mesh path against the subset path.
+"""
+
+import time
+from multiprocessing import shared_memory
+import numpy as np
+
+try:
+    from pythonosc import udp_client
+except ImportError:
+    udp_client = None
+
+# Nose bridge and tip (MediaPipe has no nose connection set in older releases)
+NOSE_INDICES = [1, 2, 4, 5, 6, 19, 94, 168, 195, 197]
+
+DEFAULT_REGIONS = ['lips', 'left_eye', 'right_eye', 'nose']
+
+
+def _connection_indices(connections):
+    """Unique landmark indices used by a MediaPipe connection set"""
+    return sorted({i for pair in connections for i in pair})
+
+
+def region_indices(regions=DEFAULT_REGIONS):
+    """
+    Landmark indices for named face regions
+
+    Args:
+        regions: Names from 'lips', 'left_eye', 'right_eye', 'left_eyebrow',
+            'right_eyebrow', 'nose', 'irises' (irises need refine_landmarks=True)
+
+    Returns:
+        np.ndarray: Sorted unique landmark indices
+    """
+    import mediapipe as mp
+    mp_face_mesh = mp.solutions.face_mesh
+
+    sets = {
+        'lips': mp_face_mesh.FACEMESH_LIPS,
+        'left_eye': mp_face_mesh.FACEMESH_LEFT_EYE,
+        'right_eye': mp_face_mesh.FACEMESH_RIGHT_EYE,
+        'left_eyebrow': mp_face_mesh.FACEMESH_LEFT_EYEBROW,
+        'right_eyebrow': mp_face_mesh.FACEMESH_RIGHT_EYEBROW,
+        'irises': mp_face_mesh.FACEMESH_IRISES,
+    }
+    indices = set()
+    for region in regions:
+        if region == 'nose':
+            indices.update(NOSE_INDICES)
+        elif region in sets:
+            indices.update(_connection_indices(sets[region]))
+        else:
+            raise ValueError(f"Unknown face region: {region}")
+    return np.array(sorted(indices), dtype=np.intp)
+
+
+class FaceSubset:
+    """Extract a fixed subset of face mesh landmarks into a reusable array"""
+
+    def __init__(self, indices):
+        self.indices = [int(i) for i in indices]
+        self.points = np.zeros((len(self.indices), 3), dtype=np.float32)
+
+    def extract(self, face_landmarks):
+        """Copy the subset of one face into self.points and return it"""
+        landmarks = face_landmarks.landmark
+        points = self.points
+        for row, index in enumerate(self.indices):
+            lm = landmarks[index]
+            points[row, 0] = lm.x
+            points[row, 1] = lm.y
+            points[row, 2] = lm.z
+        return points
+
+
+class OSCSubsetSender:
+    """Send subset points as one flat OSC message per frame"""
+
+    def __init__(self, ip="127.0.0.1", port=8000, address="/face/subset"):
+        if udp_client is None:
+            raise RuntimeError("python-osc not installed. Install with: pip install python-osc")
+        self.client = udp_client.SimpleUDPClient(ip, port)
+        self.address = address
+
+    def send(self, points):
+        self.client.send_message(self.address, points.ravel().tolist())
+
+
+class SharedSubsetBuffer:
+    """
+    Shared memory buffer holding the latest subset points
+
+    Layout: float64 [sequence, timestamp] followed by float32 (points, 3).
+    The sequence number is odd while a frame is being written, so readers in
+    other processes can retry instead of reading a half-written frame.
+    """
+
+    HEADER_BYTES = 16
+
+    def __init__(self, num_points, name="face_subset", create=True):
+        size = self.HEADER_BYTES + num_points * 3 * 4
+        if create:
+            try:
+                self.shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+            except FileExistsError:
+                # Left behind by a run that crashed, possibly with another size
+                stale = shared_memory.SharedMemory(name=name)
+                stale.close()
+                stale.unlink()
+                self.shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        else:
+            self.shm = shared_memory.SharedMemory(name=name)
+        self.owner = create
+        self.header = np.ndarray((2,), dtype=np.float64, buffer=self.shm.buf)
+        self.points = np.ndarray((num_points, 3), dtype=np.float32,
+                                 buffer=self.shm.buf, offset=self.HEADER_BYTES)
+
+    def send(self, points):
+        self.header[0] += 1
+        self.points[:] = points
+        self.header[1] = time.time()
+        self.header[0] += 1
+
+    def read(self):
+        """Return (sequence, timestamp, points copy) of the latest complete frame"""
+        while True:
+            sequence = self.header[0]
+            if sequence % 2 == 0:
+                points = self.points.copy()
+                timestamp = float(self.header[1])
+                if self.header[0] == sequence:
+                    return int(sequence // 2), timestamp, points
+            time.sleep(0)
+
+    def close(self):
+        # Drop the numpy views before closing the mapping
+        del self.header, self.points
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+
+def benchmark(iterations=300, regions=DEFAULT_REGIONS):
+    """Compare full-mesh conversion + drawing with subset extraction"""
+    import cv2
+    import mediapipe as mp
+    from mediapipe.framework.formats import landmark_pb2
+
+    mp_face_mesh = mp.solutions.face_mesh
+    mp_drawing = mp.solutions.drawing_utils
+    mp_drawing_styles = mp.solutions.drawing_styles
+
+    rng = np.random.default_rng(0)
+    face = landmark_pb2.NormalizedLandmarkList()
+    for x, y, z in rng.uniform(0.3, 0.7, size=(478, 3)):
+        face.landmark.add(x=x, y=y, z=z - 0.5)
+    frame = np.zeros((480, 640, 3), dtype=np.uint8)
+    subset = FaceSubset(region_indices(regions))
+
+    def full_path():
+        np.array([(lm.x, lm.y, lm.z) for lm in face.landmark], dtype=np.float32)
+        mp_drawing.draw_landmarks(
+            frame, face, mp_face_mesh.FACEMESH_TESSELATION, landmark_drawing_spec=None,
+            connection_drawing_spec=mp_drawing_styles.get_default_face_mesh_tesselation_style()
+        )
+        mp_drawing.draw_landmarks(
+            frame, face, mp_face_mesh.FACEMESH_CONTOURS, landmark_drawing_spec=None,
+            connection_drawing_spec=mp_drawing_styles.get_default_face_mesh_contours_style()
+        )
+
+    def subset_preview():
+        points = subset.extract(face)
+        for x, y, _ in points:
+            cv2.circle(frame, (int(x * 640), int(y * 480)), 2, (0, 255, 0), -1)
+
+    paths = [
+        ("Full mesh convert + draw", full_path),
+        (f"Subset ({len(subset.indices)} points) + preview", subset_preview),
+        (f"Subset ({len(subset.indices)} points) only", lambda: subset.extract(face)),
+    ]
+    for name, path in paths:
+        start = time.perf_counter()
+        for _ in range(iterations):
+            path()
+        per_frame = (time.perf_counter() - start) / iterations * 1000
+        print(f"⏱️  {name:35s} {per_frame:7.3f} ms/frame")
+
+
+if __name__ == "__main__":
+    print("🎭 Face Mesh Subset Benchmark")
+    print("=" * 40)
+    benchmark()
@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+"""
+Vectorised gesture engine for MediaPipe hand landmarks
+Classifies every detected hand at once from a (hands, 21, 3) NumPy array
+"""
+
+import time
+import numpy as np
+
+# Landmark indices per finger: base, middle joint, upper joint, tip
+# Thumb uses CMC, MCP, IP, TIP; the other fingers use MCP, PIP, DIP, TIP
+FINGER_JOINTS = np.array([
+    [1, 2, 3, 4],      # Thumb
+    [5, 6, 7, 8],      # Index
+    [9, 10, 11, 12],   # Middle
+    [13, 14, 15, 16],  # Ring
+    [17, 18, 19, 20],  # Pinky
+])
+
+WRIST = 0
+MIDDLE_MCP = 9
+PINKY_MCP = 17
+
+# Bit weight for each finger when packing states into a 5-bit mask
+FINGER_BITS = np.array([1, 2, 4, 8, 16])
+
+
+def landmarks_to_array(landmarks):
+    """Convert one hand's landmark list into a (21, 3) float32 array"""
+    return np.array([(lm.x, lm.y, lm.z) for lm in landmarks], dtype=np.float32)
+
+
+def hands_to_array(multi_hand_landmarks):
+    """Convert MediaPipe multi_hand_landmarks into a (hands, 21, 3) float32 array"""
+    if not multi_hand_landmarks:
+        return np.empty((0, 21, 3), dtype=np.float32)
+    return np.stack([landmarks_to_array(hand.landmark) for hand in multi_hand_landmarks])
+
+
+def fingers_to_mask(fingers):
+    """Pack a [thumb, index, middle, ring, pinky] list of 0/1 into a 5-bit mask"""
+    return int(np.dot(np.asarray(fingers, dtype=np.int64), FINGER_BITS))
+
+
+def _unit(vectors):
+    """Normalise vectors along the last axis (safe for zero-length vectors)"""
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return vectors / np.maximum(norms, 1e-6)
+
+
+def thumb_pointing_down(hands):
+    """Thumb direction (MCP -> TIP) points down the image"""
+    direction = _unit(hands[:, 4, :2] - hands[:, 2, :2])
+    return direction[:, 1] > 0.5
+
+
+def thumb_index_pinch(hands):
+    """Thumb tip touches the index tip, relative to palm size"""
+    palm = np.linalg.norm(hands[:, MIDDLE_MCP] - hands[:, WRIST], axis=-1)
+    gap = np.linalg.norm(hands[:, 4] - hands[:, 8], axis=-1)
+    return gap < 0.35 * palm
+
+
+class GestureEngine:
+    """
+    Finger-state gesture classifier working on landmark arrays
+
+    Finger extension is decided with joint-angle tests for all hands in one
+    pass. The resulting 5-bit finger mask indexes a precomputed 32-entry label
+    table. A few masks can be refined by boolean geometric features; these are
+    only evaluated when one of the hands actually has that mask.
+    """
+
+    def __init__(self, straight_cos=0.6):
+        """
+        Args:
+            straight_cos: Minimum cosine between consecutive finger segments
+                for a finger to count as extended (0.6 is roughly 53 degrees)
+        """
+        self.straight_cos = straight_cos
+        self.features = {}
+        self.refinements = {}  # mask -> list of (feature name, label)
+        self.labels = np.empty(32, dtype=object)
+        self._build_default_table()
+
+    def _build_default_table(self):
+        """Fill the lookup table with the gestures of 5_gesture_recognition.py"""
+        count_labels = {
+            0: "✊ Fist",
+            1: "1️⃣ One",
+            2: "2️⃣ Two",
+            3: "3️⃣ Three",
+            4: "4️⃣ Four",
+            5: "🖐️ Open Hand",
+        }
+        for mask in range(32):
+            self.labels[mask] = count_labels[bin(mask).count("1")]
+
+        self.register_gesture("👍 Thumbs Up", [1, 0, 0, 0, 0])
+        self.register_gesture("✌️ Peace", [0, 1, 1, 0, 0])
+        self.register_gesture("🤟 Rock On", [0, 1, 0, 0, 1])
+        self.register_gesture("👉 Pointing", [0, 1, 0, 0, 0])
+
+        self.register_feature("thumb_down", thumb_pointing_down)
+        self.register_feature("pinch", thumb_index_pinch)
+        self.register_gesture("👎 Thumbs Down", [1, 0, 0, 0, 0], feature="thumb_down")
+        self.register_gesture("👌 OK", [1, 0, 1, 1, 1], feature="pinch")
+        self.register_gesture("👌 OK", [0, 0, 1, 1, 1], feature="pinch")
+
+    def register_feature(self, name, func):
+        """
+        Register a geometric feature
+
+        Args:
+            name: Feature name used by register_gesture
+            func: Callable taking a (hands, 21, 3) array and returning a
+                boolean array with one entry per hand
+        """
+        self.features[name] = func
+
+    def register_gesture(self, label, fingers, feature=None):
+        """
+        Register a gesture for a finger pattern
+
+        Args:
+            label: Text returned by classify
+            fingers: [thumb, index, middle, ring, pinky] with 1 for extended
+            feature: Optional feature name that must also be true; refinements
+                registered later take priority over earlier ones
+        """
+        mask = fingers_to_mask(fingers)
+        if feature is None:
+            self.labels[mask] = label
+            return
+        if feature not in self.features:
+            raise ValueError(f"Unknown gesture feature: {feature}")
+        self.refinements.setdefault(mask, []).insert(0, (feature, label))
+
+    def finger_states(self, hands):
+        """Return a (hands, 5) boolean array of extended fingers"""
+        joints = hands[:, FINGER_JOINTS]                    # (n, 5, 4, 3)
+        segments = _unit(np.diff(joints, axis=2))           # (n, 5, 3, 3)
+        # Cosine between consecutive segments: 1 means a straight finger
+        bends = np.einsum('nfsk,nfsk->nfs', segments[:, :, :-1], segments[:, :, 1:])
+        straight = np.all(bends > self.straight_cos, axis=2)
+
+        # Fingers must also reach away from the wrist; the thumb must reach
+        # away from the pinky knuckle so a thumb folded over the palm is down
+        wrist = hands[:, WRIST][:, None]
+        tip_dist = np.linalg.norm(joints[:, 1:, 3] - wrist, axis=-1)
+        pip_dist = np.linalg.norm(joints[:, 1:, 1] - wrist, axis=-1)
+        reach = np.empty_like(straight)
+        reach[:, 1:] = tip_dist > pip_dist
+        pinky_mcp = hands[:, PINKY_MCP]
+        reach[:, 0] = (np.linalg.norm(hands[:, 4] - pinky_mcp, axis=-1)
+                       > np.linalg.norm(hands[:, 3] - pinky_mcp, axis=-1))
+        return straight & reach
+
+    def finger_masks(self, hands):
+        """Return the 5-bit finger mask for every hand"""
+        return self.finger_states(hands).astype(np.int64) @ FINGER_BITS
+
+    def classify(self, hands):
+        """
+        Classify all hands at once
+
+        Args:
+            hands: (hands, 21, 3) landmark array from hands_to_array
+
+        Returns:
+            list: One gesture label per hand
+        """
+        hands = np.asarray(hands, dtype=np.float32)
+        if len(hands) == 0:
+            return []
+        masks = self.finger_masks(hands)
+        labels = self.labels[masks]
+
+        for mask in np.unique(masks):
+            rules = self.refinements.get(int(mask))
+            if not rules:
+                continue
+            rows = np.flatnonzero(masks == mask)
+            subset = hands[rows]
+            undecided = np.ones(len(rows), dtype=bool)
+            for feature, label in rules:
+                hit = undecided & self.features[feature](subset)
+                labels[rows[hit]] = label
+                undecided &= ~hit
+
+        return labels.tolist()
+
+
+def benchmark(num_hands=2, iterations=2000):
+    """Time classify() on random hands"""
+    rng = np.random.default_rng(0)
+    hands = rng.random((num_hands, 21, 3), dtype=np.float32)
+    engine = GestureEngine()
+    engine.classify(hands)
+
+    start = time.perf_counter()
+    for _ in range(iterations):
+        engine.classify(hands)
+    elapsed = time.perf_counter() - start
+    per_call = elapsed / iterations * 1e6
+    print(f"⏱️  {num_hands} hands: {per_call:.1f} µs per classify ({per_call / num_hands:.1f} µs per hand)")
+
+
+if __name__ == "__main__":
+    print("👋 Gesture Engine Benchmark")
+    print("=" * 40)
+    for n in (1, 2, 8, 32):
+        benchmark(n)
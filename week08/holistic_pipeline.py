@@ -0,0 +1,308 @@
+#!/usr/bin/env python3
+"""
+Configurable holistic pipeline
+Runs pose on every frame and uses the pose landmarks to crop the face and
+hand regions for separate FaceMesh and Hands models. Each part can be turned
+off or run at a lower rate, and every frame comes back as one structured array.
+
+The crops move and resize with the pose every frame, so the face and hand
+models run in static image mode: in tracking mode they would reuse last
+frame's region in the previous crop's coordinates, which is stale as soon as
+the subject moves. Pose itself keeps tracking on the full frame.
+
+Run this file directly to compare throughput of several configurations:
+    python holistic_pipeline.py              # camera from .env
+    python holistic_pipeline.py dance.mp4    # video file
+"""
+
+import sys
+import time
+import numpy as np
+
+# One structured record per frame; missing parts are NaN
+HOLISTIC_DTYPE = np.dtype([
+    ('timestamp', np.float64),
+    ('pose', np.float32, (33, 4)),         # x, y, z, visibility
+    ('face', np.float32, (468, 3)),
+    ('left_hand', np.float32, (21, 3)),
+    ('right_hand', np.float32, (21, 3)),
+    ('face_age', np.int32),                # frames since the face model last ran
+])
+
+# Pose landmarks used to place the crops
+FACE_POINTS = list(range(11))              # nose, eyes, ears, mouth
+HAND_POINTS = {
+    'left_hand': [15, 17, 19, 21],         # wrist, pinky, index, thumb
+    'right_hand': [16, 18, 20, 22],
+}
+ELBOWS = {'left_hand': 13, 'right_hand': 14}
+NOSE = 0
+
+
+def empty_record():
+    """A HOLISTIC_DTYPE record with every landmark set to NaN"""
+    record = np.zeros((), dtype=HOLISTIC_DTYPE)
+    for name in ('pose', 'face', 'left_hand', 'right_hand'):
+        record[name] = np.nan
+    record['face_age'] = -1
+    return record
+
+
+def landmark_list(points):
+    """Build a MediaPipe NormalizedLandmarkList from an array (for drawing)"""
+    from mediapipe.framework.formats import landmark_pb2
+
+    landmarks = landmark_pb2.NormalizedLandmarkList()
+    if np.isnan(points[0, 0]):
+        return None
+    if points.shape[1] == 4:
+        for x, y, z, visibility in points:
+            landmarks.landmark.add(x=x, y=y, z=z, visibility=visibility)
+    else:
+        for x, y, z in points:
+            landmarks.landmark.add(x=x, y=y, z=z)
+    return landmarks
+
+
+def square_roi(points_px, scale, min_size, width, height):
+    """
+    Square crop around pixel points
+
+    Returns:
+        tuple: (x0, y0, x1, y1) clipped to the frame, or None if too small
+    """
+    center = points_px.mean(axis=0)
+    size = max(np.ptp(points_px, axis=0).max() * scale, min_size)
+    x0, y0 = (max(int(v), 0) for v in center - size / 2)
+    x1, y1 = (int(v) for v in center + size / 2)
+    x1, y1 = min(x1, width), min(y1, height)
+    if x1 - x0 < 16 or y1 - y0 < 16:
+        return None
+    return x0, y0, x1, y1
+
+
+def crop_to_frame(points, roi, width, height):
+    """Map landmarks normalised to a crop back to full-frame normalised coordinates"""
+    x0, y0, x1, y1 = roi
+    out = points.copy()
+    out[:, 0] = (x0 + points[:, 0] * (x1 - x0)) / width
+    out[:, 1] = (y0 + points[:, 1] * (y1 - y0)) / height
+    out[:, 2] = points[:, 2] * (x1 - x0) / width
+    return out
+
+
+def _to_array(landmarks, count):
+    return np.array([(lm.x, lm.y, lm.z) for lm in landmarks.landmark[:count]], dtype=np.float32)
+
+
+class HolisticPipeline:
+    """
+    Pose-driven holistic detector with selectable parts
+
+    Usage:
+        pipeline = HolisticPipeline(face=True, left_hand=False, face_every=3)
+        record = pipeline.process(rgb_frame)
+        record['pose'], record['face'], record['right_hand']
+    """
+
+    def __init__(self, face=True, left_hand=True, right_hand=True,
+                 face_every=1, hands_every=1, pose_complexity=1):
+        """
+        Args:
+            face: Run FaceMesh on the face crop
+            left_hand: Run Hands on the left hand crop
+            right_hand: Run Hands on the right hand crop
+            face_every: Run the face model every N frames (reused in between)
+            hands_every: Run the hand models every N frames
+            pose_complexity: MediaPipe Pose model_complexity (0, 1 or 2)
+        """
+        import mediapipe as mp
+
+        self.pose = mp.solutions.pose.Pose(
+            model_complexity=pose_complexity,
+            min_detection_confidence=0.5,
+            min_tracking_confidence=0.5
+        )
+        # Crop models: static image mode, their input is re-cropped every frame
+        self.face = mp.solutions.face_mesh.FaceMesh(
+            static_image_mode=True,
+            max_num_faces=1,
+            refine_landmarks=False,
+            min_detection_confidence=0.5
+        )
+        self.hands = {
+            side: mp.solutions.hands.Hands(
+                static_image_mode=True,
+                max_num_hands=1,
+                model_complexity=0,
+                min_detection_confidence=0.5
+            )
+            for side in HAND_POINTS
+        }
+        self.enabled = {'face': face, 'left_hand': left_hand, 'right_hand': right_hand}
+        self.face_every = face_every
+        self.hands_every = hands_every
+
+        self.frame_index = 0
+        self.last = empty_record()
+        self.face_nose = None  # nose position when the face model last ran
+        self.timings = {part: [0.0, 0] for part in ('pose', 'face', 'left_hand', 'right_hand')}
+
+    def toggle(self, part):
+        self.enabled[part] = not self.enabled[part]
+        if not self.enabled[part]:
+            self.last[part] = np.nan
+        return self.enabled[part]
+
+    def _timed(self, part, func, *args):
+        start = time.perf_counter()
+        result = func(*args)
+        self.timings[part][0] += time.perf_counter() - start
+        self.timings[part][1] += 1
+        return result
+
+    def process(self, rgb_frame):
+        """Process one RGB frame and return a HOLISTIC_DTYPE record"""
+        height, width, _ = rgb_frame.shape
+        record = empty_record()
+        record['timestamp'] = time.time()
+
+        pose_results = self._timed('pose', self.pose.process, rgb_frame)
+        if pose_results.pose_landmarks is None:
+            self.face_nose = None
+            self.last = record
+            self.frame_index += 1
+            return record
+
+        pose = np.array(
+            [(lm.x, lm.y, lm.z, lm.visibility) for lm in pose_results.pose_landmarks.landmark],
+            dtype=np.float32
+        )
+        record['pose'] = pose
+        pose_px = pose[:, :2] * (width, height)
+
+        if self.enabled['face']:
+            self._update_face(rgb_frame, record, pose, pose_px)
+
+        for side in HAND_POINTS:
+            if not self.enabled[side]:
+                continue
+            if self.frame_index % self.hands_every == 0:
+                record[side] = self._detect_hand(rgb_frame, side, pose, pose_px)
+            else:
+                record[side] = self.last[side]
+
+        self.last = record
+        self.frame_index += 1
+        return record
+
+    def _update_face(self, rgb_frame, record, pose, pose_px):
+        height, width, _ = rgb_frame.shape
+        if self.frame_index % self.face_every != 0 and self.face_nose is not None:
+            # Reuse the last face, moved along with the pose nose
+            face = self.last['face'].copy()
+            face[:, :2] += pose[NOSE, :2] - self.face_nose
+            record['face'] = face
+            record['face_age'] = self.last['face_age'] + 1
+            self.face_nose = pose[NOSE, :2].copy()
+            return
+
+        roi = square_roi(pose_px[FACE_POINTS], scale=1.8, min_size=64, width=width, height=height)
+        if roi is None:
+            self.face_nose = None
+            return
+        x0, y0, x1, y1 = roi
+        results = self._timed('face', self.face.process, np.ascontiguousarray(rgb_frame[y0:y1, x0:x1]))
+        if not results.multi_face_landmarks:
+            self.face_nose = None
+            return
+        record['face'] = crop_to_frame(_to_array(results.multi_face_landmarks[0], 468), roi, width, height)
+        record['face_age'] = 0
+        self.face_nose = pose[NOSE, :2].copy()
+
+    def _detect_hand(self, rgb_frame, side, pose, pose_px):
+        height, width, _ = rgb_frame.shape
+        nan_hand = np.full((21, 3), np.nan, dtype=np.float32)
+        if pose[HAND_POINTS[side][0], 3] < 0.5:
+            return nan_hand
+
+        # Hand size follows the forearm length
+        forearm = np.linalg.norm(pose_px[HAND_POINTS[side][0]] - pose_px[ELBOWS[side]])
+        roi = square_roi(pose_px[HAND_POINTS[side]], scale=3.0, min_size=forearm * 0.9,
+                         width=width, height=height)
+        if roi is None:
+            return nan_hand
+        x0, y0, x1, y1 = roi
+        results = self._timed(side, self.hands[side].process, np.ascontiguousarray(rgb_frame[y0:y1, x0:x1]))
+        if not results.multi_hand_landmarks:
+            return nan_hand
+        return crop_to_frame(_to_array(results.multi_hand_landmarks[0], 21), roi, width, height)
+
+    def report(self):
+        """Mean milliseconds per call and calls per frame for each part"""
+        frames = max(self.frame_index, 1)
+        return {
+            part: (total / calls * 1000 if calls else 0.0, calls / frames)
+            for part, (total, calls) in self.timings.items()
+        }
+
+    def close(self):
+        self.pose.close()
+        self.face.close()
+        for hands in self.hands.values():
+            hands.close()
+
+
+BENCHMARK_CONFIGS = {
+    'all parts, every frame': dict(),
+    'face every 3rd frame': dict(face_every=3),
+    'pose + hands': dict(face=False),
+    'pose + right hand': dict(face=False, left_hand=False),
+    'pose only': dict(face=False, left_hand=False, right_hand=False),
+}
+
+
+def benchmark(source=None, frames=150):
+    """Report throughput per configuration, plus MediaPipe Holistic as a baseline"""
+    import cv2
+    import mediapipe as mp
+    from camera_utils import init_camera
+
+    if source is None:
+        cap, _ = init_camera()
+    else:
+        cap = cv2.VideoCapture(source)
+    clip = []
+    while len(clip) < frames:
+        ret, frame = cap.read()
+        if not ret:
+            break
+        clip.append(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
+    cap.release()
+    print(f"🎬 Benchmarking on {len(clip)} frames")
+
+    with mp.solutions.holistic.Holistic() as holistic:
+        start = time.perf_counter()
+        for rgb_frame in clip:
+            holistic.process(rgb_frame)
+        elapsed = time.perf_counter() - start
+    print(f"⏱️  {'MediaPipe Holistic (baseline)':28s} {len(clip) / elapsed:6.1f} fps")
+
+    for name, config in BENCHMARK_CONFIGS.items():
+        pipeline = HolisticPipeline(**config)
+        start = time.perf_counter()
+        for rgb_frame in clip:
+            pipeline.process(rgb_frame)
+        elapsed = time.perf_counter() - start
+        parts = ", ".join(
+            f"{part} {ms:.1f}ms x{rate:.2f}"
+            for part, (ms, rate) in pipeline.report().items() if rate > 0
+        )
+        print(f"⏱️  {name:28s} {len(clip) / elapsed:6.1f} fps | {parts}")
+        pipeline.close()
+
+
+if __name__ == "__main__":
+    print("🎭 Holistic Pipeline Benchmark")
+    print("=" * 40)
+    benchmark(sys.argv[1] if len(sys.argv) > 1 else None)
@@ -0,0 +1,303 @@
+#!/usr/bin/env python3
+"""
+Landmark recording utilities
+Stores per-frame MediaPipe landmarks as memory-mapped columnar files
+
+A recording is a folder with one raw float32 file per landmark stream, a
+float64 timestamps file and a meta.json describing the array shapes:
+
+    recordings/hands_20250101_120000/
+        meta.json
+        timestamps.f64
+        hands.f32           # (frames, 2, 21, 3)
+        handedness.f32      # (frames, 2)  0 = Left, 1 = Right
+
+Missing detections are stored as NaN so every frame has the same size.
+"""
+
+import json
+import time
+from pathlib import Path
+import numpy as np
+
+RECORDINGS_DIR = Path(__file__).parent / 'recordings'
+
+# Fixed per-frame shape of every stream written by each detector
+DETECTOR_STREAMS = {
+    'hands': {
+        'hands': (2, 21, 3),
+        'handedness': (2,),
+    },
+    'pose': {
+        'pose': (33, 4),  # x, y, z, visibility
+    },
+    'face_mesh': {
+        'face': (478, 3),  # 468 mesh points + 10 iris points
+    },
+    'holistic': {
+        'pose': (33, 4),
+        'face': (468, 3),
+        'left_hand': (21, 3),
+        'right_hand': (21, 3),
+    },
+}
+
+
+def create_detector(detector, static_image_mode=False):
+    """Create the MediaPipe model used for a detector name"""
+    import mediapipe as mp
+
+    if detector == 'hands':
+        return mp.solutions.hands.Hands(
+            static_image_mode=static_image_mode,
+            max_num_hands=2,
+            min_detection_confidence=0.5,
+            min_tracking_confidence=0.5
+        )
+    if detector == 'pose':
+        return mp.solutions.pose.Pose(
+            static_image_mode=static_image_mode,
+            min_detection_confidence=0.5,
+            min_tracking_confidence=0.5
+        )
+    if detector == 'face_mesh':
+        return mp.solutions.face_mesh.FaceMesh(
+            static_image_mode=static_image_mode,
+            max_num_faces=1,
+            refine_landmarks=True,
+            min_detection_confidence=0.5,
+            min_tracking_confidence=0.5
+        )
+    if detector == 'holistic':
+        return mp.solutions.holistic.Holistic(
+            static_image_mode=static_image_mode,
+            min_detection_confidence=0.5,
+            min_tracking_confidence=0.5
+        )
+    raise ValueError(f"Unknown detector: {detector}")
+
+
+def _fill(out, landmark_list, with_visibility=False):
+    """Copy a MediaPipe landmark list into the first rows of out"""
+    if landmark_list is None:
+        return
+    if with_visibility:
+        points = [(lm.x, lm.y, lm.z, lm.visibility) for lm in landmark_list.landmark]
+    else:
+        points = [(lm.x, lm.y, lm.z) for lm in landmark_list.landmark]
+    count = min(len(points), len(out))
+    out[:count] = points[:count]
+
+
+def extract_landmarks(detector, results):
+    """
+    Convert MediaPipe results into fixed-shape arrays
+
+    Returns:
+        dict: stream name -> float32 array (NaN where nothing was detected)
+    """
+    frame = {
+        name: np.full(shape, np.nan, dtype=np.float32)
+        for name, shape in DETECTOR_STREAMS[detector].items()
+    }
+
+    if detector == 'hands':
+        if results.multi_hand_landmarks:
+            for i, (hand, handedness) in enumerate(
+                zip(results.multi_hand_landmarks, results.multi_handedness)
+            ):
+                if i >= len(frame['hands']):
+                    break
+                _fill(frame['hands'][i], hand)
+                label = handedness.classification[0].label
+                frame['handedness'][i] = 1.0 if label == 'Right' else 0.0
+    elif detector == 'pose':
+        _fill(frame['pose'], results.pose_landmarks, with_visibility=True)
+    elif detector == 'face_mesh':
+        if results.multi_face_landmarks:
+            _fill(frame['face'], results.multi_face_landmarks[0])
+    elif detector == 'holistic':
+        _fill(frame['pose'], results.pose_landmarks, with_visibility=True)
+        _fill(frame['face'], results.face_landmarks)
+        _fill(frame['left_hand'], results.left_hand_landmarks)
+        _fill(frame['right_hand'], results.right_hand_landmarks)
+
+    return frame
+
+
+def _write_meta(path, detector, fps=None, source=None):
+    meta = {
+        'detector': detector,
+        'streams': {name: list(shape) for name, shape in DETECTOR_STREAMS[detector].items()},
+        'dtype': 'float32',
+        'fps': fps,
+        'source': source,
+        'created': time.strftime('%Y-%m-%d %H:%M:%S'),
+    }
+    (path / 'meta.json').write_text(json.dumps(meta, indent=2))
+
+
+def allocate_recording(path, detector, num_frames, fps, source=None):
+    """
+    Preallocate a recording of num_frames frames (used by the batch processor)
+
+    Every stream is filled with NaN and timestamps are set from fps, so worker
+    processes can write their frame ranges in place with open_for_update.
+    """
+    path = Path(path)
+    path.mkdir(parents=True, exist_ok=True)
+    _write_meta(path, detector, fps=fps, source=source)
+
+    timestamps = np.memmap(path / 'timestamps.f64', dtype=np.float64, mode='w+', shape=(num_frames,))
+    timestamps[:] = np.arange(num_frames) / fps
+    timestamps.flush()
+
+    for name, shape in DETECTOR_STREAMS[detector].items():
+        stream = np.memmap(path / f'{name}.f32', dtype=np.float32, mode='w+', shape=(num_frames, *shape))
+        stream[:] = np.nan
+        stream.flush()
+    return path
+
+
+def truncate_recording(path, num_frames):
+    """Cut an allocated recording down to its first num_frames frames"""
+    path = Path(path)
+    meta = json.loads((path / 'meta.json').read_text())
+    sizes = {'timestamps.f64': 8}
+    for name, shape in meta['streams'].items():
+        sizes[f'{name}.f32'] = int(np.prod(shape)) * 4
+    for file, frame_bytes in sizes.items():
+        with open(path / file, 'r+b') as f:
+            f.truncate(num_frames * frame_bytes)
+
+
+def open_for_update(path):
+    """Open every stream of an allocated recording as a writable memmap"""
+    return LandmarkRecording(path, mode='r+').streams
+
+
+class LandmarkRecorder:
+    """
+    Append-only recorder for live detector output
+
+    Usage:
+        with LandmarkRecorder('hands') as recorder:
+            recorder.write(results)
+    """
+
+    def __init__(self, detector, path=None):
+        if detector not in DETECTOR_STREAMS:
+            raise ValueError(f"Unknown detector: {detector}")
+        if path is None:
+            path = RECORDINGS_DIR / f"{detector}_{time.strftime('%Y%m%d_%H%M%S')}"
+        self.detector = detector
+        self.path = Path(path)
+        self.path.mkdir(parents=True, exist_ok=True)
+        _write_meta(self.path, detector, source='camera')
+
+        self.files = {
+            name: open(self.path / f'{name}.f32', 'ab')
+            for name in DETECTOR_STREAMS[detector]
+        }
+        self.timestamps = open(self.path / 'timestamps.f64', 'ab')
+        self.start_time = time.time()
+        self.frame_count = 0
+
+    def write(self, results, timestamp=None):
+        """Append one frame of MediaPipe results"""
+        self.write_arrays(extract_landmarks(self.detector, results), timestamp)
+
+    def write_arrays(self, frame, timestamp=None):
+        """Append one frame given as a dict of stream arrays"""
+        if timestamp is None:
+            timestamp = time.time() - self.start_time
+        for name, handle in self.files.items():
+            handle.write(np.ascontiguousarray(frame[name], dtype=np.float32).tobytes())
+        self.timestamps.write(np.float64(timestamp).tobytes())
+        self.frame_count += 1
+
+    def close(self):
+        for handle in self.files.values():
+            handle.close()
+        self.timestamps.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _map(file, dtype, mode, shape):
+    """np.memmap that also works for empty recordings"""
+    if shape[0] == 0:
+        return np.empty(shape, dtype=dtype)
+    return np.memmap(file, dtype=dtype, mode=mode, shape=shape)
+
+
+class LandmarkRecording:
+    """
+    Read a recording as memory-mapped arrays
+
+    Usage:
+        rec = LandmarkRecording('recordings/hands_20250101_120000')
+        wrists = rec['hands'][:, :, 0]     # (frames, 2, 3), nothing loaded yet
+    """
+
+    def __init__(self, path, mode='r'):
+        self.path = Path(path)
+        self.meta = json.loads((self.path / 'meta.json').read_text())
+        self.detector = self.meta['detector']
+        timestamps_file = self.path / 'timestamps.f64'
+        num_frames = timestamps_file.stat().st_size // 8
+        self.timestamps = _map(timestamps_file, np.float64, mode, (num_frames,))
+
+        self.streams = {}
+        for name, shape in self.meta['streams'].items():
+            self.streams[name] = _map(self.path / f'{name}.f32', np.float32, mode, (num_frames, *shape))
+
+    def __len__(self):
+        return len(self.timestamps)
+
+    def __getitem__(self, name):
+        return self.streams[name]
+
+    def detected(self, name):
+        """Boolean mask of frames (and hand slots) where a stream has a detection"""
+        stream = self.streams[name]
+        if stream.ndim >= 3:
+            return ~np.isnan(stream[..., 0, 0])
+        return ~np.isnan(stream)
+
+
+class RecordingToggle:
+    """Start/stop a LandmarkRecorder from a live script (bound to the 'r' key)"""
+
+    def __init__(self, detector):
+        self.detector = detector
+        self.recorder = None
+
+    @property
+    def active(self):
+        return self.recorder is not None
+
+    def toggle(self):
+        if self.recorder is None:
+            self.recorder = LandmarkRecorder(self.detector)
+            print(f"🔴 Recording landmarks to {self.recorder.path}")
+        else:
+            self.stop()
+
+    def write(self, results):
+        if self.recorder is not None:
+            self.recorder.write(results)
+
+    def write_arrays(self, frame, timestamp=None):
+        if self.recorder is not None:
+            self.recorder.write_arrays(frame, timestamp)
+
+    def stop(self):
+        if self.recorder is not None:
+            self.recorder.close()
+            print(f"💾 Saved {self.recorder.frame_count} frames to {self.recorder.path}")
+            self.recorder = None
@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+"""
+Vectorised pose features for MediaPipe Pose
+Computes joint angles, segment lengths and velocities for all 33 landmarks
+in one NumPy call per frame, with an optional rolling history for rep counting
+"""
+
+import time
+import numpy as np
+
+# MediaPipe PoseLandmark names, in landmark index order
+POSE_LANDMARKS = [
+    'NOSE', 'LEFT_EYE_INNER', 'LEFT_EYE', 'LEFT_EYE_OUTER',
+    'RIGHT_EYE_INNER', 'RIGHT_EYE', 'RIGHT_EYE_OUTER', 'LEFT_EAR', 'RIGHT_EAR',
+    'MOUTH_LEFT', 'MOUTH_RIGHT', 'LEFT_SHOULDER', 'RIGHT_SHOULDER',
+    'LEFT_ELBOW', 'RIGHT_ELBOW', 'LEFT_WRIST', 'RIGHT_WRIST',
+    'LEFT_PINKY', 'RIGHT_PINKY', 'LEFT_INDEX', 'RIGHT_INDEX',
+    'LEFT_THUMB', 'RIGHT_THUMB', 'LEFT_HIP', 'RIGHT_HIP',
+    'LEFT_KNEE', 'RIGHT_KNEE', 'LEFT_ANKLE', 'RIGHT_ANKLE',
+    'LEFT_HEEL', 'RIGHT_HEEL', 'LEFT_FOOT_INDEX', 'RIGHT_FOOT_INDEX',
+]
+LANDMARK_INDEX = {name: i for i, name in enumerate(POSE_LANDMARKS)}
+
+# Joint angles: name -> (first point, joint, end point)
+DEFAULT_ANGLES = {
+    'left_elbow': ('LEFT_SHOULDER', 'LEFT_ELBOW', 'LEFT_WRIST'),
+    'right_elbow': ('RIGHT_SHOULDER', 'RIGHT_ELBOW', 'RIGHT_WRIST'),
+    'left_shoulder': ('LEFT_HIP', 'LEFT_SHOULDER', 'LEFT_ELBOW'),
+    'right_shoulder': ('RIGHT_HIP', 'RIGHT_SHOULDER', 'RIGHT_ELBOW'),
+    'left_hip': ('LEFT_SHOULDER', 'LEFT_HIP', 'LEFT_KNEE'),
+    'right_hip': ('RIGHT_SHOULDER', 'RIGHT_HIP', 'RIGHT_KNEE'),
+    'left_knee': ('LEFT_HIP', 'LEFT_KNEE', 'LEFT_ANKLE'),
+    'right_knee': ('RIGHT_HIP', 'RIGHT_KNEE', 'RIGHT_ANKLE'),
+}
+
+# Body segments: name -> (start point, end point)
+DEFAULT_SEGMENTS = {
+    'left_upper_arm': ('LEFT_SHOULDER', 'LEFT_ELBOW'),
+    'right_upper_arm': ('RIGHT_SHOULDER', 'RIGHT_ELBOW'),
+    'left_forearm': ('LEFT_ELBOW', 'LEFT_WRIST'),
+    'right_forearm': ('RIGHT_ELBOW', 'RIGHT_WRIST'),
+    'shoulders': ('LEFT_SHOULDER', 'RIGHT_SHOULDER'),
+    'hips': ('LEFT_HIP', 'RIGHT_HIP'),
+    'left_thigh': ('LEFT_HIP', 'LEFT_KNEE'),
+    'right_thigh': ('RIGHT_HIP', 'RIGHT_KNEE'),
+    'left_shin': ('LEFT_KNEE', 'LEFT_ANKLE'),
+    'right_shin': ('RIGHT_KNEE', 'RIGHT_ANKLE'),
+}
+
+
+def pose_to_array(pose_landmarks):
+    """Convert MediaPipe pose_landmarks into a (33, 4) float32 array of x, y, z, visibility"""
+    return np.array(
+        [(lm.x, lm.y, lm.z, lm.visibility) for lm in pose_landmarks.landmark],
+        dtype=np.float32
+    )
+
+
+def _indices(spec):
+    """Turn {name: (landmark names...)} into a names list and an index array"""
+    names = list(spec)
+    index = np.array([[LANDMARK_INDEX[p] for p in spec[name]] for name in names], dtype=np.intp)
+    return names, index
+
+
+class PoseHistory:
+    """Fixed-size ring buffer of per-frame feature vectors"""
+
+    def __init__(self, size, width):
+        self.values = np.full((size, width), np.nan, dtype=np.float32)
+        self.times = np.full(size, np.nan)
+        self.size = size
+        self.count = 0
+
+    def append(self, values, timestamp):
+        slot = self.count % self.size
+        self.values[slot] = values
+        self.times[slot] = timestamp
+        self.count += 1
+
+    def latest(self, n=None):
+        """Return the last n rows, oldest first"""
+        n = min(n or self.size, self.count, self.size)
+        rows = np.arange(self.count - n, self.count) % self.size
+        return self.values[rows], self.times[rows]
+
+
+class PoseFeatures:
+    """
+    Compute configured pose features in one vectorised call per frame
+
+    Usage:
+        features = PoseFeatures(history=5)
+        result = features.update(pose_to_array(results.pose_landmarks))
+        print(result['angles'][features.angle_names.index('left_elbow')])
+        print(features.smoothed_angle('left_elbow'))  # mean of the last 5 frames
+    """
+
+    def __init__(self, angles=None, segments=None, history=0):
+        """
+        Args:
+            angles: {name: (point, joint, point)} using POSE_LANDMARKS names
+            segments: {name: (start, end)} using POSE_LANDMARKS names
+            history: Frames of joint angles kept for smoothed_angle (0 = off)
+        """
+        self.angle_names, self.angle_index = _indices(angles or DEFAULT_ANGLES)
+        self.segment_names, self.segment_index = _indices(segments or DEFAULT_SEGMENTS)
+        self.history = PoseHistory(history, len(self.angle_names)) if history else None
+        self.previous = None
+        self.previous_time = None
+
+    def angles(self, points):
+        """Joint angles in degrees (0-180) for a (33, >=2) array, using x and y"""
+        xy = points[:, :2]
+        a = xy[self.angle_index[:, 0]]
+        b = xy[self.angle_index[:, 1]]
+        c = xy[self.angle_index[:, 2]]
+        ba = a - b
+        bc = c - b
+        cross = ba[:, 0] * bc[:, 1] - ba[:, 1] * bc[:, 0]
+        dot = np.einsum('ij,ij->i', ba, bc)
+        return np.degrees(np.abs(np.arctan2(cross, dot)))
+
+    def segment_lengths(self, points):
+        """Segment lengths in normalised image units"""
+        xy = points[:, :2]
+        return np.linalg.norm(xy[self.segment_index[:, 1]] - xy[self.segment_index[:, 0]], axis=1)
+
+    def update(self, points, timestamp=None):
+        """
+        Compute every feature for one frame
+
+        Args:
+            points: (33, 4) array from pose_to_array
+            timestamp: Frame time in seconds (default: time.time())
+
+        Returns:
+            dict: 'angles' (k,), 'lengths' (m,), 'velocity' (33, 2) per second
+        """
+        if timestamp is None:
+            timestamp = time.time()
+        points = np.asarray(points, dtype=np.float32)
+
+        angles = self.angles(points)
+        if self.previous is None or timestamp <= self.previous_time:
+            velocity = np.zeros((len(points), 2), dtype=np.float32)
+        else:
+            velocity = (points[:, :2] - self.previous) / (timestamp - self.previous_time)
+        self.previous = points[:, :2].copy()
+        self.previous_time = timestamp
+
+        if self.history is not None:
+            self.history.append(angles, timestamp)
+
+        return {
+            'angles': angles,
+            'lengths': self.segment_lengths(points),
+            'velocity': velocity,
+        }
+
+    def angle(self, result, name):
+        """Look up one angle by name in an update() result"""
+        return result['angles'][self.angle_names.index(name)]
+
+    def smoothed_angle(self, name, frames=5):
+        """Mean of one angle over the last `frames` frames of history, to steady rep counting"""
+        if self.history is None or self.history.count == 0:
+            raise ValueError("smoothed_angle needs PoseFeatures(history=...) and at least one update()")
+        values, _ = self.history.latest(frames)
+        return float(values[:, self.angle_names.index(name)].mean())
+
+
+class RepCounter:
+    """Count repetitions of a joint angle going below `flexed` then above `extended`"""
+
+    def __init__(self, flexed=50, extended=150):
+        self.flexed = flexed
+        self.extended = extended
+        self.stage = None
+        self.reps = 0
+
+    def update(self, angle):
+        if angle > self.extended:
+            if self.stage == 'flexed':
+                self.reps += 1
+            self.stage = 'extended'
+        elif angle < self.flexed:
+            self.stage = 'flexed'
+        return self.reps
+
+
+def _scalar_angle(a, b, c):
+    """Per-joint reference: the original calculate_angle from 3_pose_estimation.py"""
+    a = np.array(a)
+    b = np.array(b)
+    c = np.array(c)
+    radians = np.arctan2(c[1] - b[1], c[0] - b[0]) - np.arctan2(a[1] - b[1], a[0] - b[0])
+    angle = np.abs(radians * 180.0 / np.pi)
+    if angle > 180.0:
+        angle = 360 - angle
+    return angle
+
+
+def benchmark(num_angles, iterations=1000):
+    """Compare per-joint calculate_angle calls with one vectorised update"""
+    rng = np.random.default_rng(0)
+    points = rng.random((33, 4), dtype=np.float32)
+    triples = rng.integers(0, 33, size=(num_angles, 3))
+    spec = {f'angle_{i}': tuple(POSE_LANDMARKS[j] for j in t) for i, t in enumerate(triples)}
+    features = PoseFeatures(angles=spec, history=120)
+
+    start = time.perf_counter()
+    for _ in range(iterations):
+        for i, j, k in triples:
+            _scalar_angle(points[i, :2].tolist(), points[j, :2].tolist(), points[k, :2].tolist())
+    loop_time = (time.perf_counter() - start) / iterations
+
+    start = time.perf_counter()
+    for step in range(iterations):
+        features.update(points, timestamp=step / 30)
+    vector_time = (time.perf_counter() - start) / iterations
+
+    print(f"⏱️  {num_angles:3d} angles: per-joint loop {loop_time * 1e6:8.1f} µs | "
+          f"vectorised update {vector_time * 1e6:6.1f} µs | {loop_time / vector_time:5.1f}x")
+
+
+if __name__ == "__main__":
+    print("🧍 Pose Feature Benchmark")
+    print("=" * 40)
+    for n in (1, 8, 32, 64):
+        benchmark(n)
@@ -0,0 +1,165 @@
+"""
+Native-rate capture for the realtime transcriber.
+
+Many input devices only run at 44.1 or 48 kHz, and asking PyAudio for
+24 kHz leaves the conversion to PortAudio or the driver (or fails to open
+the stream). NativeRateCapture opens the device at its own default rate and
+StreamResampler converts each block to 24 kHz with the same polyphase
+low-pass filter as scipy.signal.resample_poly, keeping the filter history
+between blocks so the block edges don't click.
+"""
+
+import time
+from math import gcd
+import numpy as np
+import pyaudio
+from scipy import signal
+
+
+class StreamResampler:
+    """
+    Block-by-block polyphase resampling with state kept between blocks
+
+    Every block must have the same length, a multiple of `step` input
+    samples, so each block starts at the same filter phase. The output is
+    identical to filtering the whole stream at once, delayed by `delay`
+    input samples (half the filter length).
+    """
+
+    def __init__(self, rate_in, rate_out, block, half_taps=10):
+        """
+        Args:
+            rate_in: Capture rate (Hz)
+            rate_out: Target rate (Hz)
+            block: Input samples per call, a multiple of `step`
+            half_taps: Filter half length in input samples (resample_poly uses 10)
+        """
+        g = gcd(rate_in, rate_out)
+        self.up = rate_out // g
+        self.down = rate_in // g
+        self.step = self.down
+        if block % self.step:
+            raise ValueError(f"Block of {block} samples is not a multiple of {self.step}")
+        self.block = block
+        self.out_len = block * self.up // self.down
+
+        # Same design as scipy.signal.resample_poly
+        max_rate = max(self.up, self.down)
+        self.taps = signal.firwin(2 * half_taps * max_rate + 1, 1.0 / max_rate,
+                                  window=('kaiser', 5.0)) * self.up
+        self.delay = (len(self.taps) - 1) / 2 / self.up  # in input samples
+
+        # Enough input history to cover the filter, rounded up to whole steps
+        history = -(-(len(self.taps) - 1) // self.up)
+        history = -(-history // self.step) * self.step
+        self.skip = history * self.up // self.down
+        self.buffer = np.zeros(history + block, dtype=np.float32)
+
+        self.cpu_time = 0.0
+        self.samples_in = 0
+
+    @classmethod
+    def block_for(cls, rate_in, rate_out, target):
+        """Valid block length closest to `target` input samples"""
+        step = rate_in // gcd(rate_in, rate_out)
+        return max(1, round(target / step)) * step
+
+    def process(self, samples):
+        """
+        Resample one block
+
+        Args:
+            samples: `block` input samples (any numeric dtype, int16 is scaled to ±1)
+
+        Returns:
+            np.ndarray: `out_len` float32 samples at rate_out
+        """
+        start = time.process_time()
+        history = len(self.buffer) - self.block
+        self.buffer[:history] = self.buffer[self.block:]
+        if samples.dtype == np.int16:
+            np.multiply(samples, 1 / 32768, out=self.buffer[history:], casting='unsafe')
+        else:
+            self.buffer[history:] = samples
+        out = signal.upfirdn(self.taps, self.buffer, self.up, self.down)
+        out = out[self.skip:self.skip + self.out_len].astype(np.float32)
+        self.cpu_time += time.process_time() - start
+        self.samples_in += self.block
+        return out
+
+
+def to_pcm16(samples):
+    """float32 ±1 -> little-endian PCM16 bytes"""
+    return (np.clip(samples, -1, 1) * 32767).astype('<i2').tobytes()
+
+
+class NativeRateCapture:
+    """
+    PyAudio input at the device's own rate, delivered as PCM16 at `rate`
+
+    Usage:
+        capture = NativeRateCapture(p, rate=24000, device=None)
+        capture.open(callback)   # same callback signature as PyAudio
+        ...
+        pcm = capture.convert(in_data)
+    """
+
+    def __init__(self, p, rate=24000, device=None, block_seconds=1024 / 24000):
+        """
+        Args:
+            p: pyaudio.PyAudio instance
+            rate: Rate the transcription server expects
+            device: Input device index (None for the default device)
+            block_seconds: Approximate duration of one capture block
+        """
+        self.p = p
+        self.rate = rate
+        self.device = device
+        info = (p.get_device_info_by_index(device) if device is not None
+                else p.get_default_input_device_info())
+        self.native_rate = int(info['defaultSampleRate'])
+        self.chunk = StreamResampler.block_for(self.native_rate, rate,
+                                               block_seconds * self.native_rate)
+        self.resampler = None
+        self.out_chunk = self.chunk  # samples per converted block
+        if self.native_rate != rate:
+            self.resampler = StreamResampler(self.native_rate, rate, self.chunk)
+            self.out_chunk = self.resampler.out_len
+        self.stream = None
+
+    def open(self, callback):
+        self.stream = self.p.open(
+            format=pyaudio.paInt16,
+            channels=1,
+            rate=self.native_rate,
+            input=True,
+            input_device_index=self.device,
+            frames_per_buffer=self.chunk,
+            stream_callback=callback
+        )
+        return self.stream
+
+    def convert(self, in_data):
+        """One captured block as PCM16 bytes at `rate`"""
+        if self.resampler is None:
+            return in_data
+        return to_pcm16(self.resampler.process(np.frombuffer(in_data, dtype=np.int16)))
+
+    def stats(self):
+        """
+        Returns:
+            dict: rates, latency added by capture (one block plus the filter
+                delay) and resampling CPU time per second of audio
+        """
+        block_ms = self.chunk / self.native_rate * 1000
+        if self.resampler is None:
+            return {'native_rate': self.native_rate, 'rate': self.rate,
+                    'latency_ms': block_ms, 'cpu_ms_per_s': 0.0}
+        r = self.resampler
+        seconds = r.samples_in / self.native_rate
+        return {
+            'native_rate': self.native_rate,
+            'rate': self.rate,
+            'latency_ms': block_ms + r.delay / self.native_rate * 1000,
+            'cpu_ms_per_s': r.cpu_time * 1000 / seconds if seconds else 0.0,
+        }
@@ -0,0 +1,144 @@
+"""
+Load test for a Realtime transcription server.
+
+Runs N RealtimeAudioTranscriber clients at once, each streaming a WAV file
+in real time, against the mock server (started in its own process) or any
+server given with --url. For every client count it reports the percentiles
+of end-of-speech -> transcript latency and the transcripts that never came.
+The sustained client count is the largest N with no missed transcripts and
+a p95 latency within the budget.
+
+Usage:
+    python load_test.py                           # generated audio, 1 to 32 clients
+    python load_test.py a.wav b.wav --clients 4 8 16
+    python load_test.py --delay 0.3               # mock recognizer taking 300 ms
+    python load_test.py --url ws://localhost:8000/v1/realtime?intent=transcription
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+import numpy as np
+import websockets
+from scipy import signal
+from scipy.io import wavfile
+from mock_realtime_server import ServerVAD
+from simple_audio_transcription import RealtimeAudioTranscriber, RATE
+from vad_benchmark import make_test_audio
+
+PORT = 8766
+
+
+def expected_turns(path):
+    """Turns the mock server's VAD finds in a file (plus the trailing second of silence)"""
+    rate, audio = wavfile.read(path)
+    if audio.ndim > 1:
+        audio = audio.mean(axis=1)
+    if np.issubdtype(audio.dtype, np.floating):
+        audio = audio * 32767
+    audio = audio.astype(np.float32)
+    if rate != RATE:
+        audio = signal.resample_poly(audio, RATE, rate)
+    audio = np.concatenate([audio, np.zeros(RATE)]).astype(np.int16)
+    vad = ServerVAD(RATE)
+    return sum(turn is not None for _, _, turn in vad.feed(audio.tobytes()))
+
+
+async def start_mock_server(port, delay):
+    """Run mock_realtime_server.py in its own process and wait until it accepts connections"""
+    script = os.path.join(os.path.dirname(os.path.abspath(__file__)), "mock_realtime_server.py")
+    process = await asyncio.create_subprocess_exec(
+        sys.executable, script, "--port", str(port), "--delay", str(delay), "--quiet",
+        stdout=asyncio.subprocess.DEVNULL)
+    for _ in range(50):
+        try:
+            async with websockets.connect(f"ws://localhost:{port}"):
+                return process
+        except OSError:
+            await asyncio.sleep(0.1)
+    process.kill()
+    raise RuntimeError("Mock server did not start")
+
+
+async def run_client(path, url, start_delay):
+    await asyncio.sleep(start_delay)
+    client = RealtimeAudioTranscriber(url=url, verbose=False)
+    try:
+        await client.transcribe_realtime(audio_file=path)
+    finally:
+        client.cleanup()
+    return client
+
+
+async def run_step(n, paths, url, ramp):
+    """N clients at once, started over `ramp` seconds"""
+    cpu, wall = time.process_time(), time.time()
+    clients = await asyncio.gather(*[
+        run_client(paths[i % len(paths)], url, ramp * i / n) for i in range(n)
+    ])
+    cpu_share = (time.process_time() - cpu) / (time.time() - wall)
+    latencies = np.array([latency for c in clients for latency in c.latencies]) * 1000
+    return {
+        "latencies": latencies,
+        "received": sum(len(c.latencies) for c in clients),
+        "errors": sum(c.error is not None for c in clients),
+        "driver_cpu": cpu_share,
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Load test for a Realtime transcription server")
+    parser.add_argument("files", nargs="*", help="WAV files (default: generated speech-like audio)")
+    parser.add_argument("--clients", type=int, nargs="+", default=[1, 2, 4, 8, 16, 32])
+    parser.add_argument("--url", help="server to test (default: start the mock server)")
+    parser.add_argument("--delay", type=float, default=0.0, help="mock recognizer time per turn (s)")
+    parser.add_argument("--budget-ms", type=float, default=1000, help="p95 latency budget")
+    parser.add_argument("--ramp", type=float, default=2.0, help="seconds over which clients start")
+    parser.add_argument("--seconds", type=float, default=15, help="length of the generated audio")
+    args = parser.parse_args()
+    if min(args.clients) < 1:
+        parser.error("--clients counts must be at least 1")
+
+    paths = args.files or [make_test_audio(f"load_test_{i}.wav", args.seconds, seed=i) for i in range(4)]
+    turns = [expected_turns(path) for path in paths]
+
+    server = None
+    url = args.url
+    if url is None:
+        server = await start_mock_server(PORT, args.delay)
+        url = f"ws://localhost:{PORT}/v1/realtime?intent=transcription"
+
+    print(f"{'clients':>7} {'p50':>7} {'p90':>7} {'p95':>7} {'p99':>7} {'max':>7} "
+          f"{'missed':>7} {'errors':>6} {'driver CPU':>10}")
+    sustained = 0
+    try:
+        for n in args.clients:
+            result = await run_step(n, paths, url, args.ramp)
+            expected = sum(turns[i % len(paths)] for i in range(n))
+            missed = expected - result["received"]
+            latencies = result["latencies"]
+            if len(latencies):
+                p50, p90, p95, p99 = np.percentile(latencies, [50, 90, 95, 99])
+                worst = latencies.max()
+            else:
+                p50 = p90 = p95 = p99 = worst = float("nan")
+            print(f"{n:>7} {p50:>5.0f}ms {p90:>5.0f}ms {p95:>5.0f}ms {p99:>5.0f}ms {worst:>5.0f}ms "
+                  f"{missed:>7} {result['errors']:>6} {result['driver_cpu']:>9.0%}")
+            if missed <= 0 and not result["errors"] and p95 <= args.budget_ms:
+                sustained = n
+            else:
+                break
+    finally:
+        if server is not None:
+            server.terminate()
+            await server.wait()
+
+    print(f"\nSustained: {sustained} concurrent clients within a p95 of {args.budget_ms:.0f} ms")
+    if result["driver_cpu"] > 0.8:
+        print("Note: the load driver itself was close to a full core, so it may be the limit")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,197 @@
+"""
+In-process speech recognition for the realtime transcriber.
+
+Recognizer backends are functions (turn, audio, rate) -> text, the same
+interface the mock server uses, so they can run in either place:
+
+    faster-whisper   CTranslate2 Whisper, int8 on the CPU (pip install faster-whisper)
+    whisper.cpp      whisper.cpp bindings (pip install pywhispercpp)
+    fake             no model, deterministic text (for testing the pipeline)
+
+LocalConnection takes the place of the websocket: the transcriber sends its
+append messages to it as usual, the mock server's VAD splits the audio into
+turns, and each turn is recognized on a worker pool while capture carries
+on. Transcripts come back as the same events a server would send.
+
+Usage:
+    python simple_audio_transcription.py --local=faster-whisper
+    python mock_realtime_server.py --recognizer local_recognizer:transcribe
+"""
+
+import asyncio
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from scipy import signal
+from mock_realtime_server import Session, fake_transcript
+from realtime_codec import loads
+
+WHISPER_RATE = 16000
+
+
+def to_whisper_input(audio, rate):
+    """PCM16 samples at `rate` -> float32 ±1 at 16 kHz"""
+    audio = audio.astype(np.float32) / 32768
+    if rate != WHISPER_RATE:
+        g = np.gcd(rate, WHISPER_RATE)
+        audio = signal.resample_poly(audio, WHISPER_RATE // g, rate // g).astype(np.float32)
+    return audio
+
+
+class FasterWhisperRecognizer:
+    def __init__(self, model="tiny", compute_type="int8", threads=2, workers=2, language="en"):
+        """
+        Args:
+            model: Whisper model size or path
+            compute_type: CTranslate2 quantization
+            threads: CPU threads per recognition
+            workers: Recognitions that can run at the same time
+            language: Spoken language (None to detect)
+        """
+        from faster_whisper import WhisperModel
+        self.model = WhisperModel(model, device="cpu", compute_type=compute_type,
+                                  cpu_threads=threads, num_workers=workers)
+        self.language = language
+
+    def __call__(self, turn, audio, rate):
+        segments, _ = self.model.transcribe(to_whisper_input(audio, rate), language=self.language,
+                                            beam_size=1, vad_filter=False)
+        return " ".join(segment.text.strip() for segment in segments)
+
+
+class WhisperCppRecognizer:
+    """whisper.cpp contexts are not thread-safe, so each worker thread loads its own"""
+
+    def __init__(self, model="tiny", threads=2, language="en"):
+        from pywhispercpp.model import Model
+        self.load = lambda: Model(model, n_threads=threads, print_progress=False,
+                                  print_realtime=False)
+        self.language = language
+        self.local = threading.local()
+
+    def __call__(self, turn, audio, rate):
+        if not hasattr(self.local, "model"):
+            self.local.model = self.load()
+        segments = self.local.model.transcribe(to_whisper_input(audio, rate), language=self.language)
+        return " ".join(segment.text.strip() for segment in segments)
+
+
+BACKENDS = {
+    "faster-whisper": FasterWhisperRecognizer,
+    "whisper.cpp": WhisperCppRecognizer,
+    "fake": lambda **kwargs: fake_transcript,
+}
+
+
+def load_backend(name, **kwargs):
+    """A recognizer by name (see BACKENDS), with its constructor arguments"""
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown backend {name!r}, choose from {', '.join(BACKENDS)}")
+    return BACKENDS[name](**kwargs)
+
+
+class TimedRecognizer:
+    """Wrap a recognizer to measure its real-time factor"""
+
+    def __init__(self, recognize):
+        self.recognize = recognize
+        self.lock = threading.Lock()
+        self.audio_seconds = 0.0
+        self.busy_seconds = 0.0
+        self.turns = 0
+
+    def __call__(self, turn, audio, rate):
+        start = time.perf_counter()
+        text = self.recognize(turn, audio, rate)
+        elapsed = time.perf_counter() - start
+        with self.lock:
+            self.audio_seconds += len(audio) / rate
+            self.busy_seconds += elapsed
+            self.turns += 1
+        return text
+
+    def stats(self):
+        """
+        Returns:
+            dict: turns, seconds of audio, and the real-time factor
+                (recognition time / audio time; below 1 keeps up on one worker)
+        """
+        return {
+            "turns": self.turns,
+            "audio_seconds": self.audio_seconds,
+            "rtf": self.busy_seconds / self.audio_seconds if self.audio_seconds else 0.0,
+        }
+
+
+_default = None
+
+
+def transcribe(turn, audio, rate):
+    """Recognizer for mock_realtime_server.py --recognizer, chosen by $LOCAL_RECOGNIZER"""
+    global _default
+    if _default is None:
+        _default = load_backend(os.environ.get("LOCAL_RECOGNIZER", "faster-whisper"))
+    return _default(turn, audio, rate)
+
+
+class _ServerSide:
+    """What the session writes to: events go straight to the client's queue"""
+
+    def __init__(self, events):
+        self.events = events
+
+    async def send(self, message):
+        self.events.put_nowait(message)
+
+
+class LocalConnection:
+    """
+    A websocket stand-in that recognizes in-process
+
+    Usage:
+        async with LocalConnection(recognizer, workers=2) as websocket:
+            await websocket.send(message)      # client events, as JSON
+            async for message in websocket:    # server events
+                ...
+    """
+
+    def __init__(self, recognize, workers=2):
+        self.recognize = TimedRecognizer(recognize)
+        self.executor = ThreadPoolExecutor(workers, thread_name_prefix="recognizer")
+        self.events = asyncio.Queue()
+        self.session = Session(_ServerSide(self.events), self.recognize, self.executor)
+        self.closed = False
+
+    async def send(self, message, text=None):
+        if isinstance(message, memoryview):
+            message = bytes(message)
+        await self.session.handle(loads(message))
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        message = await self.events.get()
+        if message is None:
+            raise StopAsyncIteration
+        return message
+
+    async def close(self):
+        if not self.closed:
+            self.closed = True
+            # Let turns already being recognized finish
+            if self.session.pending:
+                await asyncio.wait(self.session.pending)
+            self.events.put_nowait(None)
+            self.executor.shutdown(wait=False)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    def stats(self):
+        return self.recognize.stats()
@@ -0,0 +1,266 @@
+"""
+Local stand-in for the Realtime transcription websocket.
+
+Speaks enough of the protocol for simple_audio_transcription.py:
+`transcription.update` configures the session, `input_audio_buffer.append`
+adds PCM16 audio, and an energy-based server VAD running on the received
+audio timeline answers each turn with `input_audio_buffer.speech_started`,
+`...speech_stopped`, `...committed` and
+`conversation.item.input_audio_transcription.completed`.
+`input_audio_buffer.commit` and `...clear` end or drop a turn by hand.
+
+Transcripts come from a recognizer, any function (turn, audio, rate) ->
+text. The default one is fake (the turn number and duration), so results
+are deterministic; a real one runs on a worker thread so slow recognition
+doesn't hold up the audio of other clients.
+
+Every connection counts the messages and bytes it received.
+
+Usage:
+    python mock_realtime_server.py                          # ws://localhost:8000/v1/realtime
+    python mock_realtime_server.py --delay 0.2              # fake recognizer taking 200 ms
+    python mock_realtime_server.py --recognizer mymodule:transcribe
+"""
+
+import argparse
+import asyncio
+import base64
+import importlib
+import json
+import time
+import numpy as np
+from websockets.asyncio.server import serve
+from websockets.exceptions import ConnectionClosed
+from realtime_codec import loads
+
+RATE = 24000
+FRAME_MS = 20
+VAD_DB = -45  # frames louder than this (dBFS) are speech
+
+
+class ServerVAD:
+    """Turn detection on the received audio, like the server's `server_vad`"""
+
+    def __init__(self, rate=RATE, silence_duration_ms=500, prefix_padding_ms=300):
+        self.rate = rate
+        self.frame = rate * FRAME_MS // 1000
+        self.silence_frames = silence_duration_ms // FRAME_MS
+        self.prefix_samples = rate * prefix_padding_ms // 1000
+        self.pending = np.zeros(0, dtype=np.int16)  # partial frame
+        self.audio = []          # frames since the last commit
+        self.samples = 0         # total samples received
+        self.speech_start = None
+        self.silent = 0
+
+    def feed(self, pcm):
+        """
+        Add audio
+
+        Returns:
+            list: (event, sample position, turn audio or None) for every
+                turn boundary found in this audio
+        """
+        events = []
+        samples = np.concatenate([self.pending, np.frombuffer(pcm, dtype=np.int16)])
+        n = len(samples) // self.frame * self.frame
+        self.pending = samples[n:]
+        if n == 0:
+            return events
+        frames = samples[:n].reshape(-1, self.frame).astype(np.float32)
+        levels = 10 * np.log10(np.mean(frames ** 2, axis=1) / 32768 ** 2 + 1e-10)
+
+        for frame, level in zip(frames, levels):
+            self.audio.append(frame)
+            self.samples += self.frame
+            if level > VAD_DB:
+                self.silent = 0
+                if self.speech_start is None:
+                    self.speech_start = self.samples - self.frame
+                    events.append(("speech_started", self.speech_start, None))
+            elif self.speech_start is not None:
+                self.silent += 1
+                if self.silent >= self.silence_frames:
+                    turn = np.concatenate(self.audio)
+                    start = max(0, len(turn) - (self.samples - self.speech_start) - self.prefix_samples)
+                    events.append(("speech_stopped", self.samples, turn[start:]))
+                    self.speech_start = None
+                    self.audio = []
+            elif len(self.audio) * self.frame > self.prefix_samples:
+                # Only the prefix padding is needed from before speech
+                self.audio.pop(0)
+        return events
+
+
+def fake_transcript(turn, audio, rate=RATE):
+    return f"Turn {turn}: {len(audio) / rate:.2f} seconds of speech."
+
+
+def slow_fake_transcript(delay):
+    """The fake recognizer, taking `delay` seconds like a real model would"""
+    def recognize(turn, audio, rate=RATE):
+        time.sleep(delay)
+        return fake_transcript(turn, audio, rate)
+    return recognize
+
+
+def load_recognizer(spec):
+    """'module:function' -> the function"""
+    module, _, name = spec.partition(":")
+    return getattr(importlib.import_module(module), name or "transcribe")
+
+
+class Session:
+    """One client connection"""
+
+    def __init__(self, websocket, recognize=fake_transcript, executor=None):
+        self.websocket = websocket
+        self.recognize = recognize
+        self.executor = executor  # None: asyncio's default thread pool
+        self.vad = ServerVAD()
+        self.turns = 0
+        self.pending = set()  # turns being recognized
+        self.messages = 0
+        self.bytes = 0
+        self.audio_bytes = 0
+
+    async def send(self, event):
+        await self.websocket.send(json.dumps(event))
+
+    async def handle(self, event):
+        kind = event.get("type")
+        if kind == "transcription.update":
+            config = event.get("audio", {}).get("input", {})
+            turn_detection = config.get("turn_detection") or {}
+            rate = config.get("format", {}).get("rate", RATE)
+            self.vad = ServerVAD(rate, turn_detection.get("silence_duration_ms", 500),
+                                 turn_detection.get("prefix_padding_ms", 300))
+            await self.send({"type": "transcription.updated", "session": config})
+        elif kind == "input_audio_buffer.append":
+            pcm = base64.b64decode(event["audio"])
+            self.audio_bytes += len(pcm)
+            for name, position, audio in self.vad.feed(pcm):
+                audio_ms = position * 1000 // self.vad.rate
+                await self.send({"type": f"input_audio_buffer.{name}", "audio_start_ms": audio_ms})
+                if audio is not None:
+                    await self.commit(audio)
+        elif kind == "input_audio_buffer.commit":
+            if not self.vad.audio:
+                await self.send({"type": "error", "error": {"message": "Buffer is empty"}})
+            else:
+                audio = np.concatenate(self.vad.audio)
+                self.vad.audio = []
+                self.vad.speech_start = None
+                await self.commit(audio)
+        elif kind == "input_audio_buffer.clear":
+            self.vad.audio = []
+            self.vad.speech_start = None
+            await self.send({"type": "input_audio_buffer.cleared"})
+        else:
+            await self.send({"type": "error", "error": {"message": f"Unsupported event: {kind}"}})
+
+    async def commit(self, audio):
+        self.turns += 1
+        item_id = f"item_{self.turns:04d}"
+        await self.send({"type": "input_audio_buffer.committed", "item_id": item_id})
+        task = asyncio.create_task(self.transcribe(self.turns, item_id, audio))
+        self.pending.add(task)
+        task.add_done_callback(self.pending.discard)
+
+    async def transcribe(self, turn, item_id, audio):
+        try:
+            if self.recognize is fake_transcript:
+                transcript = fake_transcript(turn, audio, self.vad.rate)
+            else:
+                transcript = await asyncio.get_running_loop().run_in_executor(
+                    self.executor, self.recognize, turn, audio, self.vad.rate)
+        except Exception as e:
+            event = {
+                "type": "conversation.item.input_audio_transcription.failed",
+                "item_id": item_id,
+                "error": {"message": str(e)},
+            }
+        else:
+            event = {
+                "type": "conversation.item.input_audio_transcription.completed",
+                "item_id": item_id,
+                "content_index": 0,
+                "transcript": transcript,
+            }
+        try:
+            await self.send(event)
+        except ConnectionClosed:
+            pass  # the client left before its transcript was ready
+
+    async def run(self):
+        async for message in self.websocket:
+            self.messages += 1
+            self.bytes += len(message)
+            try:
+                event = loads(message)
+            except json.JSONDecodeError:
+                await self.send({"type": "error", "error": {"message": "Invalid JSON"}})
+                continue
+            await self.handle(event)
+
+
+class MockRealtimeServer:
+    """
+    Usage:
+        async with MockRealtimeServer(port=8000) as server:
+            ...  # connect clients
+        print(server.sessions)  # traffic and turns per connection
+    """
+
+    def __init__(self, host="localhost", port=8000, recognize=fake_transcript, verbose=True):
+        self.host = host
+        self.port = port
+        self.recognize = recognize
+        self.verbose = verbose
+        self.sessions = []
+        self.server = None
+
+    async def handler(self, websocket):
+        session = Session(websocket, self.recognize)
+        self.sessions.append(session)
+        # Only a client leaving is expected; anything else is a server bug,
+        # which websockets logs with its traceback before closing with 1011
+        try:
+            await session.run()
+        except ConnectionClosed:
+            pass  # client went away mid-message
+        finally:
+            if self.verbose:
+                print(f"Client done: {session.messages} messages, {session.bytes / 1024:.0f} KiB, "
+                      f"{session.audio_bytes / 2 / session.vad.rate:.1f}s of audio, {session.turns} turns")
+
+    async def __aenter__(self):
+        self.server = await serve(self.handler, self.host, self.port)
+        return self
+
+    async def __aexit__(self, *exc):
+        self.server.close()
+        await self.server.wait_closed()
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Local stand-in for the Realtime transcription websocket")
+    parser.add_argument("--host", default="localhost")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--recognizer", help="module:function taking (turn, audio, rate)")
+    parser.add_argument("--delay", type=float, default=0, help="seconds the fake recognizer takes")
+    parser.add_argument("--quiet", action="store_true", help="don't print a line per client")
+    args = parser.parse_args()
+
+    if args.recognizer:
+        recognize = load_recognizer(args.recognizer)
+    elif args.delay:
+        recognize = slow_fake_transcript(args.delay)
+    else:
+        recognize = fake_transcript
+    async with MockRealtimeServer(args.host, args.port, recognize, verbose=not args.quiet) as server:
+        print(f"Mock Realtime server on ws://{server.host}:{server.port}/v1/realtime")
+        await asyncio.get_running_loop().create_future()  # run forever
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -1,26 +1,81 @@
 import asyncio
+import sys
 import pyaudio
 import time
-import base64
 import json
+from collections import deque
+import numpy as np
 import websockets
+from scipy.io import wavfile
+from audio_capture import NativeRateCapture, StreamResampler, to_pcm16
+from vad_gate import VoiceGate, AppendBatcher
+from realtime_codec import AppendEncoder, EventDispatcher
+from local_recognizer import LocalConnection, load_backend
+from transcript_store import TranscriptStore
 
 # Audio parameters
-CHUNK = 1024
+CHUNK = 1024  # frames per block at RATE (about 43 ms)
 FORMAT = pyaudio.paInt16
 CHANNELS = 1
-RATE = 24000  # 16kHz for OpenAI Realtime API
+RATE = 24000  # PCM16 rate sent to the Realtime API; the device runs at its own rate
+REPORT_SECONDS = 10  # how often capture latency and resampling CPU are printed
+
+# Client-side gating: silence is not sent, except PREROLL_MS before speech and
+# HANGOVER_MS after it (longer than the server's silence_duration_ms, so its
+# VAD still ends the turn). Blocks are sent in appends of up to APPEND_MS.
+VAD_GATING = True
+PREROLL_MS = 300
+HANGOVER_MS = 700
+APPEND_MS = 200
+FILE_TAIL_SECONDS = 3  # wait for the last transcript after a file has been sent
 
 # OpenAI Realtime API WebSocket endpoint
 WEBSOCKET_URL = "ws://localhost:8000/v1/realtime?intent=transcription&model=whisper-1"
 API_KEY = ""  # Leave empty for local servers that don't require authentication
 
+# Recognize in this process instead ("faster-whisper", "whisper.cpp" or "fake"),
+# also settable with --local=NAME; None uses WEBSOCKET_URL
+LOCAL_BACKEND = None
+LOCAL_WORKERS = 2  # turns recognized at the same time while capture continues
+
+# Every transcript is saved as it arrives (.db: SQLite with full-text search,
+# otherwise JSONL); only the last TRANSCRIPT_WINDOW are kept in memory
+TRANSCRIPT_FILE = "transcripts.db"
+TRANSCRIPT_WINDOW = 100
+
 class RealtimeAudioTranscriber:
-    def __init__(self):
+    def __init__(self, vad_gating=VAD_GATING, append_ms=APPEND_MS, url=WEBSOCKET_URL, verbose=True,
+                 recognizer=None, workers=LOCAL_WORKERS):
         self.p = pyaudio.PyAudio()
+        self.url = url
+        self.recognizer = recognizer  # set: recognize locally, no websocket
+        self.workers = workers
+        self.recognizer_stats = None
+        # Progress messages (errors are always printed)
+        self.log = print if verbose else (lambda *args, **kwargs: None)
+        self.error = None
         self.recording = False
-        self.transcriptions = []
+        self.transcriptions = deque(maxlen=TRANSCRIPT_WINDOW)
+        self.store = None  # TranscriptStore
         self.audio_queue = asyncio.Queue()
+        self.loop = None
+        self.capture = None
+        self.vad_gating = vad_gating
+        self.append_ms = append_ms
+        self.gate = None
+        self.encoder = AppendEncoder()
+        self.dispatcher = EventDispatcher({
+            'input_audio_buffer.committed': self.on_committed,
+            'conversation.item.input_audio_transcription.completed': self.on_transcription,
+            'conversation.item.input_audio_transcription.failed': self.on_transcription_failed,
+            'error': self.on_error,
+        })
+        
+        # Traffic and end-of-speech -> transcript latency
+        self.bytes_sent = 0
+        self.messages_sent = 0
+        self.latencies = []
+        self.measured_speech_time = None
         
     def list_audio_devices(self):
         """List available audio input devices"""
@@ -33,85 +88,156 @@ class RealtimeAudioTranscriber:
     def audio_callback(self, in_data, frame_count, time_info, status):
         """Callback for audio input stream"""
         if self.recording:
-            # Put audio data into queue for async processing
-            try:
-                self.audio_queue.put_nowait(in_data)
-            except asyncio.QueueFull:
-                # Skip frame if queue is full
-                pass
+            # Put audio data into queue for async processing (asyncio queues
+            # are not thread-safe, so hand it over through the event loop)
+            self.loop.call_soon_threadsafe(self.audio_queue.put_nowait, (time.time(), in_data))
         return (None, pyaudio.paContinue)
     
     async def stream_audio_to_websocket(self, websocket, device_index=None):
-        """Stream audio data to WebSocket"""
-        # Open audio stream
-        stream = self.p.open(
-            format=FORMAT,
-            channels=CHANNELS,
-            rate=RATE,
-            input=True,
-            input_device_index=device_index,
-            frames_per_buffer=CHUNK,
-            stream_callback=self.audio_callback
-        )
+        """Stream microphone audio to WebSocket"""
+        # Open audio stream at the device's native rate, resampled to RATE here
+        self.loop = asyncio.get_running_loop()
+        self.capture = NativeRateCapture(self.p, rate=RATE, device=device_index,
+                                         block_seconds=CHUNK / RATE)
+        stream = self.capture.open(self.audio_callback)
+        self.log(f"Capturing at {self.capture.native_rate} Hz, sending {RATE} Hz")
         
         self.recording = True
         stream.start_stream()
         
         try:
-            while self.recording:
-                # Get audio data from queue
-                try:
-                    audio_data = await asyncio.wait_for(self.audio_queue.get(), timeout=0.1)
-                    
-                    # Convert to base64 and send via WebSocket
-                    audio_base64 = base64.b64encode(audio_data).decode('utf-8')
-                    
-                    message = {
-                        "type": "input_audio_buffer.append",
-                        "audio": audio_base64
-                    }
-                    
-                    await websocket.send(json.dumps(message))
-                    
-                except asyncio.TimeoutError:
-                    # No audio data available, continue
-                    continue
-                    
+            await self.send_audio(websocket, self.capture.out_chunk, self.capture.convert)
         finally:
             stream.stop_stream()
             stream.close()
     
+    async def stream_file_to_websocket(self, websocket, path, speed=1.0):
+        """Stream a WAV file to WebSocket as if it were being captured live"""
+        rate, audio = wavfile.read(path)
+        if audio.ndim > 1:
+            audio = audio.mean(axis=1)
+        if audio.dtype != np.int16:
+            audio = to_pcm16(audio / max(1.0, np.abs(audio).max()))
+            audio = np.frombuffer(audio, dtype=np.int16)
+        
+        # One second of silence at the end lets the server close the last turn
+        block = StreamResampler.block_for(rate, RATE, CHUNK / RATE * rate)
+        audio = np.concatenate([audio, np.zeros(rate, dtype=np.int16)])
+        audio = np.pad(audio, (0, -len(audio) % block))
+        resampler = StreamResampler(rate, RATE, block) if rate != RATE else None
+        out_chunk = resampler.out_len if resampler else block
+        
+        async def produce():
+            start = time.time()
+            for i in range(0, len(audio), block):
+                # Pace the blocks like a sound card would
+                await asyncio.sleep(max(0, start + i / rate / speed - time.time()))
+                samples = audio[i:i + block]
+                pcm = to_pcm16(resampler.process(samples)) if resampler else samples.tobytes()
+                self.audio_queue.put_nowait((time.time(), pcm))
+            await asyncio.sleep(0.5)
+            self.recording = False
+        
+        self.recording = True
+        producer = asyncio.create_task(produce())
+        try:
+            await self.send_audio(websocket, out_chunk)
+        finally:
+            producer.cancel()
+    
+    async def send_audio(self, websocket, block, convert=None):
+        """Gate, batch and send queued audio blocks until recording stops"""
+        self.gate = VoiceGate(RATE, block, preroll_ms=PREROLL_MS, hangover_ms=HANGOVER_MS,
+                              enabled=self.vad_gating)
+        batcher = AppendBatcher(RATE, self.append_ms)
+        # A batch can end up to one block past max_bytes
+        self.encoder = AppendEncoder(batcher.max_bytes + block * 2)
+        last_report = time.time()
+        
+        while self.recording:
+            if self.store is not None:
+                self.store.maybe_flush()
+            # Get audio data from queue
+            try:
+                captured, audio_data = await asyncio.wait_for(self.audio_queue.get(), timeout=0.1)
+            except asyncio.TimeoutError:
+                # No audio data available, continue
+                continue
+            if convert is not None:
+                audio_data = convert(audio_data)
+            
+            for pcm in self.gate.process(audio_data, captured):
+                batch = batcher.add(pcm)
+                if batch is not None:
+                    await self.send_append(websocket, batch)
+            if self.vad_gating and not self.gate.open:
+                # Don't hold back the end of a turn
+                batch = batcher.flush()
+                if batch is not None:
+                    await self.send_append(websocket, batch)
+            
+            if time.time() - last_report >= REPORT_SECONDS:
+                last_report = time.time()
+                self.print_capture_stats()
+    
+    async def send_append(self, websocket, pcm):
+        """Send an input_audio_buffer.append via WebSocket (JSON text frame)"""
+        message = self.encoder.encode(pcm)
+        await websocket.send(message, text=True)
+        self.bytes_sent += len(message)
+        self.messages_sent += 1
+    
+    def print_capture_stats(self):
+        """Print the latency and CPU cost of the capture stage, and the traffic"""
+        if self.capture is not None:
+            stats = self.capture.stats()
+            self.log(f"Capture {stats['native_rate']} -> {stats['rate']} Hz: "
+                     f"latency {stats['latency_ms']:.1f} ms, "
+                     f"resampling {stats['cpu_ms_per_s']:.2f} ms CPU per second of audio")
+        gate = self.gate
+        self.log(f"Sent {self.messages_sent} messages, {self.bytes_sent / 1024:.0f} KiB "
+                 f"({gate.blocks_passed}/{gate.blocks_in} blocks passed the VAD gate)")
+    
     async def receive_transcriptions(self, websocket):
         """Receive transcription results from WebSocket"""
         try:
             async for message in websocket:
                 try:
-                    event = json.loads(message)
-                    
-                    # Handle different event types
-                    if event.get('type') == 'input_audio_buffer.committed':
-                        print("Audio buffer committed")
-                    
-                    elif event.get('type') == 'conversation.item.input_audio_transcription.completed':
-                        transcript = event.get('transcript', '')
-                        if transcript.strip():
-                            timestamp = time.strftime("%H:%M:%S")
-                            print(f"\n[{timestamp}] Transcription: {transcript}")
-                            self.transcriptions.append((timestamp, transcript))
-                    
-                    elif event.get('type') == 'conversation.item.input_audio_transcription.failed':
-                        error = event.get('error', {})
-                        print(f"Transcription failed: {error}")
-                    
-                    elif event.get('type') == 'error':
-                        error = event.get('error', {})
-                        print(f"WebSocket error: {error}")
-                        
+                    # Handle different event types (see the table in __init__)
+                    self.dispatcher.dispatch(message)
                 except json.JSONDecodeError:
                     print(f"Failed to decode message: {message}")
                     
         except websockets.exceptions.ConnectionClosed:
-            print("WebSocket connection closed")
+            self.log("WebSocket connection closed")
+    
+    def on_committed(self, event):
+        self.log("Audio buffer committed")
+    
+    def on_transcription(self, event):
+        transcript = event.get('transcript', '')
+        self.record_latency()
+        if transcript.strip():
+            timestamp = time.strftime("%H:%M:%S")
+            self.log(f"\n[{timestamp}] Transcription: {transcript}")
+            self.transcriptions.append((timestamp, transcript))
+            if self.store is not None:
+                self.store.add(transcript)
+    
+    def on_transcription_failed(self, event):
+        error = event.get('error', {})
+        print(f"Transcription failed: {error}")
+    
+    def on_error(self, event):
+        error = event.get('error', {})
+        print(f"WebSocket error: {error}")
+    
+    def record_latency(self):
+        """Time from the last speech block to this transcript, once per turn"""
+        speech_time = self.gate.last_speech_time if self.gate else None
+        if speech_time is not None and speech_time != self.measured_speech_time:
+            self.measured_speech_time = speech_time
+            self.latencies.append(time.time() - speech_time)
     
     async def setup_transcription_session(self, websocket):
         """Setup the transcription session configuration"""
@@ -122,7 +248,7 @@ class RealtimeAudioTranscriber:
                 "input": {
                     "format": {
                         "type": "audio/pcm",
-                        "rate": 24000
+                        "rate": RATE
                     },
                     "noise_reduction": {
                         "type": "near_field"
@@ -144,12 +270,12 @@ class RealtimeAudioTranscriber:
         
         
         await websocket.send(json.dumps(session_config))
-        print("Transcription session configured")
+        self.log("Transcription session configured")
     
-    async def transcribe_realtime(self, device_index=None):
+    async def transcribe_realtime(self, device_index=None, audio_file=None, speed=1.0):
         """Main transcription function using WebSocket realtime API"""
-        print("Starting realtime transcription...")
-        print("Press Ctrl+C to stop\n")
+        self.log("Starting realtime transcription...")
+        self.log("Press Ctrl+C to stop\n")
         
         # Configure audio input device
         if device_index is not None:
@@ -165,45 +291,65 @@ class RealtimeAudioTranscriber:
             if API_KEY and API_KEY.startswith("sk-"):
                 headers["Authorization"] = f"Bearer {API_KEY}"
             
-            # Connect to WebSocket
-            async with websockets.connect(WEBSOCKET_URL, additional_headers=headers if headers else None) as websocket:
-                print("Connected to Realtime API")
+            # Connect to WebSocket (or to the in-process recognizer)
+            if self.recognizer is not None:
+                connection = LocalConnection(self.recognizer, self.workers)
+            else:
+                connection = websockets.connect(self.url, additional_headers=headers if headers else None)
+            async with connection as websocket:
+                self.log("Connected to Realtime API" if self.recognizer is None else "Recognizing locally")
                 
                 # Setup transcription session
                 await self.setup_transcription_session(websocket)
                 
                 # Create tasks for streaming audio and receiving transcriptions
-                audio_task = asyncio.create_task(
-                    self.stream_audio_to_websocket(websocket, device_index)
-                )
+                if audio_file is not None:
+                    audio = self.stream_file_to_websocket(websocket, audio_file, speed)
+                else:
+                    audio = self.stream_audio_to_websocket(websocket, device_index)
+                audio_task = asyncio.create_task(audio)
                 transcription_task = asyncio.create_task(
                     self.receive_transcriptions(websocket)
                 )
                 
-                # Run until interrupted
+                # Run until interrupted (or the file has been sent and the
+                # last transcript had time to arrive)
                 try:
-                    await asyncio.gather(audio_task, transcription_task)
+                    await audio_task
+                    if self.recognizer is not None:
+                        # Ends the event stream once the last turn is recognized
+                        await websocket.close()
+                    await asyncio.wait_for(transcription_task, timeout=FILE_TAIL_SECONDS)
+                except asyncio.TimeoutError:
+                    pass
                 except KeyboardInterrupt:
                     print("\nRecording interrupted by user")
                 finally:
                     self.recording = False
                     audio_task.cancel()
                     transcription_task.cancel()
+                    if self.recognizer is not None:
+                        self.recognizer_stats = websocket.stats()
                     
         except websockets.exceptions.InvalidStatusCode as e:
+            self.error = e
             print(f"Connection failed with status code: {e.status_code}")
-        except ConnectionRefusedError:
+        except ConnectionRefusedError as e:
+            self.error = e
             print("Connection refused. Make sure the server is running on localhost:8000.")
         except Exception as e:
+            self.error = e
             print(f"Error: {e}")
     
     def cleanup(self):
         """Clean up PyAudio resources"""
         self.p.terminate()
+        if self.store is not None:
+            self.store.close()
     
     def get_transcriptions(self):
-        """Get all transcriptions"""
-        return self.transcriptions
+        """Get the most recent transcriptions (all of them are in self.store)"""
+        return list(self.transcriptions)
     
 
 
@@ -216,27 +362,49 @@ async def main():
     print("=== Realtime Audio Transcription ===")
     print("Press Ctrl+C to stop\n")
     
-    # List available audio devices
-    transcriber.list_audio_devices()
-    
-    # Get user input for device selection
-    device_input = input("\nEnter device index (or press Enter for default): ").strip()
+    # A WAV file given on the command line is streamed instead of the microphone
+    files = [arg for arg in sys.argv[1:] if not arg.startswith("--")]
+    audio_file = files[0] if files else None
+    backend = LOCAL_BACKEND
+    for arg in sys.argv[1:]:
+        if arg.startswith("--local="):
+            backend = arg.split("=", 1)[1]
+    if backend is not None:
+        print(f"Loading {backend} recognizer...")
+        transcriber.recognizer = load_backend(backend)
+    transcriber.store = TranscriptStore(TRANSCRIPT_FILE, window=TRANSCRIPT_WINDOW)
     device_index = None
-    if device_input:
-        try:
-            device_index = int(device_input)
-        except ValueError:
-            print("Invalid device index, using default")
-            device_index = None
+    if audio_file is None:
+        # List available audio devices
+        transcriber.list_audio_devices()
+        
+        # Get user input for device selection
+        device_input = input("\nEnter device index (or press Enter for default): ").strip()
+        if device_input:
+            try:
+                device_index = int(device_input)
+            except ValueError:
+                print("Invalid device index, using default")
+                device_index = None
     
     try:
         # Start realtime transcription
-        await transcriber.transcribe_realtime(device_index=device_index)
+        await transcriber.transcribe_realtime(device_index=device_index, audio_file=audio_file)
+        if transcriber.gate is not None:
+            transcriber.print_capture_stats()
+        if transcriber.latencies:
+            latencies = np.array(transcriber.latencies) * 1000
+            print(f"End of speech -> transcript: {np.median(latencies):.0f} ms median, "
+                  f"{np.percentile(latencies, 95):.0f} ms p95")
+        if transcriber.recognizer_stats is not None:
+            stats = transcriber.recognizer_stats
+            print(f"Local recognizer: {stats['turns']} turns, {stats['audio_seconds']:.1f}s of speech, "
+                  f"real-time factor {stats['rtf']:.2f}")
         
         # Display final transcriptions
         transcriptions = transcriber.get_transcriptions()
         if transcriptions:
-            print("\n=== Final Transcriptions ===")
+            print(f"\n=== Final Transcriptions (saved to {TRANSCRIPT_FILE}) ===")
             for timestamp, text in transcriptions:
                 print(f"[{timestamp}] {text}")
         else:
@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""
+Tests for realtime_codec.py (no server or audio device needed)
+
+Run with: python -m pytest test_realtime_codec.py
+"""
+
+import base64
+import json
+
+from realtime_codec import AppendEncoder, EventDispatcher
+
+
+def decode(message):
+    return json.loads(bytes(message))
+
+
+def test_encode_matches_json():
+    pcm = bytes(range(256)) * 8
+    event = decode(AppendEncoder().encode(pcm))
+    assert event == {"type": "input_audio_buffer.append",
+                     "audio": base64.b64encode(pcm).decode("utf-8")}
+
+
+def test_encode_grows_past_reservation():
+    encoder = AppendEncoder(max_pcm_bytes=100)
+    small = encoder.encode(bytes(50))
+    pcm = bytes(range(200))
+    assert decode(encoder.encode(pcm))["audio"] == base64.b64encode(pcm).decode("utf-8")
+    # The earlier message is still held by the caller and must not have changed
+    assert decode(small)["audio"] == base64.b64encode(bytes(50)).decode("utf-8")
+
+
+def test_encode_shorter_after_longer():
+    encoder = AppendEncoder(max_pcm_bytes=100)
+    encoder.encode(bytes(300))
+    pcm = b"\x01\x02\x03\x04"
+    assert decode(encoder.encode(pcm))["audio"] == base64.b64encode(pcm).decode("utf-8")
+
+
+def test_dispatch_routes_by_type():
+    seen = []
+    dispatcher = EventDispatcher({"error": seen.append}, default=lambda event: seen.append("other"))
+    dispatcher.dispatch('{"type": "error", "error": {"message": "x"}}')
+    dispatcher.dispatch(b'{"type": "session.created"}')
+    assert seen == [{"type": "error", "error": {"message": "x"}}, "other"]
+
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith("test_"):
+            test()
+            print(f"✅ {name}")
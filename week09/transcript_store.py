@@ -0,0 +1,181 @@
+"""
+Persistent transcript storage for the realtime transcriber.
+
+TranscriptStore appends every completed segment to disk as it arrives,
+either to SQLite (WAL journal, with an FTS5 full-text index) or to a JSONL
+file. Writes are committed and fsynced in batches: after `batch` segments,
+or once the oldest unsaved one is `max_delay` seconds old. A crash loses at
+most one batch. Only the last `window` segments stay in memory.
+
+Usage:
+    store = TranscriptStore("transcripts.db")
+    store.add("Hello there.")
+    store.search("hello")       # [(time, text), ...], best matches first
+    store.close()
+
+    python transcript_store.py transcripts.db "search words"
+"""
+
+import json
+import os
+import sqlite3
+import sys
+import time
+from collections import deque
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS segments (
+    id INTEGER PRIMARY KEY,
+    time REAL NOT NULL,
+    session TEXT,
+    text TEXT NOT NULL
+);
+CREATE VIRTUAL TABLE IF NOT EXISTS segments_fts
+    USING fts5(text, content='segments', content_rowid='id');
+CREATE TRIGGER IF NOT EXISTS segments_index AFTER INSERT ON segments BEGIN
+    INSERT INTO segments_fts(rowid, text) VALUES (new.id, new.text);
+END;
+"""
+
+
+class TranscriptStore:
+    def __init__(self, path, window=100, batch=8, max_delay=2.0, session=None):
+        """
+        Args:
+            path: .db for SQLite (searchable), anything else for JSONL
+            window: Segments kept in memory (see recent())
+            batch: Segments per commit + fsync
+            max_delay: Longest time (s) a segment waits for its batch
+            session: Label stored with every segment (default: start time)
+        """
+        self.path = str(path)
+        self.sqlite = self.path.endswith(".db")
+        self.window = deque(maxlen=window)
+        self.batch = batch
+        self.max_delay = max_delay
+        self.session = session or time.strftime("%Y-%m-%d %H:%M:%S")
+        self.pending = []
+        self.first_pending = None
+        self.flushes = 0
+
+        if self.sqlite:
+            self.db = sqlite3.connect(self.path)
+            self.db.execute("PRAGMA journal_mode=WAL")
+            self.db.execute("PRAGMA synchronous=FULL")  # a commit is on disk when it returns
+            self.db.executescript(SCHEMA)
+        else:
+            self.file = open(self.path, "a", encoding="utf-8")
+
+    def add(self, text, timestamp=None):
+        """Store one completed segment"""
+        segment = (timestamp if timestamp is not None else time.time(), text)
+        self.window.append(segment)
+        self.pending.append(segment)
+        if self.first_pending is None:
+            self.first_pending = time.monotonic()
+        if len(self.pending) >= self.batch:
+            self.flush()
+        else:
+            self.maybe_flush()
+
+    def maybe_flush(self):
+        """Flush if the oldest pending segment has waited `max_delay` (cheap to call often)"""
+        if self.pending and time.monotonic() - self.first_pending >= self.max_delay:
+            self.flush()
+
+    def flush(self):
+        """Write the pending segments and make them durable"""
+        if not self.pending:
+            return
+        if self.sqlite:
+            with self.db:
+                self.db.executemany("INSERT INTO segments (time, session, text) VALUES (?, ?, ?)",
+                                    [(t, self.session, text) for t, text in self.pending])
+        else:
+            self.file.write("".join(
+                json.dumps({"time": t, "session": self.session, "text": text}, ensure_ascii=False) + "\n"
+                for t, text in self.pending))
+            self.file.flush()
+            os.fsync(self.file.fileno())
+        self.pending = []
+        self.first_pending = None
+        self.flushes += 1
+
+    def recent(self):
+        """The last `window` segments, oldest first"""
+        return list(self.window)
+
+    def search(self, query, limit=20):
+        """
+        Full-text search over every stored segment
+
+        Args:
+            query: FTS5 query ("word", "two words", "prefix*", '"exact phrase"')
+                (text that is not valid FTS5 syntax is matched word by word)
+            limit: Most results returned
+
+        Returns:
+            list: (time, text) tuples, best matches first
+        """
+        self.flush()
+        if not query.strip():
+            return []
+        if self.sqlite:
+            sql = ("SELECT segments.time, segments.text FROM segments_fts "
+                   "JOIN segments ON segments.id = segments_fts.rowid "
+                   "WHERE segments_fts MATCH ? ORDER BY rank LIMIT ?")
+            try:
+                return self.db.execute(sql, (query, limit)).fetchall()
+            except sqlite3.OperationalError:
+                # Not valid FTS5 syntax (don't, hello-world, ...): match the words literally
+                return self.db.execute(sql, (quote_words(query), limit)).fetchall()
+
+        # JSONL has no index: scan the file for segments containing every word
+        words = query.lower().split()
+        results = []
+        for segment in read_jsonl(self.path):
+            if all(word in segment["text"].lower() for word in words):
+                results.append((segment["time"], segment["text"]))
+        return results[-limit:][::-1]
+
+    def __len__(self):
+        self.flush()
+        if self.sqlite:
+            return self.db.execute("SELECT count(*) FROM segments").fetchone()[0]
+        return sum(1 for _ in read_jsonl(self.path))
+
+    def close(self):
+        self.flush()
+        if self.sqlite:
+            self.db.close()
+        else:
+            self.file.close()
+
+
+def quote_words(query):
+    """An FTS5 query matching every word of `query` as a plain string"""
+    return " ".join('"' + word.replace('"', '""') + '"' for word in query.split())
+
+
+def read_jsonl(path):
+    """Segments from a JSONL store, skipping a line cut short by a crash"""
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError:
+                continue
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 3:
+        print("Usage: python transcript_store.py transcripts.db \"search words\"")
+        sys.exit(1)
+    store = TranscriptStore(sys.argv[1])
+    start = time.perf_counter()
+    results = store.search(" ".join(sys.argv[2:]))
+    elapsed = (time.perf_counter() - start) * 1000
+    for t, text in results:
+        print(f"[{time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(t))}] {text}")
+    print(f"\n{len(results)} result(s) from {len(store)} segments in {elapsed:.1f} ms")
+    store.close()
@@ -0,0 +1,119 @@
+"""
+Traffic and latency of the transcriber with and without VAD gating.
+
+Streams the same WAV file (or a generated one: speech-like bursts between
+pauses) through RealtimeAudioTranscriber into the local mock server, once
+per configuration, and compares the bytes and messages sent and the time
+from the end of each utterance to its transcript.
+
+Usage:
+    python vad_benchmark.py                 # generated test audio
+    python vad_benchmark.py speech.wav
+"""
+
+import asyncio
+import sys
+import numpy as np
+from scipy import signal
+from scipy.io import wavfile
+from mock_realtime_server import MockRealtimeServer
+from simple_audio_transcription import RealtimeAudioTranscriber, CHUNK, RATE
+from vad_gate import VoiceGate
+
+PORT = 8765
+URL = f"ws://localhost:{PORT}/v1/realtime?intent=transcription"
+
+# (label, VAD gating, append ms)
+CONFIGS = [
+    ("every block", False, 0),
+    ("batched", False, 200),
+    ("gated", True, 0),
+    ("gated + batched", True, 200),
+]
+
+
+def make_test_audio(path, seconds=20, rate=24000, seed=0):
+    """
+    Speech-like test signal: bursts of band-passed noise with a syllable-rate
+    envelope, separated by pauses over a quiet noise floor
+    """
+    rng = np.random.default_rng(seed)
+    audio = rng.normal(0, 30, int(seconds * rate))  # about -60 dBFS background
+    sos = signal.butter(4, [300, 3400], btype="bandpass", fs=rate, output="sos")
+    t = 1.0
+    while t < seconds - 3:
+        length = rng.uniform(1.0, 2.5)
+        n = int(length * rate)
+        start = int(t * rate)
+        envelope = np.abs(np.sin(np.pi * 4 * np.arange(n) / rate)) ** 0.5
+        burst = signal.sosfilt(sos, rng.normal(0, 6000, n)) * envelope
+        audio[start:start + n] += burst
+        t += length + rng.uniform(1.5, 3.5)
+    wavfile.write(path, rate, np.clip(audio, -32768, 32767).astype(np.int16))
+    return path
+
+
+def check_noise_gating(noise_db=-34, seconds=10, seed=0):
+    """
+    The gate must close on steady background noise louder than its static
+    threshold, and still open for speech over that noise
+
+    Returns:
+        tuple: (noise blocks passed, noise blocks, speech blocks passed, speech blocks)
+    """
+    rng = np.random.default_rng(seed)
+    gate = VoiceGate(RATE, CHUNK)
+    noise_std = 32768 * 10 ** (noise_db / 20)
+    blocks = int(seconds * RATE / CHUNK)
+    noise_passed = sum(
+        len(gate.process(rng.normal(0, noise_std, CHUNK).astype(np.int16).tobytes()))
+        for _ in range(blocks))
+
+    # One second of speech-like bursts 20 dB above the noise
+    sos = signal.butter(4, [300, 3400], btype="bandpass", fs=RATE, output="sos")
+    speech_blocks = RATE // CHUNK
+    speech = signal.sosfilt(sos, rng.normal(0, noise_std * 10, speech_blocks * CHUNK))
+    speech += rng.normal(0, noise_std, len(speech))
+    speech_passed = sum(len(gate.process(block.astype(np.int16).tobytes()))
+                        for block in speech.reshape(speech_blocks, CHUNK))
+    assert noise_passed <= 1, f"gate passed {noise_passed}/{blocks} blocks of steady noise"
+    assert speech_passed >= speech_blocks, f"gate passed {speech_passed}/{speech_blocks} speech blocks"
+    return noise_passed, blocks, speech_passed, speech_blocks
+
+
+async def run(path, gating, append_ms, server):
+    transcriber = RealtimeAudioTranscriber(vad_gating=gating, append_ms=append_ms, url=URL)
+    try:
+        await transcriber.transcribe_realtime(audio_file=path)
+    finally:
+        transcriber.cleanup()
+    session = server.sessions[-1]
+    latencies = np.array(transcriber.latencies) * 1000
+    return {
+        "messages": transcriber.messages_sent,
+        "kib": transcriber.bytes_sent / 1024,
+        "turns": session.turns,
+        "latency_ms": latencies.mean() if len(latencies) else float("nan"),
+        "latency_max_ms": latencies.max() if len(latencies) else float("nan"),
+    }
+
+
+async def main():
+    noise_passed, noise_blocks, speech_passed, speech_blocks = check_noise_gating()
+    print(f"Steady -34 dBFS noise: {noise_passed}/{noise_blocks} blocks passed the gate, "
+          f"speech over it: {speech_passed}/{speech_blocks}")
+    path = sys.argv[1] if len(sys.argv) > 1 else make_test_audio("vad_test.wav")
+    results = []
+    async with MockRealtimeServer(port=PORT, verbose=False) as server:
+        for label, gating, append_ms in CONFIGS:
+            print(f"\n--- {label} ---")
+            results.append((label, await run(path, gating, append_ms, server)))
+
+    print(f"\n{'config':>16} {'messages':>9} {'KiB':>8} {'turns':>6} {'latency':>9} {'max':>8}")
+    for label, r in results:
+        print(f"{label:>16} {r['messages']:>9} {r['kib']:>8.0f} {r['turns']:>6} "
+              f"{r['latency_ms']:>6.0f} ms {r['latency_max_ms']:>5.0f} ms")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,124 @@
+"""
+Client-side voice activity gating for the realtime transcriber.
+
+VoiceGate classifies each captured block as speech or not from its energy
+and zero-crossing rate and only lets speech through, plus a pre-roll of the
+audio just before speech starts and a hangover after it stops. The hangover
+must be longer than the server's `silence_duration_ms`, so server-side VAD
+still sees the end of each turn. AppendBatcher then coalesces the passed
+blocks into fewer, larger `input_audio_buffer.append` messages.
+"""
+
+import time
+from collections import deque
+import numpy as np
+
+
+class VoiceGate:
+    def __init__(self, rate, block, threshold_db=-50, margin_db=10, unvoiced_zcr=0.3,
+                 preroll_ms=300, hangover_ms=700, noise_window_ms=5000, enabled=True):
+        """
+        Args:
+            rate: Sample rate of the PCM16 blocks
+            block: Samples per block
+            threshold_db: Blocks quieter than this (dBFS) are never speech
+            margin_db: Speech must also be this far above the tracked noise floor
+            unvoiced_zcr: Zero-crossing rate (per sample) above which a quieter
+                block (10 dB under the threshold, but still half the margin
+                above the noise floor) counts as speech (fricatives)
+            preroll_ms: Audio kept and sent from before speech starts
+            hangover_ms: Audio still sent after the last speech block
+            noise_window_ms: The noise floor is the quietest block in this window
+            enabled: False passes every block through (detection still runs)
+        """
+        self.rate = rate
+        self.threshold_db = threshold_db
+        self.margin_db = margin_db
+        self.unvoiced_zcr = unvoiced_zcr
+        self.enabled = enabled
+        block_ms = block / rate * 1000
+        self.preroll = deque(maxlen=int(np.ceil(preroll_ms / block_ms)))
+        self.hangover_blocks = int(np.ceil(hangover_ms / block_ms))
+
+        # Minimum statistics: pauses between words keep the minimum at the
+        # background level, and steady noise raises it within one block
+        self.levels = deque(maxlen=max(1, int(noise_window_ms / block_ms)))
+        self.noise_db = threshold_db
+        self.open = False
+        self.since_speech = 0          # blocks since the last speech block
+        self.last_speech_time = None   # capture time of the last speech block
+        self.blocks_in = 0
+        self.blocks_passed = 0
+
+    def is_speech(self, samples):
+        """Energy + zero-crossing decision for one block of int16 samples"""
+        x = samples.astype(np.float32)
+        rms = np.sqrt(np.dot(x, x) / len(x)) / 32768
+        level_db = 20 * np.log10(rms + 1e-10)
+        zcr = np.count_nonzero(np.signbit(x[1:]) != np.signbit(x[:-1])) / len(x)
+
+        self.levels.append(level_db)
+        self.noise_db = min(self.levels)
+
+        threshold = max(self.threshold_db, self.noise_db + self.margin_db)
+        unvoiced = max(self.threshold_db - 10, self.noise_db + self.margin_db / 2)
+        return level_db > threshold or (level_db > unvoiced and zcr > self.unvoiced_zcr)
+
+    def process(self, pcm, captured=None):
+        """
+        Gate one block
+
+        Args:
+            pcm: PCM16 bytes
+            captured: Capture time of the block (default: now)
+
+        Returns:
+            list: PCM16 blocks to send now (empty while the gate is closed)
+        """
+        self.blocks_in += 1
+        if self.is_speech(np.frombuffer(pcm, dtype=np.int16)):
+            self.since_speech = 0
+            self.last_speech_time = captured if captured is not None else time.time()
+        else:
+            self.since_speech += 1
+
+        if not self.enabled:
+            self.blocks_passed += 1
+            return [pcm]
+
+        if self.since_speech == 0 and not self.open:
+            self.open = True
+            out = list(self.preroll) + [pcm]
+            self.preroll.clear()
+        elif self.open:
+            out = [pcm]
+            if self.since_speech > self.hangover_blocks:
+                self.open = False
+        else:
+            self.preroll.append(pcm)
+            out = []
+        self.blocks_passed += len(out)
+        return out
+
+
+class AppendBatcher:
+    """Coalesce PCM16 blocks until `max_ms` of audio is pending"""
+
+    def __init__(self, rate, max_ms=200):
+        self.max_bytes = int(rate * max_ms / 1000) * 2
+        self.pending = bytearray()
+
+    def add(self, pcm):
+        """Returns the batch once it is full, otherwise None"""
+        self.pending += pcm
+        if len(self.pending) >= self.max_bytes:
+            return self.flush()
+        return None
+
+    def flush(self):
+        """Returns whatever is pending (None if nothing)"""
+        if not self.pending:
+            return None
+        batch = bytes(self.pending)
+        self.pending.clear()
+        return batch